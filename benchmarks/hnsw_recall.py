@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Recall-vs-latency report for the HNSW index against the exact FlatIndex
+used by MemoryVectorDB.
+
+Data is drawn from a low-rank latent space plus a little noise: real
+embeddings have a low intrinsic dimension, and isotropic noise in 128+
+dimensions is a worst case no ANN index handles well. Recall@k is the
+fraction of the exact top-k that HNSW also returns.
+
+Usage:
+    python benchmarks/hnsw_recall.py --size 20000 --dim 128 --ef-search 16 32 64 128 256
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from uuid import uuid4  # noqa: E402
+from src.infrastructure_vectordb.flat_index import FlatIndex  # noqa: E402
+from src.infrastructure_vectordb.hnsw_index import HNSWIndex  # noqa: E402
+
+
+def low_rank(rng, basis, size):
+    latent = rng.standard_normal((size, basis.shape[0]), dtype=np.float32)
+    return latent @ basis + 0.05 * rng.standard_normal((size, basis.shape[1]), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--rank", type=int, default=24, help="Intrinsic dimension of the data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    basis = rng.standard_normal((args.rank, args.dim), dtype=np.float32)
+    data = low_rank(rng, basis, args.size)
+    queries = low_rank(rng, basis, args.queries)
+    ids = [uuid4() for _ in range(args.size)]
+
+    flat = FlatIndex(args.dim, capacity=args.size)
+    hnsw = HNSWIndex(args.dim, m=args.m, ef_construction=args.ef_construction, capacity=args.size, seed=0)
+    for asset_id, row in zip(ids, data):
+        flat.add(asset_id, row)
+    start = time.perf_counter()
+    for asset_id, row in zip(ids, data):
+        hnsw.add(asset_id, row)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = [{a for a, _ in flat.search(q, args.top_k)} for q in queries]
+    flat_ms = (time.perf_counter() - start) / args.queries * 1e3
+
+    print(f"{args.size} vectors, dim={args.dim}, M={args.m}, ef_construction={args.ef_construction}")
+    print(f"HNSW build: {build_s:.1f} s ({build_s / args.size * 1e3:.2f} ms/insert)")
+    print(f"{'index':>16} {f'recall@{args.top_k}':>10} {'ms/query':>10}")
+    print(f"{'exact (flat)':>16} {1.0:>10.3f} {flat_ms:>10.2f}")
+    for ef in args.ef_search:
+        start = time.perf_counter()
+        found = [{a for a, _ in hnsw.search(q, args.top_k, ef_search=ef)} for q in queries]
+        hnsw_ms = (time.perf_counter() - start) / args.queries * 1e3
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        print(f"{f'hnsw ef={ef}':>16} {recall:>10.3f} {hnsw_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
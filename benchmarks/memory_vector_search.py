@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the matrix-backed MemoryVectorDB engine against the previous
+pure-Python scoring loop.
+
+Usage:
+    python benchmarks/memory_vector_search.py --sizes 10000 100000 1000000 --dim 256
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from uuid import uuid4  # noqa: E402
+from src.infrastructure_vectordb.flat_index import FlatIndex  # noqa: E402
+
+
+def python_search(rows, query, top_k):
+    """The original list-of-tuples scoring loop, kept as the baseline."""
+    scored = []
+    for emb, asset_id in rows:
+        score = sum(e1 * e2 for e1, e2 in zip(emb, query))
+        scored.append((score, asset_id))
+    scored.sort(reverse=True)
+    return scored[:top_k]
+
+
+def time_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument(
+        "--baseline-max",
+        type=int,
+        default=100_000,
+        help="Skip the pure-Python baseline above this many vectors (it takes minutes at 1M)",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>10} {'python ms':>12} {'numpy ms':>10} {'speedup':>9}")
+    for size in args.sizes:
+        data = rng.standard_normal((size, args.dim), dtype=np.float32)
+        query = rng.standard_normal(args.dim, dtype=np.float32)
+
+        index = FlatIndex(args.dim, capacity=size)
+        for row in data:
+            index.add(uuid4(), row)
+        numpy_s = time_call(lambda: index.search(query, args.top_k), args.queries)
+
+        if size <= args.baseline_max:
+            rows = [(row.tolist(), uuid4()) for row in data]
+            query_list = query.tolist()
+            python_s = time_call(lambda: python_search(rows, query_list, args.top_k), 1)
+            print(f"{size:>10} {python_s * 1e3:>12.1f} {numpy_s * 1e3:>10.2f} {python_s / numpy_s:>8.0f}x")
+        else:
+            print(f"{size:>10} {'skipped':>12} {numpy_s * 1e3:>10.2f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
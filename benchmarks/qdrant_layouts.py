@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Filtered-search latency of the Qdrant domain layouts (QDRANT_LAYOUT).
+
+Loads the same multi-domain corpus into a fresh collection for each of the
+"shared", "collection" and "shard" layouts and times per-domain searches.
+Needs a running Qdrant server; the "shard" layout needs one started in
+distributed mode.
+
+Usage:
+    python benchmarks/qdrant_layouts.py --url http://localhost:6333 --domains 50 --per-domain 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.infrastructure_vectordb.qdrant_vector_db import QdrantVectorDB  # noqa: E402
+
+
+async def run_layout(args, layout, corpus, queries):
+    vector_db = QdrantVectorDB(url=args.url, api_key=args.api_key, collection=f"bench_{layout}", layout=layout)
+    try:
+        for domain_id, vectors in corpus.items():
+            await vector_db.add_many(domain_id, ((uuid4(), v.tolist()) for v in vectors))
+        # add_many does not wait for indexing; give the optimizer time to build the graphs
+        await asyncio.sleep(args.settle)
+
+        latencies = []
+        for domain_id in corpus:
+            for query in queries:
+                start = time.perf_counter()
+                await vector_db.search_many(domain_id, [query], top_k=args.top_k)
+                latencies.append(time.perf_counter() - start)
+        return np.array(latencies) * 1e3
+    finally:
+        names = [f"bench_{layout}_{d.hex}" for d in corpus] if layout == "collection" else [f"bench_{layout}"]
+        for name in names:
+            await vector_db.client.delete_collection(name)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:6333")
+    parser.add_argument("--api-key")
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--per-domain", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--settle", type=float, default=10.0, help="Seconds to wait for indexing")
+    parser.add_argument("--layouts", nargs="+", default=list(QdrantVectorDB.LAYOUTS))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = {uuid4(): rng.standard_normal((args.per_domain, args.dim), dtype=np.float32) for _ in range(args.domains)}
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32).tolist()
+
+    print(f"{args.domains} domains x {args.per_domain} vectors, dim={args.dim}")
+    print(f"{'layout':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for layout in args.layouts:
+        latencies = await run_layout(args, layout, corpus, queries)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{layout:>12} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
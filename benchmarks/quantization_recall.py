@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory and recall report for the quantized in-process index.
+
+Compares resident bytes per vector and recall@k of int8 and binary codes
+(with full-precision rescoring of ``top_k * oversample`` candidates)
+against the exact float32 FlatIndex.
+
+Usage:
+    python benchmarks/quantization_recall.py --size 20000 --dim 1536 --oversample 4 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from uuid import uuid4  # noqa: E402
+from src.infrastructure_vectordb.flat_index import FlatIndex  # noqa: E402
+from src.infrastructure_vectordb.quantized_index import QuantizedIndex  # noqa: E402
+
+
+def low_rank(rng, basis, size):
+    latent = rng.standard_normal((size, basis.shape[0]), dtype=np.float32)
+    return latent @ basis + 0.05 * rng.standard_normal((size, basis.shape[1]), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--rank", type=int, default=64, help="Intrinsic dimension of the data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--oversample", type=int, nargs="+", default=[2, 4, 10])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    basis = rng.standard_normal((args.rank, args.dim), dtype=np.float32)
+    data = low_rank(rng, basis, args.size)
+    queries = low_rank(rng, basis, args.queries)
+    ids = [uuid4() for _ in range(args.size)]
+
+    flat = FlatIndex(args.dim, capacity=args.size)
+    for asset_id, row in zip(ids, data):
+        flat.add(asset_id, row)
+    start = time.perf_counter()
+    truth = [{a for a, _ in flat.search(q, args.top_k)} for q in queries]
+    flat_ms = (time.perf_counter() - start) / args.queries * 1e3
+
+    print(f"{args.size} vectors, dim={args.dim}, rank={args.rank}")
+    print(f"{'index':>22} {'bytes/vec':>10} {'reduction':>10} {f'recall@{args.top_k}':>9} {'ms/query':>9}")
+    print(f"{'float32 (flat)':>22} {flat.nbytes / args.size:>10.0f} {'1x':>10} {1.0:>9.3f} {flat_ms:>9.2f}")
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        for mode in QuantizedIndex.MODES:
+            index = QuantizedIndex(args.dim, os.path.join(storage_dir, f"{mode}.f32"), mode=mode, capacity=args.size)
+            for asset_id, row in zip(ids, data):
+                index.add(asset_id, row)
+            for oversample in args.oversample:
+                index.oversample = oversample
+                start = time.perf_counter()
+                found = [{a for a, _ in index.search(q, args.top_k)} for q in queries]
+                ms = (time.perf_counter() - start) / args.queries * 1e3
+                recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+                label = f"{mode} oversample={oversample}"
+                print(
+                    f"{label:>22} {index.nbytes / args.size:>10.0f} "
+                    f"{flat.nbytes / index.nbytes:>9.1f}x {recall:>9.3f} {ms:>9.2f}"
+                )
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
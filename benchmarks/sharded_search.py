@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measure single-query latency and concurrent throughput of MemoryVectorDB
+for different shard counts.
+
+Usage:
+    python benchmarks/sharded_search.py --size 500000 --dim 384 --shards 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from uuid import uuid4  # noqa: E402
+from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB  # noqa: E402
+
+
+async def run(shards, data, queries, concurrency):
+    db = MemoryVectorDB(asset_repo=None, shards=shards)
+    domain_id = uuid4()
+    for row in data:
+        await db.add(domain_id, uuid4(), row)
+
+    await db.search_many(domain_id, queries[:1])
+    start = time.perf_counter()
+    for query in queries:
+        await db.search_many(domain_id, [query])
+    latency = (time.perf_counter() - start) / len(queries)
+
+    async def worker(chunk):
+        for query in chunk:
+            await db.search_many(domain_id, [query])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(queries[i::concurrency]) for i in range(concurrency)))
+    throughput = len(queries) / (time.perf_counter() - start)
+    return latency, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=500_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((args.size, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32).tolist()
+    print(f"{'shards':>7} {'latency ms':>11} {'queries/s':>10}")
+    for shards in args.shards:
+        latency, throughput = asyncio.run(run(shards, data, queries, args.concurrency))
+        print(f"{shards:>7} {latency * 1e3:>11.2f} {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
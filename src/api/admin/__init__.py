@@ -1,3 +1,3 @@
-from . import user_controller, asset_controller, domain_controller, category_controller, audit_controller
-__all__ = ["user_controller", "asset_controller", "domain_controller", "category_controller", "audit_controller"]
+from . import user_controller, asset_controller, domain_controller, category_controller, audit_controller, cache_controller
+__all__ = ["user_controller", "asset_controller", "domain_controller", "category_controller", "audit_controller", "cache_controller"]
 
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from src.application.caching.answer_cache import AnswerCache
+from src.application.caching.embedding_cache import EmbeddingCache
+from src.application.prompting.prompt_builder import PromptBuilder
+from src.application.integration.dependencies import get_answer_cache, get_embedding_cache, get_prompt_builder
+
+router = APIRouter(prefix="/cache", tags=["admin-cache"])
+
+
+@router.get("/stats")
+async def cache_stats(answer_cache: Optional[AnswerCache] = Depends(get_answer_cache)):
+    if answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **answer_cache.stats()}
+
+
+@router.get("/embeddings/stats")
+async def embedding_cache_stats(embedding_cache: Optional[EmbeddingCache] = Depends(get_embedding_cache)):
+    if embedding_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **embedding_cache.stats()}
+
+
+@router.get("/prompts/stats")
+async def prompt_stats(prompt_builder: PromptBuilder = Depends(get_prompt_builder)):
+    return prompt_builder.stats()
@@ -1,3 +1,3 @@
-from . import domain_controller, asset_controller, category_controller, user_controller, query_controller, auth_controller
-__all__ = ["domain_controller", "asset_controller", "category_controller", "user_controller", "query_controller", "auth_controller"]
+from . import domain_controller, asset_controller, category_controller, user_controller, query_controller, auth_controller, job_controller
+__all__ = ["domain_controller", "asset_controller", "category_controller", "user_controller", "query_controller", "auth_controller", "job_controller"]
 
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from uuid import UUID
 from src.application.services.asset_service import AssetService
 from src.application.dtos.asset_dtos import (
     CreateAssetRequestDto,
     UpdateAssetRequestDto,
-    AssetResponseDto
+    AssetResponseDto,
+    AssetImportResultDto
 )
+from src.common.ndjson import iter_ndjson
+from src.domain.enums.asset_type import AssetType
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
 
-def asset_to_response_dto(asset) -> AssetResponseDto:
-    """Convert asset entity to response DTO"""
+def asset_to_response_dto(asset, job=None) -> AssetResponseDto:
+    """Convert asset entity to response DTO, with the indexing job queued for it if any"""
     return AssetResponseDto(
         id=asset.id,
         name=asset.name,
@@ -21,7 +24,8 @@ def asset_to_response_dto(asset) -> AssetResponseDto:
         category_id=asset.category_id,
         created_at=asset.created_at,
         updated_at=asset.updated_at,
-        deleted_at=asset.deleted_at
+        deleted_at=asset.deleted_at,
+        job_id=job.id if job else None
     )
 
 
@@ -37,16 +41,71 @@ def asset_response_dto_to_dict(dto: AssetResponseDto) -> dict:
         "created_at": dto.created_at.isoformat() if dto.created_at else None,
         "updated_at": dto.updated_at.isoformat() if dto.updated_at else None,
         "deleted_at": dto.deleted_at.isoformat() if dto.deleted_at else None,
+        "job_id": str(dto.job_id) if dto.job_id else None,
     }
 
 
+def record_to_create_dto(record) -> CreateAssetRequestDto:
+    """Validate one imported JSON record; raises ValueError describing the first problem"""
+    if not isinstance(record, dict):
+        raise ValueError("Record must be a JSON object")
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name must be a non-empty string")
+    content = record.get("content")
+    if content is not None and not isinstance(content, str):
+        raise ValueError("content must be a string")
+    try:
+        domain_id = UUID(str(record.get("domain_id")))
+    except ValueError:
+        raise ValueError("domain_id must be a UUID") from None
+    try:
+        asset_type = AssetType(record.get("asset_type"))
+    except ValueError:
+        raise ValueError(f"asset_type must be one of {[t.value for t in AssetType]}") from None
+    category_id = record.get("category_id")
+    if category_id is not None:
+        try:
+            category_id = UUID(str(category_id))
+        except ValueError:
+            raise ValueError("category_id must be a UUID") from None
+    return CreateAssetRequestDto(
+        name=name,
+        domain_id=domain_id,
+        asset_type=asset_type,
+        content=content,
+        category_id=category_id
+    )
+
+
+def import_result_dto_to_dict(dto: AssetImportResultDto) -> dict:
+    """Convert AssetImportResultDto to API response dict"""
+    return {
+        "imported": dto.imported,
+        "failed": dto.failed,
+        "errors": [{"line": error.line, "error": error.error} for error in dto.errors],
+        "job_ids": [str(job_id) for job_id in dto.job_ids],
+    }
+
+
+async def _import_records(request: Request):
+    """Validated ``(line, dto)`` records of an NDJSON body, or ``(line, error)`` for rejected lines"""
+    async for line, value, error in iter_ndjson(request.stream()):
+        if error is None:
+            try:
+                value = record_to_create_dto(value)
+            except ValueError as e:
+                error = str(e)
+        yield line, error if error is not None else value
+
+
 @router.post("/")
 async def create_asset(
     request: CreateAssetRequestDto,
     service: AssetService = Depends(),
 ):
     asset = await service.create_asset(request)
-    dto = asset_to_response_dto(asset)
+    dto = asset_to_response_dto(asset, service.indexing_job)
     return asset_response_dto_to_dict(dto)
 
 
@@ -62,6 +121,16 @@ async def list_assets(
     return [asset_response_dto_to_dict(dto) for dto in dtos]
 
 
+@router.post("/import")
+async def import_assets(
+    request: Request,
+    service: AssetService = Depends(),
+):
+    """Bulk-create assets from a newline-delimited JSON body, one asset object per line"""
+    result = await service.import_assets(_import_records(request))
+    return import_result_dto_to_dict(result)
+
+
 @router.get("/{asset_id}")
 async def get_asset(
     asset_id: UUID,
@@ -82,7 +151,7 @@ async def update_asset(
     service: AssetService = Depends(),
 ):
     asset = await service.update_asset(asset_id, request)
-    dto = asset_to_response_dto(asset)
+    dto = asset_to_response_dto(asset, service.indexing_job)
     return asset_response_dto_to_dict(dto)
 
 
@@ -101,5 +170,5 @@ async def restore_asset(
     service: AssetService = Depends(),
 ):
     asset = await service.restore_asset(asset_id)
-    dto = asset_to_response_dto(asset)
+    dto = asset_to_response_dto(asset, service.indexing_job)
     return asset_response_dto_to_dict(dto)
@@ -0,0 +1,46 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from uuid import UUID
+from src.application.jobs.job_queue import JobQueue
+from src.application.integration.dependencies import get_job_queue
+from src.application.dtos.job_dtos import JobResponseDto
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_to_response_dto(job) -> JobResponseDto:
+    """Convert job entity to response DTO"""
+    return JobResponseDto(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        asset_id=job.asset_id,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+def job_response_dto_to_dict(dto: JobResponseDto) -> dict:
+    """Convert JobResponseDto to API response dict"""
+    return {
+        "id": str(dto.id),
+        "kind": dto.kind,
+        "status": dto.status.value,
+        "attempts": dto.attempts,
+        "asset_id": str(dto.asset_id) if dto.asset_id else None,
+        "error": dto.error,
+        "created_at": dto.created_at.isoformat() if dto.created_at else None,
+        "started_at": dto.started_at.isoformat() if dto.started_at else None,
+        "finished_at": dto.finished_at.isoformat() if dto.finished_at else None,
+    }
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: UUID, jobs: Optional[JobQueue] = Depends(get_job_queue)):
+    job = jobs.get(job_id) if jobs is not None else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response_dto_to_dict(job_to_response_dto(job))
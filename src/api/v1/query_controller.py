@@ -1,5 +1,9 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from uuid import UUID
+from src.domain.enums.asset_type import AssetType
 from src.application.services.query_service import QueryService
 from src.application.dtos.query_dtos import (
     QueryRequestDto,
@@ -14,20 +18,101 @@ router = APIRouter(prefix="/queries", tags=["queries"])
 async def query(
     domain_id: UUID,
     text: str,
+    mode: str = "hybrid",
+    top_k: int = Query(5, ge=1, le=50),
+    category_id: Optional[UUID] = None,
+    asset_type: Optional[AssetType] = None,
+    mmr_lambda: Optional[float] = Query(None, ge=0.0, le=1.0),
     service: QueryService = Depends(),
 ):
     # Create request DTO
-    request_dto = QueryRequestDto(domain_id=domain_id, text=text)
+    request_dto = QueryRequestDto(
+        domain_id=domain_id,
+        text=text,
+        mode=mode,
+        top_k=top_k,
+        category_id=category_id,
+        asset_type=asset_type,
+        mmr_lambda=mmr_lambda,
+    )
     
     # Call service with DTO
-    answer, assets = service.query(request_dto)
+    answer, hits = await service.query(request_dto)
     
-    # Create response DTO
-    asset_summaries = [AssetSummaryDto(id=a.id, name=a.name) for a in assets]
+    # Create response DTO, keeping retrieval rank order
+    asset_summaries = [AssetSummaryDto(id=a.id, name=a.name, score=score) for a, score in hits]
     response_dto = QueryResponseDto(answer=answer, assets=asset_summaries)
     
     # Convert to dict for API response
     return {
         "answer": response_dto.answer,
-        "assets": [{"id": str(asset.id), "name": asset.name} for asset in response_dto.assets],
+        "assets": [
+            {"id": str(asset.id), "name": asset.name, "score": asset.score}
+            for asset in response_dto.assets
+        ],
     }
+
+
+@router.get("/stream")
+async def query_stream(
+    request: Request,
+    domain_id: UUID,
+    text: str,
+    mode: str = "hybrid",
+    top_k: int = Query(5, ge=1, le=50),
+    category_id: Optional[UUID] = None,
+    asset_type: Optional[AssetType] = None,
+    mmr_lambda: Optional[float] = Query(None, ge=0.0, le=1.0),
+    service: QueryService = Depends(),
+):
+    """Server-Sent Events variant of ``query``.
+
+    Emits one ``sources`` event with the retrieved assets, then a ``token``
+    event per answer piece and a final ``done`` event. Retrieval runs before
+    the response starts, so bad requests still get a normal HTTP error.
+    """
+    request_dto = QueryRequestDto(
+        domain_id=domain_id,
+        text=text,
+        mode=mode,
+        top_k=top_k,
+        category_id=category_id,
+        asset_type=asset_type,
+        mmr_lambda=mmr_lambda,
+    )
+    events = service.stream(request_dto)
+    first = await anext(events)
+
+    async def event_stream():
+        try:
+            event = first
+            while True:
+                name, data = event
+                if name == "sources":
+                    summaries = [AssetSummaryDto(id=a.id, name=a.name, score=score) for a, score in data]
+                    payload = {"assets": [{"id": str(s.id), "name": s.name, "score": s.score} for s in summaries]}
+                else:
+                    payload = {"text": data}
+                yield _sse(name, payload)
+                # Stop pulling upstream tokens once the client has gone away
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await anext(events)
+                except StopAsyncIteration:
+                    break
+            yield _sse("done", {})
+        except RuntimeError as e:
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
@@ -0,0 +1,11 @@
+"""Application caching - Query answer and embedding cache contracts"""
+
+from .answer_cache import AnswerCache, CachedAnswer
+from .embedding_cache import EmbeddingCache, embedding_key
+
+__all__ = [
+    "AnswerCache",
+    "CachedAnswer",
+    "EmbeddingCache",
+    "embedding_key",
+]
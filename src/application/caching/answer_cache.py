@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Hashable
+from uuid import UUID
+
+
+@dataclass
+class CachedAnswer:
+    """A completed answer and the ``(asset_id, score)`` sources it was built from, best first"""
+    answer: str
+    sources: list[tuple[UUID, float]]
+
+
+class AnswerCache(ABC):
+    @abstractmethod
+    def get(self, domain_id: UUID, key: Hashable) -> CachedAnswer | None:
+        """Return the answer cached for ``key`` within a domain, unless expired or stale."""
+        pass
+
+    @abstractmethod
+    def version(self, domain_id: UUID) -> int:
+        """The domain's current version; read it before retrieving so a later put can detect invalidation."""
+        pass
+
+    @abstractmethod
+    def put(self, domain_id: UUID, key: Hashable, answer: CachedAnswer, version: int | None = None) -> None:
+        """Cache an answer against the domain's current version.
+
+        With ``version``, the answer is dropped if the domain was invalidated
+        since that version was read, since it may be built from stale data.
+        """
+        pass
+
+    @abstractmethod
+    def get_similar(self, domain_id: UUID, scope: Hashable, embedding: list[float]) -> CachedAnswer | None:
+        """Return an answer cached within ``scope`` for a question whose embedding is close enough.
+
+        ``scope`` groups questions whose answers are interchangeable (e.g.
+        the same retrieval options). Returns ``None`` when semantic caching
+        is disabled.
+        """
+        pass
+
+    @abstractmethod
+    def put_similar(
+        self, domain_id: UUID, scope: Hashable, embedding: list[float], answer: CachedAnswer, version: int | None = None
+    ) -> None:
+        """Remember an answer under its question embedding for :meth:`get_similar`; ``version`` as for :meth:`put`."""
+        pass
+
+    @abstractmethod
+    def invalidate(self, domain_id: UUID) -> None:
+        """Bump the domain's version so every answer cached for it, exact or semantic, is stale."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        pass
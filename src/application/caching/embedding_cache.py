@@ -0,0 +1,47 @@
+import hashlib
+import unicodedata
+from abc import ABC, abstractmethod
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Cache key of ``text`` embedded by ``model``: SHA-256 of the model and normalized text.
+
+    Normalization is Unicode NFC plus whitespace collapsing only, so the
+    key never merges texts the model could embed differently.
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).digest()
+
+
+class EmbeddingCache(ABC):
+    @abstractmethod
+    def get(self, key: bytes) -> list[float] | None:
+        """Return the embedding stored under ``key``, if any."""
+        pass
+
+    @abstractmethod
+    def put(self, key: bytes, embedding: list[float]) -> None:
+        """Store an embedding under ``key``."""
+        pass
+
+    def peek_many(self, keys: list[bytes]) -> list[list[float] | None]:
+        """Embeddings of ``keys`` found without blocking I/O, ``None`` elsewhere; safe on the event loop."""
+        return [None] * len(keys)
+
+    def load_many(self, keys: list[bytes]) -> list[list[float] | None]:
+        """Look up ``keys`` that :meth:`peek_many` missed; may block, so async callers run it in a thread."""
+        return [self.get(key) for key in keys]
+
+    def remember_many(self, entries: list[tuple[bytes, list[float]]]) -> None:
+        """Store entries in the tier :meth:`peek_many` reads; safe on the event loop."""
+        pass
+
+    def store_many(self, entries: list[tuple[bytes, list[float]]]) -> None:
+        """Store entries durably; may block, so async callers run it in a thread."""
+        for key, embedding in entries:
+            self.put(key, embedding)
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Hit/miss counters per tier."""
+        pass
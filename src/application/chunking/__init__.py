@@ -0,0 +1,7 @@
+"""Application chunking - Splitting asset content into embeddable chunks"""
+
+from .chunker import Chunker
+
+__all__ = [
+    "Chunker",
+]
@@ -0,0 +1,100 @@
+import re
+from typing import Iterator
+from uuid import UUID
+from src.domain.entities.chunk import Chunk, chunk_id
+
+# Preferred cut points, strongest first: paragraph breaks, sentence ends
+# (Latin and Arabic punctuation), clause punctuation, then any whitespace.
+# A chunk ends before the ``gap`` group and the next one may begin after it.
+_BOUNDARIES = (
+    re.compile(r"(?P<gap>\n\s*\n\s*)"),
+    re.compile(r"[.!?؟۔…]+[\"'»”)]*(?P<gap>\s+)"),
+    re.compile(r"[,;:،؛](?P<gap>\s+)"),
+    re.compile(r"(?P<gap>\s+)"),
+)
+
+# Arabic tashkeel and the superscript alef attach to the preceding letter
+_COMBINING = re.compile(r"[ً-ٰٟ]")
+
+
+class Chunker:
+    """Streams overlapping chunks of at most ``max_chars`` characters.
+
+    Cuts prefer the strongest boundary in the second half of the window:
+    a paragraph break, then a sentence end (``.``, ``؟``, ``۔`` ...), then
+    clause punctuation (``،``, ``؛`` ...), then whitespace. Only a run with
+    no whitespace at all is cut mid-word, and never between an Arabic
+    letter and its diacritics. Consecutive chunks share up to ``overlap``
+    characters, starting on a word boundary.
+
+    Boundaries are searched in place with ``pattern.finditer(text, pos,
+    endpos)``, so the only strings built are the chunks themselves, one at
+    a time as the generator is consumed.
+    """
+
+    def __init__(self, max_chars: int = 1500, overlap: int = 200) -> None:
+        if max_chars < 1:
+            raise ValueError("max_chars must be at least 1")
+        if not 0 <= overlap < max_chars:
+            raise ValueError("overlap must be at least 0 and below max_chars")
+        self.max_chars = max_chars
+        self.overlap = overlap
+
+    def chunks(self, asset_id: UUID, content: str) -> Iterator[Chunk]:
+        """Yield the chunks of an asset's content, with stable ids and character offsets."""
+        for position, (start, end) in enumerate(self.spans(content)):
+            yield Chunk(
+                asset_id=asset_id,
+                text=content[start:end],
+                id=chunk_id(asset_id, position),
+                position=position,
+                start=start,
+                end=end,
+            )
+
+    def spans(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield ``(start, end)`` offsets of each chunk, trimmed of surrounding whitespace."""
+        start = self._skip_space(text, 0, len(text))
+        while start < len(text):
+            limit = start + self.max_chars
+            if limit >= len(text):
+                end = next_start = len(text)
+            else:
+                end, next_start = self._cut(text, start, limit)
+            yield start, self._trim_end(text, start, end)
+            if next_start >= len(text):
+                return
+            start = self._skip_space(text, self._overlap_start(text, start, end, next_start), len(text))
+
+    def _cut(self, text: str, start: int, limit: int) -> tuple[int, int]:
+        """Best ``(end, next_start)`` for a chunk starting at ``start`` that may not pass ``limit``."""
+        floor = start + self.max_chars // 2
+        for boundary in _BOUNDARIES:
+            last = None
+            for last in boundary.finditer(text, floor, limit + 1):
+                pass
+            if last is not None and last.start("gap") > start:
+                return last.start("gap"), last.end()
+        end = limit
+        while end > start + 1 and _COMBINING.match(text, end):
+            end -= 1
+        return end, end
+
+    def _overlap_start(self, text: str, start: int, end: int, next_start: int) -> int:
+        """Where the next chunk begins: up to ``overlap`` characters back, on a word boundary."""
+        if self.overlap == 0 or end - start <= self.overlap:
+            return next_start
+        space = _BOUNDARIES[-1].search(text, end - self.overlap, end)
+        return space.end() if space is not None else next_start
+
+    @staticmethod
+    def _skip_space(text: str, pos: int, endpos: int) -> int:
+        while pos < endpos and text[pos].isspace():
+            pos += 1
+        return pos
+
+    @staticmethod
+    def _trim_end(text: str, start: int, end: int) -> int:
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return end
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from src.domain.enums.asset_type import AssetType
 
@@ -35,3 +35,20 @@ class AssetResponseDto:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None
+    job_id: Optional[UUID] = None
+
+
+@dataclass
+class AssetImportErrorDto:
+    """DTO for one rejected record of a bulk import"""
+    line: int
+    error: str
+
+
+@dataclass
+class AssetImportResultDto:
+    """DTO for the outcome of a bulk import"""
+    imported: int = 0
+    failed: int = 0
+    errors: List[AssetImportErrorDto] = field(default_factory=list)
+    job_ids: List[UUID] = field(default_factory=list)
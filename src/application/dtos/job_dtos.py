@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from uuid import UUID
+from typing import Optional
+from datetime import datetime
+from src.domain.enums.job_status import JobStatus
+
+
+@dataclass
+class JobResponseDto:
+    """DTO for background job status"""
+    id: UUID
+    kind: str
+    status: JobStatus
+    attempts: int
+    asset_id: Optional[UUID] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
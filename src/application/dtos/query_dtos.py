@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from uuid import UUID
-from typing import List
+from typing import List, Optional
+from src.domain.enums.asset_type import AssetType
 
 
 @dataclass 
@@ -8,6 +9,11 @@ class QueryRequestDto:
     """DTO for query request"""
     domain_id: UUID
     text: str
+    mode: str = "hybrid"
+    top_k: int = 5
+    category_id: Optional[UUID] = None
+    asset_type: Optional[AssetType] = None
+    mmr_lambda: Optional[float] = None
 
 
 @dataclass
@@ -15,6 +21,7 @@ class AssetSummaryDto:
     """DTO for asset summary in query response"""
     id: UUID
     name: str
+    score: Optional[float] = None
 
 
 @dataclass
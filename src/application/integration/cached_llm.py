@@ -0,0 +1,107 @@
+import asyncio
+from typing import AsyncIterator, Callable, Generator
+from ..caching.embedding_cache import EmbeddingCache, embedding_key
+from .llm_provider import LLMProvider
+
+
+class CachedEmbeddingLLM(LLMProvider):
+    """Provider decorator that answers repeated ``embed`` calls from an :class:`EmbeddingCache`.
+
+    Keys combine the wrapped provider's ``embedding_model`` with a hash of
+    the text, so switching models never returns stale vectors. Completions
+    pass straight through.
+
+    The async methods only consult the cache's in-memory tier on the event
+    loop; disk lookups and writes run in a worker thread.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: EmbeddingCache) -> None:
+        self.provider = provider
+        self.cache = cache
+
+    @property
+    def embedding_model(self) -> str:
+        return self.provider.embedding_model
+
+    def complete(self, prompt: str) -> str:
+        return self.provider.complete(prompt)
+
+    async def acomplete(self, prompt: str) -> str:
+        return await self.provider.acomplete(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        async for piece in self.provider.astream(prompt):
+            yield piece
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+    def embed(self, text: str) -> list[float]:
+        return self._embed_cached([text], lambda texts: [self.provider.embed(texts[0])])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Serve cached texts and embed only the misses, in one provider call."""
+        return self._embed_cached(texts, self.provider.embed_many)
+
+    def _embed_cached(
+        self, texts: list[str], embed_many: Callable[[list[str]], list[list[float]]]
+    ) -> list[list[float]]:
+        """Run :meth:`_embed_steps` inline, embedding misses with ``embed_many``."""
+        steps = self._embed_steps(texts)
+        try:
+            step, arg = next(steps)
+            while True:
+                if step == "load":
+                    result = self.cache.load_many(arg)
+                elif step == "embed":
+                    result = embed_many(arg)
+                else:
+                    result = self.cache.store_many(arg)
+                step, arg = steps.send(result)
+        except StopIteration as done:
+            return done.value
+
+    async def aembed(self, text: str) -> list[float]:
+        return (await self.aembed_many([text]))[0]
+
+    async def aembed_many(self, texts: list[str]) -> list[list[float]]:
+        steps = self._embed_steps(texts)
+        try:
+            step, arg = next(steps)
+            while True:
+                if step == "load":
+                    result = await asyncio.to_thread(self.cache.load_many, arg)
+                elif step == "embed":
+                    result = await self.provider.aembed_many(arg)
+                else:
+                    result = await asyncio.to_thread(self.cache.store_many, arg)
+                step, arg = steps.send(result)
+        except StopIteration as done:
+            return done.value
+
+    def _embed_steps(self, texts: list[str]) -> Generator[tuple[str, list], list | None, list[list[float]]]:
+        """Hit/miss logic shared by :meth:`embed_many` and :meth:`aembed_many`.
+
+        Checks the in-memory tier inline and yields each blocking step as
+        ``(step, argument)`` for the caller to run and send back the result:
+        ``("load", keys)`` for the disk tier, ``("embed", texts)`` for the
+        provider and ``("store", entries)`` to persist new vectors. Returns
+        the embeddings in input order.
+        """
+        keys = [embedding_key(self.embedding_model, text) for text in texts]
+        embeddings = self.cache.peek_many(keys)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            loaded = yield "load", [keys[i] for i in missing]
+            for i, embedding in zip(missing, loaded):
+                embeddings[i] = embedding
+            missing = [i for i in missing if embeddings[i] is None]
+        if missing:
+            fresh = yield "embed", [texts[i] for i in missing]
+            entries = []
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+                entries.append((keys[i], embedding))
+            self.cache.remember_many(entries)
+            yield "store", entries
+        return embeddings
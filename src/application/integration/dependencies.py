@@ -1,44 +1,269 @@
 """Application integration dependencies - external service providers"""
 
-from typing import Optional
-from fastapi import Depends
+from typing import Optional, TypeVar
+from fastapi import Depends, params
 from src.common.config import get_settings
 from ..integration.llm_provider import LLMProvider
+from ..integration.embedding_batcher import EmbeddingBatcher
 from ..vectordb.vector_db import VectorDB
+from ..retrieval.lexical_index import LexicalIndex
+from ..caching.answer_cache import AnswerCache
+from ..caching.embedding_cache import EmbeddingCache
+from ..prompting.prompt_builder import PromptBuilder
+from ..chunking.chunker import Chunker
+from ..jobs.job_queue import JobQueue
+
+# Singleton vector DB instance so in-process indexes and client pools outlive a request
+T = TypeVar("T")
+
+_vector_db_instance = None
+_llm_provider_instance = None
+_lexical_index_instance = None
+_answer_cache_instance = None
+_embedding_cache_instance = None
+_embedding_batcher_instance = None
+_prompt_builder_instance = None
+_job_queue_instance = None
+
+
+def resolved(dependency: T | params.Depends) -> T | None:
+    """An optional collaborator, or None when a service built outside FastAPI left its ``Depends`` default"""
+    return None if isinstance(dependency, params.Depends) else dependency
 
 
 def get_llm_provider() -> Optional[LLMProvider]:
-    """Get LLM provider implementation based on configuration"""
+    """Get LLM provider implementation based on configuration, behind the embedding cache if enabled
+
+    The provider is a singleton so its HTTP connection pool is shared by every request.
+    """
+    global _llm_provider_instance
+    if _llm_provider_instance is not None:
+        return _llm_provider_instance
+
     settings = get_settings()
     provider_name = getattr(settings, 'LLM_PROVIDER', 'openai')
     
     if provider_name.lower() == "openai":
         from src.infrastructure_integration.openai_llm import OpenAILLM
-        return OpenAILLM()
+        provider = OpenAILLM(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_API_BASE,
+            model=settings.OPENAI_MODEL,
+            embed_model=settings.OPENAI_EMBED_MODEL,
+            timeout=settings.OPENAI_TIMEOUT,
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            http2=settings.OPENAI_HTTP2,
+        )
     elif provider_name.lower() == "cohere":
         from src.infrastructure_integration.cohere_llm import CohereLLM
-        return CohereLLM()
-    return None
+        provider = CohereLLM()
+    else:
+        return None
+
+    embedding_cache = get_embedding_cache()
+    if embedding_cache is not None:
+        from .cached_llm import CachedEmbeddingLLM
+        provider = CachedEmbeddingLLM(provider, embedding_cache)
+    _llm_provider_instance = provider
+    return _llm_provider_instance
+
+
+async def close_llm_provider() -> None:
+    """Close the LLM provider's connection pool at shutdown"""
+    global _llm_provider_instance, _embedding_batcher_instance
+    if _llm_provider_instance is not None:
+        await _llm_provider_instance.aclose()
+    _llm_provider_instance = None
+    _embedding_batcher_instance = None
+
+
+def get_embedding_batcher() -> Optional[EmbeddingBatcher]:
+    """Get the process-wide embedding micro-batcher, if enabled and an LLM provider is configured"""
+    global _embedding_batcher_instance
+    settings = get_settings()
+    if not getattr(settings, 'EMBED_BATCHING', True):
+        return None
+    if _embedding_batcher_instance is None:
+        provider = get_llm_provider()
+        if provider is None:
+            return None
+        _embedding_batcher_instance = EmbeddingBatcher(
+            provider,
+            max_batch_size=settings.EMBED_BATCH_SIZE,
+            max_delay_ms=settings.EMBED_BATCH_DELAY_MS,
+        )
+    return _embedding_batcher_instance
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache, if enabled"""
+    global _embedding_cache_instance
+    settings = get_settings()
+    if not getattr(settings, 'EMBEDDING_CACHE', True):
+        return None
+    if _embedding_cache_instance is None:
+        from src.infrastructure_cache.tiered_embedding_cache import TieredEmbeddingCache
+        _embedding_cache_instance = TieredEmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            path=settings.EMBEDDING_CACHE_PATH,
+        )
+    return _embedding_cache_instance
 
 
 def get_vector_db() -> VectorDB:
-    """Get vector database implementation based on configuration"""
+    """Get vector database implementation based on configuration, chunk-aware if chunking is enabled"""
+    global _vector_db_instance
     from src.domain.persistence.dependencies import get_asset_repository
     
+    if _vector_db_instance is not None:
+        return _vector_db_instance
+
     settings = get_settings()
     vector_db_name = getattr(settings, 'VECTOR_DB', 'memory')
     asset_repo = get_asset_repository()
     
     if vector_db_name.lower() == "qdrant":
         from src.infrastructure_vectordb.qdrant_vector_db import QdrantVectorDB
-        return QdrantVectorDB(asset_repo)
+        vector_db = QdrantVectorDB(
+            url=settings.QDRANT_URL,
+            api_key=settings.QDRANT_API_KEY,
+            collection=settings.QDRANT_COLLECTION,
+            asset_repo=asset_repo,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            pool_size=settings.QDRANT_POOL_SIZE,
+            batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+            layout=settings.QDRANT_LAYOUT,
+        )
+    elif vector_db_name.lower() == "hnsw":
+        from src.infrastructure_vectordb.hnsw_vector_db import HNSWVectorDB
+        vector_db = HNSWVectorDB(
+            asset_repo,
+            m=settings.HNSW_M,
+            ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            ef_search=settings.HNSW_EF_SEARCH,
+            compact_ratio=settings.VECTOR_COMPACT_RATIO,
+        )
     else:
         from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
-        return MemoryVectorDB(asset_repo)
+        vector_db = MemoryVectorDB(
+            asset_repo,
+            quantization=settings.VECTOR_QUANTIZATION or None,
+            storage_dir=settings.VECTOR_STORAGE_DIR,
+            oversample=settings.VECTOR_RESCORE_OVERSAMPLE,
+            persistent=settings.VECTOR_PERSIST,
+            segment_rows=settings.VECTOR_SEGMENT_ROWS,
+            max_segments=settings.VECTOR_MAX_SEGMENTS,
+            shards=settings.VECTOR_SHARDS,
+            search_threads=settings.VECTOR_SEARCH_THREADS,
+            compact_ratio=settings.VECTOR_COMPACT_RATIO,
+        )
+
+    if getattr(settings, 'CHUNKING', False):
+        from src.infrastructure_vectordb.chunked_vector_db import ChunkedVectorDB
+        vector_db = ChunkedVectorDB(vector_db, asset_repo, oversample=settings.CHUNK_SEARCH_OVERSAMPLE)
+    _vector_db_instance = vector_db
+    return _vector_db_instance
+
+
+def get_chunker() -> Optional[Chunker]:
+    """Get the content chunker used when embedding assets, if chunking is enabled"""
+    settings = get_settings()
+    if not getattr(settings, 'CHUNKING', False):
+        return None
+    return Chunker(max_chars=settings.CHUNK_SIZE, overlap=settings.CHUNK_OVERLAP)
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Get the keyword index used for hybrid retrieval, if enabled"""
+    global _lexical_index_instance
+    settings = get_settings()
+    if not getattr(settings, 'HYBRID_SEARCH', False):
+        return None
+    if _lexical_index_instance is None:
+        from src.infrastructure_lexical.memory_bm25_index import MemoryBM25Index
+        _lexical_index_instance = MemoryBM25Index(reload_seconds=settings.HYBRID_RELOAD_SECONDS)
+    return _lexical_index_instance
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Get the process-wide query answer cache, if enabled"""
+    global _answer_cache_instance
+    settings = get_settings()
+    if not getattr(settings, 'ANSWER_CACHE', False):
+        return None
+    if _answer_cache_instance is None:
+        from src.infrastructure_cache.memory_answer_cache import MemoryAnswerCache
+        _answer_cache_instance = MemoryAnswerCache(
+            max_entries=settings.ANSWER_CACHE_SIZE,
+            ttl_seconds=settings.ANSWER_CACHE_TTL,
+            semantic_threshold=settings.SEMANTIC_CACHE_THRESHOLD if settings.SEMANTIC_CACHE else None,
+            semantic_entries=settings.SEMANTIC_CACHE_SIZE,
+            version_dir=getattr(settings, 'ANSWER_CACHE_VERSION_DIR', None),
+        )
+    return _answer_cache_instance
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Get the process-wide prompt builder, sharing its token count cache across requests"""
+    global _prompt_builder_instance
+    if _prompt_builder_instance is None:
+        from src.common.tokens import TokenCounter
+        settings = get_settings()
+        _prompt_builder_instance = PromptBuilder(
+            token_budget=settings.PROMPT_TOKEN_BUDGET,
+            passage_tokens=settings.PROMPT_PASSAGE_TOKENS,
+            counter=TokenCounter(settings.PROMPT_TOKEN_ENCODING),
+        )
+    return _prompt_builder_instance
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """Get the process-wide background ingestion queue, if enabled"""
+    global _job_queue_instance
+    settings = get_settings()
+    if not getattr(settings, 'INGESTION_QUEUE', False):
+        return None
+    if _job_queue_instance is None:
+        _job_queue_instance = JobQueue(
+            workers=settings.INGESTION_WORKERS,
+            max_pending=settings.INGESTION_MAX_PENDING,
+            max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+            retry_delay=settings.INGESTION_RETRY_DELAY,
+            limit_concurrency=settings.INGESTION_PROVIDER_CONCURRENCY,
+        )
+    return _job_queue_instance
+
+
+async def close_job_queue() -> None:
+    """Let queued ingestion jobs finish, then stop the workers at shutdown"""
+    global _job_queue_instance
+    if _job_queue_instance is not None:
+        await _job_queue_instance.close(timeout=get_settings().INGESTION_SHUTDOWN_TIMEOUT)
+    _job_queue_instance = None
+
+
+async def close_vector_db() -> None:
+    """Release the vector DB's files, threads and connections at shutdown"""
+    global _vector_db_instance
+    if _vector_db_instance is not None:
+        await _vector_db_instance.close()
+    _vector_db_instance = None
 
 
 # Application integration exports
 __all__ = [
+    "resolved",
     "get_llm_provider",
+    "close_llm_provider",
     "get_vector_db",
+    "get_chunker",
+    "get_lexical_index",
+    "get_answer_cache",
+    "get_embedding_cache",
+    "get_embedding_batcher",
+    "get_prompt_builder",
+    "get_job_queue",
+    "close_job_queue",
+    "close_vector_db",
 ]
@@ -0,0 +1,78 @@
+import asyncio
+
+from .llm_provider import LLMProvider
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batched provider calls.
+
+    Texts requested while a batch is open are queued; the batch is sent as
+    one ``embed_many`` call when it reaches ``max_batch_size`` texts or
+    ``max_delay_ms`` after its first text, whichever comes first. Each
+    caller awaits only its own vectors. Duplicate texts within a batch are
+    embedded once, and a provider error fails every caller of that batch.
+
+    Batches are sent with the provider's async ``aembed_many``, so the
+    event loop keeps serving other requests while they are in flight.
+    """
+
+    def __init__(self, provider: LLMProvider, max_batch_size: int = 64, max_delay_ms: float = 5.0) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.provider = provider
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+    @property
+    def embedding_model(self) -> str:
+        return self.provider.embedding_model
+
+    async def embed(self, text: str) -> list[float]:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Queue ``texts`` and return their embeddings, in order."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            embeddings = await self.provider.aembed_many(unique)
+            if len(embeddings) != len(unique):
+                raise RuntimeError(f"Expected {len(unique)} embeddings, got {len(embeddings)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_text = dict(zip(unique, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
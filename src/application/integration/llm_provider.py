@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class LLMProvider(ABC):
@@ -11,3 +13,45 @@ class LLMProvider(ABC):
     def embed(self, text: str) -> list[float]:
         """Generate an embedding vector for the given text."""
         pass
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts, in order.
+
+        Providers whose API accepts a batch override this to make one
+        request; the default embeds one text at a time.
+        """
+        return [self.embed(text) for text in texts]
+
+    async def acomplete(self, prompt: str) -> str:
+        """Async :meth:`complete`.
+
+        Network-bound providers override the async methods with native
+        implementations; the defaults run the sync method in a worker
+        thread so the event loop is never blocked.
+        """
+        return await asyncio.to_thread(self.complete, prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the completion for ``prompt`` piece by piece as the model produces it.
+
+        Closing the iterator early must stop the upstream generation.
+        Providers without streaming support yield the whole completion once.
+        """
+        yield await self.acomplete(prompt)
+
+    async def aembed(self, text: str) -> list[float]:
+        """Async :meth:`embed`."""
+        return await asyncio.to_thread(self.embed, text)
+
+    async def aembed_many(self, texts: list[str]) -> list[list[float]]:
+        """Async :meth:`embed_many`."""
+        return await asyncio.to_thread(self.embed_many, texts)
+
+    async def aclose(self) -> None:
+        """Release pooled connections; called once at shutdown."""
+        pass
+
+    @property
+    def embedding_model(self) -> str:
+        """Identifier of the model behind :meth:`embed`, stored with persisted embeddings."""
+        return type(self).__name__
@@ -0,0 +1,7 @@
+"""Application jobs - Background work queue"""
+
+from .job_queue import JobQueue
+
+__all__ = [
+    "JobQueue",
+]
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import weakref
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+from uuid import UUID
+from src.common.logging import logger
+from src.domain.entities.job import Job
+from src.domain.enums.job_status import JobStatus
+
+JobRun = Callable[[], Awaitable[None]]
+
+
+class JobQueue:
+    """Bounded asyncio queue of background jobs drained by a pool of workers.
+
+    ``submit`` never waits: once ``max_pending`` jobs are queued it raises
+    :class:`asyncio.QueueFull`, so callers can push back on clients instead
+    of buffering without bound. ``workers`` tasks run jobs concurrently,
+    and jobs sharing a ``limit`` key (e.g. one embedding provider) run at
+    most ``limit_concurrency`` at a time.
+
+    Jobs with the same ``key`` (e.g. one asset) never run concurrently, and
+    submitting while one is still queued returns that job instead of adding
+    another; job functions should read current state when they run, so the
+    queued job covers both submissions.
+
+    A failed attempt is retried up to ``max_attempts`` times after an
+    exponential, jittered delay starting at ``retry_delay`` seconds and
+    capped at ``max_retry_delay``. Waiting retries do not hold a worker.
+    The last ``history`` jobs stay readable through :meth:`get`.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_pending: int = 1000,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        limit_concurrency: int = 4,
+        history: int = 10000,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.limit_concurrency = limit_concurrency
+        self.history = history
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._jobs: OrderedDict[UUID, Job] = OrderedDict()
+        self._latest: dict[Hashable, Job] = {}
+        self._keys: dict[UUID, Hashable] = {}
+        self._key_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._limits: dict[Hashable, asyncio.Semaphore] = {}
+        self.retried = 0
+
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(
+        self,
+        kind: str,
+        run: JobRun,
+        key: Hashable | None = None,
+        limit: Hashable | None = None,
+        asset_id: UUID | None = None,
+    ) -> Job:
+        """Queue ``run`` and return its job; raises :class:`asyncio.QueueFull` when at capacity."""
+        pending = self._latest.get(key) if key is not None else None
+        if pending is not None and pending.status == JobStatus.QUEUED:
+            return pending
+        self._start()
+        job = Job(kind=kind, asset_id=asset_id)
+        self._queue.put_nowait((job, run, key, limit))
+        self._remember(job, key)
+        return job
+
+    async def enqueue(
+        self,
+        kind: str,
+        run: JobRun,
+        limit: Hashable | None = None,
+        asset_id: UUID | None = None,
+    ) -> Job:
+        """Like :meth:`submit` without a key, but waits for room instead of raising.
+
+        For producers that can slow down, such as a streamed upload, so a
+        full queue throttles the producer rather than rejecting its work.
+        """
+        self._start()
+        job = Job(kind=kind, asset_id=asset_id)
+        await self._queue.put((job, run, None, limit))
+        self._remember(job, None)
+        return job
+
+    def get(self, job_id: UUID) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def latest(self, key: Hashable) -> Job | None:
+        """The most recent job submitted under ``key``."""
+        return self._latest.get(key)
+
+    async def join(self) -> None:
+        """Wait until every queued job, including waiting retries, has finished."""
+        while self._queue is not None:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Give queued jobs ``timeout`` seconds to finish, then stop the workers."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping job queue with %d jobs still queued", self._queue.qsize())
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks, self._retries, self._queue = [], set(), None
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            "workers": self.workers,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "retried": self.retried,
+            "jobs": counts,
+        }
+
+    def _start(self) -> None:
+        """Create the queue and workers on first use, inside the running event loop."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{n}") for n in range(self.workers)]
+
+    async def _work(self) -> None:
+        while True:
+            job, run, key, limit = await self._queue.get()
+            try:
+                await self._attempt(job, run, key, limit)
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, job: Job, run: JobRun, key: Hashable | None, limit: Hashable | None) -> None:
+        lock = self._key_lock(key)
+        semaphore = self._limit(limit)
+        async with lock, semaphore:
+            job.start()
+            try:
+                await run()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if job.attempts >= self.max_attempts:
+                    logger.warning("Job %s (%s) failed after %d attempts: %s", job.id, job.kind, job.attempts, error)
+                    job.finish(error)
+                    return
+                job.retry(error)
+                self.retried += 1
+                delay = min(self.retry_delay * 2 ** (job.attempts - 1), self.max_retry_delay)
+                task = asyncio.create_task(self._requeue(random.uniform(delay / 2, delay), (job, run, key, limit)))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+                return
+            job.finish()
+
+    async def _requeue(self, delay: float, entry: tuple) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(entry)
+
+    def _key_lock(self, key: Hashable | None) -> asyncio.Lock:
+        if key is None:
+            return asyncio.Lock()
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = self._key_locks[key] = asyncio.Lock()
+        return lock
+
+    def _limit(self, limit: Hashable | None) -> asyncio.Semaphore:
+        if limit is None:
+            return asyncio.Semaphore(self.limit_concurrency)
+        semaphore = self._limits.get(limit)
+        if semaphore is None:
+            semaphore = self._limits[limit] = asyncio.Semaphore(self.limit_concurrency)
+        return semaphore
+
+    def _remember(self, job: Job, key: Hashable | None) -> None:
+        self._jobs[job.id] = job
+        if key is not None:
+            self._latest[key] = job
+            self._keys[job.id] = key
+        while len(self._jobs) > self.history:
+            oldest = next(iter(self._jobs.values()))
+            if not oldest.is_finished():
+                break
+            del self._jobs[oldest.id]
+            oldest_key = self._keys.pop(oldest.id, None)
+            if oldest_key is not None and self._latest.get(oldest_key) is oldest:
+                del self._latest[oldest_key]
+
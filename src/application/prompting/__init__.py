@@ -0,0 +1,8 @@
+"""Application prompting - Retrieval-augmented prompt assembly"""
+
+from .prompt_builder import BuiltPrompt, PromptBuilder
+
+__all__ = [
+    "BuiltPrompt",
+    "PromptBuilder",
+]
@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass, field
+from uuid import UUID
+from src.common.text import normalize_text, tokenize
+from src.common.tokens import TokenCounter
+from src.domain.entities.asset import Asset
+
+DEFAULT_TEMPLATE = (
+    "Answer the question using only the context below. "
+    "If the context does not contain the answer, say that you don't know.\n\n"
+    "Context:\n{context}\n\n"
+    "Question: {question}\n"
+    "Answer:"
+)
+
+# Paragraph breaks first, then sentence ends (Latin and Arabic punctuation)
+_PARAGRAPHS = re.compile(r"\n\s*\n")
+_SENTENCES = re.compile(r"(?<=[.!?؟۔])\s+")
+
+# Word n-gram size used to detect passages that repeat already packed text
+SHINGLE_SIZE = 5
+
+
+@dataclass
+class BuiltPrompt:
+    """A prompt ready for completion plus what went into it"""
+    text: str
+    prompt_tokens: int
+    context_tokens: int
+    sources: list[UUID] = field(default_factory=list)
+    passages: int = 0
+    skipped_duplicates: int = 0
+    truncated: bool = False
+
+
+class PromptBuilder:
+    """Packs the best passages of retrieved assets into a token budget.
+
+    Each asset's content is split into passages of at most
+    ``passage_tokens`` (paragraphs, then sentences). Passages are taken
+    breadth first, the best passage of every asset in rank order before
+    any second passage, and within an asset the passages sharing most
+    terms with the question come first. A passage is skipped when most of
+    its word 5-grams are already in the prompt, which drops near-identical
+    revisions of one text. Packing stops adding passages that do not fit
+    in ``token_budget`` minus the template and question.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 3000,
+        passage_tokens: int = 200,
+        duplicate_overlap: float = 0.8,
+        template: str = DEFAULT_TEMPLATE,
+        counter: TokenCounter | None = None,
+    ) -> None:
+        if passage_tokens < 1:
+            raise ValueError("passage_tokens must be at least 1")
+        self.token_budget = token_budget
+        self.passage_tokens = passage_tokens
+        self.duplicate_overlap = duplicate_overlap
+        self.template = template
+        self.counter = counter or TokenCounter()
+        self.prompts = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_max = 0
+        self.truncated = 0
+
+    def build(self, question: str, hits: list[tuple[Asset, float]]) -> BuiltPrompt:
+        """Assemble the prompt for ``question`` from ``hits`` (best first)."""
+        overhead = self.counter.count(self.template.format(context="", question=question))
+        available = max(self.token_budget - overhead, 0)
+        query_terms = set(tokenize(question))
+
+        candidates = []
+        for rank, (asset, _) in enumerate(hits):
+            passages = self.split(asset.content or "")
+            passages.sort(key=lambda passage: -len(query_terms.intersection(tokenize(passage))))
+            for depth, passage in enumerate(passages):
+                candidates.append((depth, rank, asset, passage))
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+
+        packed: dict[UUID, list[str]] = {}
+        order: list[Asset] = []
+        seen_shingles: set[int] = set()
+        used = skipped = 0
+        truncated = False
+        for _, _, asset, passage in candidates:
+            shingles = self._shingles(passage)
+            if shingles and len(shingles & seen_shingles) >= self.duplicate_overlap * len(shingles):
+                skipped += 1
+                continue
+            header = "" if asset.id in packed else f"[{len(order) + 1}] {asset.name}\n"
+            cost = self.counter.count(header + passage + "\n")
+            if used + cost > available:
+                truncated = True
+                continue
+            if asset.id not in packed:
+                packed[asset.id] = []
+                order.append(asset)
+            packed[asset.id].append(passage)
+            seen_shingles |= shingles
+            used += cost
+
+        context = "\n\n".join(
+            f"[{i}] {asset.name}\n" + "\n".join(packed[asset.id]) for i, asset in enumerate(order, start=1)
+        )
+        text = self.template.format(context=context, question=question)
+        prompt = BuiltPrompt(
+            text=text,
+            prompt_tokens=self.counter.count(text),
+            context_tokens=used,
+            sources=[asset.id for asset in order],
+            passages=sum(len(passages) for passages in packed.values()),
+            skipped_duplicates=skipped,
+            truncated=truncated,
+        )
+        self._record(prompt)
+        return prompt
+
+    def split(self, content: str) -> list[str]:
+        """Split content into passages of at most ``passage_tokens``, keeping paragraphs whole when they fit."""
+        passages = []
+        for paragraph in _PARAGRAPHS.split(content.strip()):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            if self.counter.count(paragraph) <= self.passage_tokens:
+                passages.append(paragraph)
+                continue
+            current: list[str] = []
+            current_tokens = 0
+            for sentence in _SENTENCES.split(paragraph):
+                tokens = self.counter.count(sentence)
+                if current and current_tokens + tokens > self.passage_tokens:
+                    passages.append(" ".join(current))
+                    current, current_tokens = [], 0
+                if tokens > self.passage_tokens:
+                    passages.extend(self._split_words(sentence))
+                    continue
+                current.append(sentence)
+                current_tokens += tokens
+            if current:
+                passages.append(" ".join(current))
+        return passages
+
+    def stats(self) -> dict:
+        counts = self.counter.count.cache_info()
+        lookups = counts.hits + counts.misses
+        return {
+            "prompts": self.prompts,
+            "token_budget": self.token_budget,
+            "prompt_tokens_avg": self.prompt_tokens_total / self.prompts if self.prompts else 0.0,
+            "prompt_tokens_max": self.prompt_tokens_max,
+            "truncated": self.truncated,
+            "exact_token_counts": self.counter.exact,
+            "token_count_cache_size": counts.currsize,
+            "token_count_cache_hit_rate": counts.hits / lookups if lookups else 0.0,
+        }
+
+    def _split_words(self, sentence: str) -> list[str]:
+        """Fallback for a single sentence longer than a passage: cut it on word boundaries."""
+        pieces, current = [], []
+        for word in sentence.split():
+            if current and self.counter.count(" ".join(current + [word])) > self.passage_tokens:
+                pieces.append(" ".join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    @staticmethod
+    def _shingles(passage: str) -> set[int]:
+        words = normalize_text(passage).split()
+        if len(words) < SHINGLE_SIZE:
+            return {hash(tuple(words))} if words else set()
+        return {hash(tuple(words[i : i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+    def _record(self, prompt: BuiltPrompt) -> None:
+        self.prompts += 1
+        self.prompt_tokens_total += prompt.prompt_tokens
+        self.prompt_tokens_max = max(self.prompt_tokens_max, prompt.prompt_tokens)
+        self.truncated += prompt.truncated
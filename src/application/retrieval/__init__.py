@@ -0,0 +1,13 @@
+"""Application retrieval - Lexical index contracts and ranking helpers"""
+
+from .lexical_index import LexicalIndex
+from .lexical_loader import load_lexical_index
+from .fusion import reciprocal_rank_fusion
+from .mmr import mmr_select
+
+__all__ = [
+    "LexicalIndex",
+    "load_lexical_index",
+    "reciprocal_rank_fusion",
+    "mmr_select",
+]
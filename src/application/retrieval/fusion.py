@@ -0,0 +1,17 @@
+from typing import Hashable, Iterable, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[T]], k: int = 60) -> list[tuple[T, float]]:
+    """Merge several best-first rankings with reciprocal-rank fusion.
+
+    Each item scores ``sum(1 / (k + rank))`` over the rankings it appears in
+    (ranks start at 1), so agreement between retrievers outweighs a single
+    high placement and raw scores on different scales never need calibrating.
+    """
+    fused: dict[T, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+from uuid import UUID
+
+
+class LexicalIndex(ABC):
+    @abstractmethod
+    def add(self, domain_id: UUID, asset_id: UUID, text: str) -> None:
+        """Index (or re-index) an asset's text within a domain."""
+        pass
+
+    @abstractmethod
+    def remove(self, domain_id: UUID, asset_id: UUID) -> None:
+        """Drop an asset from a domain's index."""
+        pass
+
+    @abstractmethod
+    def load(self, domain_id: UUID, documents: Iterable[tuple[UUID, str]]) -> None:
+        """Replace a domain's index with ``(asset_id, text)`` documents read from the repository."""
+        pass
+
+    @abstractmethod
+    def is_stale(self, domain_id: UUID) -> bool:
+        """Whether the domain has never been loaded here, or was loaded too long ago to trust."""
+        pass
+
+    @abstractmethod
+    def search(self, domain_id: UUID, text: str, top_k: int = 5) -> list[tuple[UUID, float]]:
+        """Rank assets by term relevance, returning ``(asset_id, score)`` best first."""
+        pass
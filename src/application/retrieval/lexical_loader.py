@@ -0,0 +1,21 @@
+from uuid import UUID
+
+from .lexical_index import LexicalIndex
+from src.domain.persistence.asset_repository import AssetRepository
+
+
+async def load_lexical_index(index: LexicalIndex, repo: AssetRepository, domain_id: UUID | None = None) -> int:
+    """Load live asset content from the repository into ``index``, one domain or all of them.
+
+    Returns the number of assets indexed.
+    """
+    domains: dict[UUID, list[tuple[UUID, str]]] = {}
+    if domain_id is not None:
+        domains[domain_id] = []
+    for asset in await repo.list(domain_id=domain_id):
+        documents = domains.setdefault(asset.domain_id, [])
+        if asset.content:
+            documents.append((asset.id, asset.content))
+    for loaded_domain, documents in domains.items():
+        index.load(loaded_domain, documents)
+    return sum(len(documents) for documents in domains.values())
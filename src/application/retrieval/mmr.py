@@ -0,0 +1,41 @@
+import numpy as np
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_: float = 0.5) -> list[int]:
+    """Pick ``k`` candidate indices by maximal marginal relevance.
+
+    Each step takes the candidate maximizing
+    ``lambda_ * relevance - (1 - lambda_) * max_similarity_to_selected``.
+    ``relevance`` is divided by its largest magnitude so BM25, fused and
+    cosine scores all land on a comparable scale. Cosine similarities
+    between candidates come from one Gram matrix of the L2-normalized
+    ``vectors``; a zero row (no embedding) is similar to nothing.
+    ``lambda_=1`` keeps the relevance order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    relevance = np.asarray(relevance, dtype=np.float32)
+    scale = float(np.abs(relevance).max())
+    if scale > 0:
+        relevance = relevance / scale
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarity = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of every candidate to anything already selected
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        gain = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        gain[~available] = -np.inf
+        best = int(np.argmax(gain))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
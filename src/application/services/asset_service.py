@@ -1,14 +1,45 @@
-from typing import List
+import asyncio
+from typing import AsyncIterator, Iterator, List, Tuple
 from uuid import UUID
 from fastapi import Depends, HTTPException
 from src.domain.persistence.asset_repository import AssetRepository
 from ..integration.llm_provider import LLMProvider
-from ..vectordb.vector_db import VectorDB
+from ..integration.embedding_batcher import EmbeddingBatcher
+from ..vectordb.vector_db import VectorDB, VectorRecord, mean_embedding
+from ..chunking.chunker import Chunker
+from ..retrieval.lexical_index import LexicalIndex
+from ..caching.answer_cache import AnswerCache
+from ..jobs.job_queue import JobQueue
 from src.domain.entities.asset import Asset
+from src.domain.entities.job import Job
 from src.domain.enums.asset_type import AssetType
+from src.domain.value_objects.asset_embedding import AssetEmbedding
 from src.domain.persistence.dependencies import get_asset_repository
-from ..integration.dependencies import get_llm_provider, get_vector_db
-from src.application.dtos.asset_dtos import CreateAssetRequestDto, UpdateAssetRequestDto
+from ..integration.dependencies import (
+    get_llm_provider,
+    get_vector_db,
+    get_lexical_index,
+    get_answer_cache,
+    get_embedding_batcher,
+    get_chunker,
+    get_job_queue,
+    resolved,
+)
+from src.application.dtos.asset_dtos import (
+    AssetImportErrorDto,
+    AssetImportResultDto,
+    CreateAssetRequestDto,
+    UpdateAssetRequestDto,
+)
+
+# Chunk texts sent to the provider per embedding request
+CHUNK_EMBED_BATCH = 64
+
+# Imported records written (and queued for indexing) together
+IMPORT_BATCH_SIZE = 500
+
+# Per-record errors listed in an import result; later ones are only counted
+MAX_IMPORT_ERRORS = 1000
 
 
 class AssetService:
@@ -16,26 +47,63 @@ class AssetService:
         self, 
         repo: AssetRepository = Depends(get_asset_repository),
         llm: LLMProvider | None = Depends(get_llm_provider),
-        vector_db: VectorDB | None = Depends(get_vector_db)
+        vector_db: VectorDB | None = Depends(get_vector_db),
+        lexical_index: LexicalIndex | None = Depends(get_lexical_index),
+        answer_cache: AnswerCache | None = Depends(get_answer_cache),
+        embedder: EmbeddingBatcher | None = Depends(get_embedding_batcher),
+        chunker: Chunker | None = Depends(get_chunker),
+        jobs: JobQueue | None = Depends(get_job_queue)
     ):
         self._repo = repo
         self._llm = llm
         self._vector_db = vector_db
+        self._lexical_index = resolved(lexical_index)
+        self._answer_cache = resolved(answer_cache)
+        self._embedder = resolved(embedder)
+        self._chunker = resolved(chunker)
+        self._jobs = resolved(jobs)
+        # Indexing job queued by the last create/update/restore call, if any
+        self.indexing_job: Job | None = None
 
     async def create_asset(self, dto: CreateAssetRequestDto) -> Asset:
-        asset = Asset(
-            name=dto.name, 
-            domain_id=dto.domain_id, 
-            asset_type=dto.asset_type, 
-            content=dto.content, 
-            category_id=dto.category_id
-        )
+        asset = self._new_asset(dto)
+        index = bool(self._llm and self._vector_db and dto.content)
+        if index:
+            self._check_capacity()
         await self._repo.add(asset)
-        if self._llm and self._vector_db and dto.content:
-            embedding = self._llm.embed(dto.content)
-            self._vector_db.add(dto.domain_id, asset.id, embedding)
+        if index:
+            await self._schedule_indexing(asset)
+        if self._lexical_index and dto.content:
+            self._lexical_index.add(dto.domain_id, asset.id, dto.content)
+        self._invalidate_answers(asset.domain_id)
         return asset
 
+    async def import_assets(
+        self, records: AsyncIterator[Tuple[int, CreateAssetRequestDto | str]]
+    ) -> AssetImportResultDto:
+        """Create assets from a stream of ``(line, dto)`` records, ``IMPORT_BATCH_SIZE`` at a time.
+
+        A record may instead carry a validation error message, which is
+        reported against its line without stopping the import; so are
+        records the repository rejects. Each batch is stored with one bulk
+        insert and queued as one indexing job that embeds all its chunks
+        in shared provider requests. When the queue is full the import waits
+        for room, which stops reading the stream and throttles the sender.
+        """
+        result = AssetImportResultDto()
+        batch: List[Tuple[int, Asset]] = []
+        async for line, record in records:
+            if isinstance(record, str):
+                self._import_error(result, line, record)
+                continue
+            batch.append((line, self._new_asset(record)))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                await self._import_batch(batch, result)
+                batch = []
+        if batch:
+            await self._import_batch(batch, result)
+        return result
+
     async def get_asset(self, asset_id: UUID, include_deleted: bool = False) -> Asset | None:
         return await self._repo.get(asset_id, include_deleted=include_deleted)
 
@@ -50,17 +118,28 @@ class AssetService:
         if dto.name:
             asset.name = dto.name
         
-        if dto.content is not None:
-            asset.content = dto.content
-            # Update vector embedding if content changed
-            if self._llm and self._vector_db and dto.content:
-                embedding = self._llm.embed(dto.content)
-                self._vector_db.update(asset.domain_id, asset.id, embedding)
-        
+        category_changed = dto.category_id is not None and dto.category_id != asset.category_id
         if dto.category_id is not None:
             asset.category_id = dto.category_id
         
+        # Update vector embedding if content changed, once the new content is stored
+        index = bool(dto.content and self._llm and self._vector_db)
+        if index:
+            self._check_capacity()
+        if dto.content is not None:
+            asset.content = dto.content
+            if self._lexical_index:
+                self._lexical_index.add(asset.domain_id, asset.id, dto.content)
+        elif category_changed and self._vector_db:
+            # Re-label the stored vector so category-filtered searches see the move
+            stored = await self._repo.get_embedding(asset.id)
+            if stored is not None:
+                await self._store_vectors(asset, stored.vector, stored.chunks)
+        
         await self._repo.update(asset)
+        if index:
+            await self._schedule_indexing(asset)
+        self._invalidate_answers(asset.domain_id)
         return asset
 
     async def delete_asset(self, asset_id: UUID) -> None:
@@ -72,7 +151,10 @@ class AssetService:
         
         # Remove from vector database
         if self._vector_db:
-            self._vector_db.delete(asset.domain_id, asset.id)
+            await self._vector_db.delete(asset.domain_id, asset.id)
+        if self._lexical_index:
+            self._lexical_index.remove(asset.domain_id, asset.id)
+        self._invalidate_answers(asset.domain_id)
 
     async def restore_asset(self, asset_id: UUID) -> Asset:
         asset = await self._repo.get(asset_id, include_deleted=True)
@@ -84,9 +166,189 @@ class AssetService:
         
         await self._repo.restore(asset_id)
         
-        # Re-add to vector database if content exists
+        # Re-add to vector database if content exists, reusing the stored embedding when possible
         if self._llm and self._vector_db and asset.content:
-            embedding = self._llm.embed(asset.content)
-            self._vector_db.add(asset.domain_id, asset.id, embedding)
+            stored = await self._repo.get_embedding(asset.id)
+            if stored is not None and stored.model == self._llm.embedding_model:
+                await self._store_vectors(asset, stored.vector, stored.chunks)
+            else:
+                await self._schedule_indexing(asset)
+        if self._lexical_index and asset.content:
+            self._lexical_index.add(asset.domain_id, asset.id, asset.content)
+        self._invalidate_answers(asset.domain_id)
         
         return await self._repo.get(asset_id, include_deleted=False)
+
+    async def _import_batch(self, batch: List[Tuple[int, Asset]], result: AssetImportResultDto) -> None:
+        failed = await self._repo.add_many([asset for _, asset in batch])
+        stored = []
+        for line, asset in batch:
+            if asset.id in failed:
+                self._import_error(result, line, failed[asset.id])
+            else:
+                stored.append(asset)
+        result.imported += len(stored)
+        if self._lexical_index:
+            for asset in stored:
+                if asset.content:
+                    self._lexical_index.add(asset.domain_id, asset.id, asset.content)
+
+        asset_ids = [asset.id for asset in stored if asset.content]
+        if self._llm and self._vector_db and asset_ids:
+            if self._jobs is not None:
+                job = await self._jobs.enqueue(
+                    "import_assets", lambda: self._index_imported(asset_ids), limit=self._llm.embedding_model
+                )
+                result.job_ids.append(job.id)
+            else:
+                await self._index_imported(asset_ids)
+        for domain_id in {asset.domain_id for asset in stored}:
+            self._invalidate_answers(domain_id)
+
+    async def _index_imported(self, asset_ids: List[UUID]) -> None:
+        """Import job: embed a batch of new assets together and store their vectors in bulk"""
+        assets = [asset for asset in await self._repo.get_many(asset_ids) if asset.content]
+        records: dict[UUID, List[VectorRecord]] = {}
+        embeddings = []
+        for asset, vectors in zip(assets, await self._embed_content(assets)):
+            if not vectors:
+                continue
+            chunks = vectors if len(vectors) > 1 else None
+            embedding = mean_embedding(vectors) if chunks else vectors[0]
+            if chunks:
+                await self._vector_db.add_chunks(asset.domain_id, asset.id, chunks, asset.category_id, asset.asset_type)
+            else:
+                records.setdefault(asset.domain_id, []).append(
+                    VectorRecord(asset.id, embedding, asset.category_id, asset.asset_type)
+                )
+            embeddings.append(AssetEmbedding(
+                asset.id, asset.domain_id, embedding, self._llm.embedding_model,
+                asset.category_id, asset.asset_type, chunks,
+            ))
+        for domain_id, domain_records in records.items():
+            await self._vector_db.add_many(domain_id, domain_records)
+        await self._repo.save_embeddings(embeddings)
+        for domain_id in {asset.domain_id for asset in assets}:
+            self._invalidate_answers(domain_id)
+
+    @staticmethod
+    def _import_error(result: AssetImportResultDto, line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(AssetImportErrorDto(line=line, error=error))
+
+    @staticmethod
+    def _new_asset(dto: CreateAssetRequestDto) -> Asset:
+        return Asset(
+            name=dto.name, 
+            domain_id=dto.domain_id, 
+            asset_type=dto.asset_type, 
+            content=dto.content, 
+            category_id=dto.category_id
+        )
+
+    def _check_capacity(self) -> None:
+        """Refuse new writes while the indexing queue is full, before anything is stored"""
+        if self._jobs is not None and self._jobs.full():
+            raise HTTPException(
+                status_code=503, detail="Indexing queue is full, retry later", headers={"Retry-After": "1"}
+            )
+
+    async def _schedule_indexing(self, asset: Asset) -> None:
+        """Index the asset's content on the job queue, or inline without one.
+
+        The request returns as soon as the job is queued. Should the queue
+        have filled up since :meth:`_check_capacity`, the request indexes
+        the asset itself, which slows the writer down instead of losing work.
+        """
+        if self._jobs is not None:
+            try:
+                self.indexing_job = self._jobs.submit(
+                    "index_asset",
+                    lambda: self._reindex(asset.id),
+                    key=asset.id,
+                    limit=self._llm.embedding_model,
+                    asset_id=asset.id,
+                )
+                return
+            except asyncio.QueueFull:
+                pass
+        await self._index_content(asset)
+
+    async def _reindex(self, asset_id: UUID) -> None:
+        """Indexing job: embed whatever content the asset holds when the job runs"""
+        asset = await self._repo.get(asset_id, include_deleted=False)
+        if asset is None or not asset.content:
+            return
+        await self._index_content(asset)
+        self._invalidate_answers(asset.domain_id)
+
+    async def _index_content(self, asset: Asset) -> None:
+        """Embed the asset's content into the vector DB and the repository.
+
+        Several chunks are stored as one vector each, and the repository
+        keeps them alongside their normalized mean as the asset's embedding.
+        Vectors are written before the repository, which still describes the
+        previous chunks.
+        """
+        if self._chunker is None:
+            vectors = [await self._embed(asset.content)]
+        else:
+            [vectors] = await self._embed_content([asset])
+        if not vectors:
+            return
+        chunks = vectors if len(vectors) > 1 else None
+        embedding = mean_embedding(vectors) if chunks else vectors[0]
+        await self._store_vectors(asset, embedding, chunks)
+        await self._repo.save_embedding(asset.id, embedding, self._llm.embedding_model, chunks)
+
+    async def _embed_content(self, assets: List[Asset]) -> List[List[List[float]]]:
+        """Chunk vectors of each asset, in position order.
+
+        Chunks stream out of the chunker and are embedded
+        ``CHUNK_EMBED_BATCH`` per request, across asset boundaries.
+        """
+        vectors: List[List[List[float]]] = [[] for _ in assets]
+        owners, texts = [], []
+        for owner, text in self._chunk_texts(assets):
+            owners.append(owner)
+            texts.append(text)
+            if len(texts) == CHUNK_EMBED_BATCH:
+                for owner_index, vector in zip(owners, await self._embed_many(texts)):
+                    vectors[owner_index].append(vector)
+                owners, texts = [], []
+        if texts:
+            for owner_index, vector in zip(owners, await self._embed_many(texts)):
+                vectors[owner_index].append(vector)
+        return vectors
+
+    def _chunk_texts(self, assets: List[Asset]) -> Iterator[Tuple[int, str]]:
+        for index, asset in enumerate(assets):
+            if self._chunker is None:
+                yield index, asset.content
+            else:
+                for chunk in self._chunker.chunks(asset.id, asset.content):
+                    yield index, chunk.text
+
+    async def _store_vectors(self, asset: Asset, embedding: list[float], chunks: list[list[float]] | None) -> None:
+        """Write an asset's vectors, one per chunk when its content was chunked"""
+        if chunks:
+            await self._vector_db.add_chunks(asset.domain_id, asset.id, chunks, asset.category_id, asset.asset_type)
+        else:
+            await self._vector_db.update(asset.domain_id, asset.id, embedding, asset.category_id, asset.asset_type)
+
+    async def _embed(self, text: str) -> list[float]:
+        """Embed through the shared micro-batcher when one is configured"""
+        if self._embedder is not None:
+            return await self._embedder.embed(text)
+        return await self._llm.aembed(text)
+
+    async def _embed_many(self, texts: list[str]) -> list[list[float]]:
+        if self._embedder is not None:
+            return await self._embedder.embed_many(texts)
+        return await self._llm.aembed_many(texts)
+
+    def _invalidate_answers(self, domain_id: UUID) -> None:
+        """Answers cached for the domain may cite or miss the changed asset"""
+        if self._answer_cache is not None:
+            self._answer_cache.invalidate(domain_id)
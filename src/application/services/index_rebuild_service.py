@@ -0,0 +1,63 @@
+from typing import Tuple
+from uuid import UUID
+from fastapi import Depends
+from ..vectordb.vector_db import VectorDB, VectorRecord
+from ..retrieval.lexical_index import LexicalIndex
+from ..retrieval.lexical_loader import load_lexical_index
+from ..integration.dependencies import get_lexical_index, get_vector_db, resolved
+from src.domain.persistence.asset_repository import AssetRepository
+from src.domain.persistence.dependencies import get_asset_repository
+
+
+class IndexRebuildService:
+    def __init__(
+        self,
+        repo: AssetRepository = Depends(get_asset_repository),
+        vector_db: VectorDB = Depends(get_vector_db),
+        lexical_index: LexicalIndex | None = Depends(get_lexical_index)
+    ):
+        self._repo = repo
+        self._vector_db = vector_db
+        self._lexical_index = resolved(lexical_index)
+
+    async def rebuild_lexical(self, domain_id: UUID | None = None) -> int:
+        """Reload the keyword index from asset content; returns the number of assets indexed (0 when disabled)."""
+        if self._lexical_index is None:
+            return 0
+        return await load_lexical_index(self._lexical_index, self._repo, domain_id)
+
+    async def rebuild(
+        self, domain_id: UUID | None = None, model: str | None = None, batch_size: int = 256
+    ) -> Tuple[int, int]:
+        """Load stored embeddings into the vector DB without calling the LLM.
+
+        Embeddings are streamed from the repository and written with
+        ``add_many`` in per-domain batches. When ``model`` is given, vectors
+        produced by another model are skipped since they live in a different
+        space. Each record carries the asset's category and type so filtered
+        searches keep working on the rebuilt index. Chunked assets get their
+        chunk vectors back. Returns ``(indexed, skipped)``, counting assets.
+        """
+        indexed = skipped = 0
+        batches: dict[UUID, list[VectorRecord]] = {}
+        async for stored in self._repo.iter_embeddings(domain_id):
+            if model is not None and stored.model != model:
+                skipped += 1
+                continue
+            if stored.chunks:
+                await self._vector_db.add_chunks(
+                    stored.domain_id, stored.asset_id, stored.chunks, stored.category_id, stored.asset_type
+                )
+                indexed += 1
+                continue
+            batch = batches.setdefault(stored.domain_id, [])
+            batch.append(VectorRecord(stored.asset_id, stored.vector, stored.category_id, stored.asset_type))
+            if len(batch) >= batch_size:
+                await self._vector_db.add_many(stored.domain_id, batch)
+                indexed += len(batch)
+                batches[stored.domain_id] = []
+        for batch_domain, batch in batches.items():
+            if batch:
+                await self._vector_db.add_many(batch_domain, batch)
+                indexed += len(batch)
+        return indexed, skipped
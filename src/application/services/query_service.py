@@ -1,23 +1,283 @@
-from typing import Iterable, Tuple
-from fastapi import Depends
+from typing import Any, AsyncIterator, Hashable, List, NamedTuple, Tuple
+from uuid import UUID
+import numpy as np
+from fastapi import Depends, HTTPException
 from ..integration.llm_provider import LLMProvider
+from ..integration.embedding_batcher import EmbeddingBatcher
 from ..vectordb.vector_db import VectorDB
+from ..retrieval.lexical_index import LexicalIndex
+from ..retrieval.lexical_loader import load_lexical_index
+from ..retrieval.fusion import reciprocal_rank_fusion
+from ..retrieval.mmr import mmr_select
+from ..caching.answer_cache import AnswerCache, CachedAnswer
+from ..prompting.prompt_builder import PromptBuilder
+from src.common.logging import logger
+from src.common.text import normalize_text
 from src.domain.entities.asset import Asset
-from ..integration.dependencies import get_llm_provider, get_vector_db
+from src.domain.persistence.asset_repository import AssetRepository
+from src.domain.persistence.dependencies import get_asset_repository
+from ..integration.dependencies import (
+    get_llm_provider,
+    get_vector_db,
+    get_lexical_index,
+    get_answer_cache,
+    get_embedding_batcher,
+    get_prompt_builder,
+    resolved,
+)
 from src.application.dtos.query_dtos import QueryRequestDto
 
+# Retrieval modes accepted on a query
+QUERY_MODES = ("hybrid", "vector", "lexical")
+
+# Candidates fetched from each retriever before fusion
+FUSION_CANDIDATES = 20
+
+# With MMR, top_k * MMR_OVERSAMPLE candidates are ranked before picking a diverse top_k
+MMR_OVERSAMPLE = 4
+
+
+class _CacheLookup(NamedTuple):
+    key: Hashable
+    scope: Hashable
+    embedding: List[float] | None
+    cached: CachedAnswer | None
+    version: int | None = None
+
 
 class QueryService:
     def __init__(
         self, 
         llm: LLMProvider = Depends(get_llm_provider),
-        vector_db: VectorDB = Depends(get_vector_db)
+        vector_db: VectorDB = Depends(get_vector_db),
+        lexical_index: LexicalIndex | None = Depends(get_lexical_index),
+        repo: AssetRepository = Depends(get_asset_repository),
+        answer_cache: AnswerCache | None = Depends(get_answer_cache),
+        embedder: EmbeddingBatcher | None = Depends(get_embedding_batcher),
+        prompt_builder: PromptBuilder | None = Depends(get_prompt_builder)
     ):
         self._llm = llm
         self._vector_db = vector_db
+        self._lexical_index = resolved(lexical_index)
+        self._repo = repo
+        self._answer_cache = resolved(answer_cache)
+        self._embedder = resolved(embedder)
+        self._prompt_builder = resolved(prompt_builder)
+
+    async def query(self, dto: QueryRequestDto) -> Tuple[str, List[Tuple[Asset, float]]]:
+        """Answer a question and return the retrieved assets with their scores, best first.
+
+        A repeat of a question already answered for the domain (same
+        normalized text and retrieval options) is served from the answer
+        cache without embedding, searching or completing. Otherwise, once
+        the question is embedded, a paraphrase of a recent question with the
+        same options is served from the semantic cache, skipping search and
+        completion.
+        """
+        lookup = await self._lookup(dto)
+        if lookup.cached is not None:
+            return lookup.cached.answer, await self._hydrate(lookup.cached.sources, {})
+
+        hits = await self.retrieve(dto, lookup.embedding)
+        answer = await self._llm.acomplete(self._prompt(dto, hits))
+        self._remember(dto, lookup, answer, hits)
+        return answer, hits
+
+    async def stream(self, dto: QueryRequestDto) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming :meth:`query`: yields ``("sources", hits)`` once, then ``("token", text)`` pieces.
+
+        Cached answers arrive as a single token. The answer is cached only
+        when the stream runs to the end; closing the iterator early closes
+        the provider stream, so an abandoned request stops generating.
+        """
+        lookup = await self._lookup(dto)
+        if lookup.cached is not None:
+            yield "sources", await self._hydrate(lookup.cached.sources, {})
+            yield "token", lookup.cached.answer
+            return
+
+        hits = await self.retrieve(dto, lookup.embedding)
+        yield "sources", hits
+        pieces = []
+        tokens = self._llm.astream(self._prompt(dto, hits))
+        try:
+            async for piece in tokens:
+                pieces.append(piece)
+                yield "token", piece
+        finally:
+            await tokens.aclose()
+        self._remember(dto, lookup, "".join(pieces), hits)
+
+    def _prompt(self, dto: QueryRequestDto, hits: List[Tuple[Asset, float]]) -> str:
+        """The completion prompt: the question grounded in the retrieved passages that fit the token budget."""
+        if self._prompt_builder is None:
+            return dto.text
+        prompt = self._prompt_builder.build(dto.text, hits)
+        logger.debug(
+            "Prompt for domain %s: %d tokens (%d context, %d passages from %d assets%s)",
+            dto.domain_id, prompt.prompt_tokens, prompt.context_tokens, prompt.passages,
+            len(prompt.sources), ", truncated" if prompt.truncated else "",
+        )
+        return prompt.text
+
+    async def _lookup(self, dto: QueryRequestDto) -> _CacheLookup:
+        """Check the exact, then (after embedding the question) the semantic answer cache.
+
+        The domain's cache version is read first, so an answer generated
+        while the domain is invalidated is never cached.
+        """
+        scope = self._cache_scope(dto)
+        key = (" ".join(normalize_text(dto.text).split()), scope)
+        if self._answer_cache is None:
+            return _CacheLookup(key, scope, None, None)
+        version = self._answer_cache.version(dto.domain_id)
+        cached = self._answer_cache.get(dto.domain_id, key)
+        if cached is not None:
+            return _CacheLookup(key, scope, None, cached, version)
+
+        embedding = None
+        if self._resolve_mode(dto) != "lexical":
+            embedding = await self._embed(dto.text)
+            cached = self._answer_cache.get_similar(dto.domain_id, scope, embedding)
+            if cached is not None:
+                self._answer_cache.put(dto.domain_id, key, cached, version)
+        return _CacheLookup(key, scope, embedding, cached, version)
+
+    def _remember(
+        self, dto: QueryRequestDto, lookup: _CacheLookup, answer: str, hits: List[Tuple[Asset, float]]
+    ) -> None:
+        if self._answer_cache is None:
+            return
+        cached = CachedAnswer(answer, [(asset.id, score) for asset, score in hits])
+        self._answer_cache.put(dto.domain_id, lookup.key, cached, lookup.version)
+        if lookup.embedding is not None:
+            self._answer_cache.put_similar(dto.domain_id, lookup.scope, lookup.embedding, cached, lookup.version)
+
+    async def retrieve(
+        self, dto: QueryRequestDto, embedding: List[float] | None = None
+    ) -> List[Tuple[Asset, float]]:
+        """Rank assets for a query according to ``dto.mode``.
+
+        ``vector`` returns cosine scores, ``lexical`` BM25 scores and
+        ``hybrid`` fuses both rankings with reciprocal-rank fusion. Without a
+        lexical index, hybrid falls back to vector search. A domain the
+        lexical index has not loaded yet (or loaded too long ago) is read
+        from the repository first.
+
+        ``category_id`` / ``asset_type`` restrict the vector search inside the
+        index; lexical candidates are filtered after hydration.
+
+        With ``mmr_lambda`` set, ``top_k * MMR_OVERSAMPLE`` candidates are
+        ranked and a diverse ``top_k`` is re-picked by maximal marginal
+        relevance, so near-duplicate assets do not crowd out the rest.
+
+        A precomputed query ``embedding`` saves the provider call.
+        """
+        mode = self._resolve_mode(dto)
+        if dto.mmr_lambda is not None and not 0.0 <= dto.mmr_lambda <= 1.0:
+            raise HTTPException(status_code=400, detail="mmr_lambda must be between 0 and 1")
+
+        if dto.mmr_lambda is None:
+            return await self._rank(dto, mode, dto.top_k, embedding)
+        candidates = await self._rank(dto, mode, dto.top_k * MMR_OVERSAMPLE, embedding)
+        return await self._diversify(candidates, dto.top_k, dto.mmr_lambda)
+
+    def _resolve_mode(self, dto: QueryRequestDto) -> str:
+        """Validate ``dto.mode``; hybrid degrades to vector without a lexical index."""
+        mode = dto.mode
+        if mode not in QUERY_MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown query mode: {mode}")
+        if self._lexical_index is None:
+            if mode == "lexical":
+                raise HTTPException(status_code=400, detail="Lexical search is not enabled")
+            mode = "vector"
+        return mode
+
+    async def _rank(
+        self, dto: QueryRequestDto, mode: str, limit: int, embedding: List[float] | None = None
+    ) -> List[Tuple[Asset, float]]:
+        """Best ``limit`` assets for the query in ``mode``."""
+        if mode == "vector":
+            embedding = embedding or await self._embed(dto.text)
+            return await self._vector_db.search(
+                dto.domain_id, embedding, limit, dto.category_id, dto.asset_type
+            )
+
+        fetch = max(FUSION_CANDIDATES, limit)
+        if self._lexical_index.is_stale(dto.domain_id):
+            await load_lexical_index(self._lexical_index, self._repo, dto.domain_id)
+        lexical_hits = self._lexical_index.search(dto.domain_id, dto.text, fetch)
+        filtered = dto.category_id is not None or dto.asset_type is not None
+        if filtered:
+            lexical_hits = [
+                (asset, score) for asset, score in await self._hydrate(lexical_hits, {})
+                if self._matches(asset, dto)
+            ]
+            known = {asset.id: asset for asset, _ in lexical_hits}
+            lexical_hits = [(asset.id, score) for asset, score in lexical_hits]
+        else:
+            known = {}
+        if mode == "lexical":
+            return await self._hydrate(lexical_hits[:limit], known)
+
+        embedding = embedding or await self._embed(dto.text)
+        vector_hits = await self._vector_db.search(
+            dto.domain_id, embedding, fetch, dto.category_id, dto.asset_type
+        )
+        fused = reciprocal_rank_fusion([
+            [asset.id for asset, _ in vector_hits],
+            [asset_id for asset_id, _ in lexical_hits],
+        ])
+        known.update((asset.id, asset) for asset, _ in vector_hits)
+        return await self._hydrate(fused[:limit], known)
+
+    async def _embed(self, text: str) -> List[float]:
+        """Embed through the shared micro-batcher when one is configured."""
+        if self._embedder is not None:
+            return await self._embedder.embed(text)
+        return await self._llm.aembed(text)
+
+    async def _diversify(
+        self, candidates: List[Tuple[Asset, float]], top_k: int, mmr_lambda: float
+    ) -> List[Tuple[Asset, float]]:
+        """Re-pick ``top_k`` of ``candidates`` by MMR over their stored embeddings.
+
+        Candidates without an embedding from the current model are never
+        considered redundant. Scores are the original retrieval scores.
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k]
+        model = self._llm.embedding_model
+        stored = {
+            embedding.asset_id: embedding.vector
+            for embedding in await self._repo.get_embeddings([asset.id for asset, _ in candidates])
+            if embedding.model == model
+        }
+        dim = len(next(iter(stored.values()))) if stored else 1
+        vectors = np.zeros((len(candidates), dim), dtype=np.float32)
+        for row, (asset, _) in enumerate(candidates):
+            if asset.id in stored:
+                vectors[row] = stored[asset.id]
+        relevance = np.array([score for _, score in candidates], dtype=np.float32)
+        return [candidates[i] for i in mmr_select(relevance, vectors, top_k, mmr_lambda)]
+
+    @staticmethod
+    def _cache_scope(dto: QueryRequestDto) -> Hashable:
+        """Every query option that changes the retrieved sources; cached answers never cross scopes."""
+        return (dto.mode, dto.top_k, dto.category_id, dto.asset_type, dto.mmr_lambda)
+
+    @staticmethod
+    def _matches(asset: Asset, dto: QueryRequestDto) -> bool:
+        return (dto.category_id is None or asset.category_id == dto.category_id) and (
+            dto.asset_type is None or asset.asset_type == dto.asset_type
+        )
 
-    def query(self, dto: QueryRequestDto) -> Tuple[str, Iterable[Asset]]:
-        embedding = self._llm.embed(dto.text)
-        assets = self._vector_db.search(dto.domain_id, embedding)
-        answer = self._llm.complete(dto.text)
-        return answer, assets
+    async def _hydrate(
+        self, ranked: List[Tuple[UUID, float]], known: dict[UUID, Asset]
+    ) -> List[Tuple[Asset, float]]:
+        """Resolve ranked ids to assets, fetching only those not already loaded."""
+        missing = [asset_id for asset_id, _ in ranked if asset_id not in known]
+        if missing:
+            for asset in await self._repo.get_many(missing):
+                known[asset.id] = asset
+        return [(known[asset_id], score) for asset_id, score in ranked if asset_id in known]
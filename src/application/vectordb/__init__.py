@@ -1,7 +1,9 @@
 """Application VectorDB - Vector database interface contracts"""
 
-from .vector_db import VectorDB
+from .vector_db import VectorDB, VectorRecord, mean_embedding
 
 __all__ = [
     "VectorDB",
+    "VectorRecord",
+    "mean_embedding",
 ]
@@ -1,16 +1,117 @@
 from abc import ABC, abstractmethod
-from typing import Iterable
+from typing import Iterable, NamedTuple
 from uuid import UUID
+import numpy as np
 from src.domain.entities.asset import Asset
+from src.domain.enums.asset_type import AssetType
+
+
+class VectorRecord(NamedTuple):
+    """One embedding to store, with the asset attributes searches can filter on."""
+    asset_id: UUID
+    embedding: list[float]
+    category_id: UUID | None = None
+    asset_type: AssetType | None = None
 
 
 class VectorDB(ABC):
     @abstractmethod
-    def add(self, domain_id: UUID, asset_id: UUID, embedding: list[float]) -> None:
-        """Store embedding for an asset within a domain."""
+    async def add(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        """Store embedding for an asset within a domain.
+
+        ``category_id`` and ``asset_type`` are kept so searches can filter on them.
+        """
+        pass
+
+    async def add_many(self, domain_id: UUID, items: Iterable[VectorRecord | tuple[UUID, list[float]]]) -> None:
+        """Store several embeddings within a domain.
+
+        Items are :class:`VectorRecord` or plain ``(asset_id, embedding)``
+        pairs. Backends with a bulk write path override this; the default
+        adds one at a time.
+        """
+        for record in map(lambda item: VectorRecord(*item), items):
+            await self.add(domain_id, record.asset_id, record.embedding, record.category_id, record.asset_type)
+
+    async def add_chunks(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embeddings: list[list[float]],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        """Store one embedding per chunk of an asset, replacing whatever the asset had.
+
+        Searches still rank assets, by their best matching chunk. Backends
+        that only hold one vector per asset override nothing and store the
+        normalized mean of the chunk embeddings instead.
+        """
+        await self.update(domain_id, asset_id, mean_embedding(embeddings), category_id, asset_type)
+
+    async def close(self) -> None:
+        """Release files, threads and connections at shutdown. Backends holding none keep this no-op."""
+        pass
+
+    @abstractmethod
+    async def update(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        """Replace the embedding (and filter attributes) stored for an asset within a domain."""
+        pass
+
+    @abstractmethod
+    async def delete(self, domain_id: UUID, asset_id: UUID) -> None:
+        """Remove an asset's embedding from a domain; unknown assets are ignored."""
         pass
 
     @abstractmethod
-    def search(self, domain_id: UUID, embedding: list[float], top_k: int = 5) -> Iterable[Asset]:
-        """Search for relevant assets by embedding within a domain."""
+    async def search(
+        self,
+        domain_id: UUID,
+        embedding: list[float],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[tuple[Asset, float]]:
+        """Search for relevant assets by embedding within a domain.
+
+        When ``category_id`` and/or ``asset_type`` are given, only matching
+        assets are ranked, so the result is the true filtered top-k.
+        Returns ``(asset, score)`` pairs in rank order, best first.
+        """
         pass
+
+    @abstractmethod
+    async def search_many(
+        self,
+        domain_id: UUID,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        """Search several embeddings at once within a domain.
+
+        Returns one list per query of ``(asset_id, score)`` pairs, best first.
+        """
+        pass
+
+
+def mean_embedding(embeddings: list[list[float]]) -> list[float]:
+    """Unit-length centroid of chunk embeddings, used as the asset's single vector."""
+    mean = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+    norm = float(np.linalg.norm(mean))
+    return (mean / norm if norm else mean).tolist()
@@ -11,10 +11,91 @@ class Settings:
     OPENAI_EMBED_MODEL = os.getenv(
         "OPENAI_EMBED_MODEL", "text-embedding-ada-002"
     )
+    # Shared keep-alive HTTP pool used for every OpenAI call
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
     QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
     QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "assets")
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "0")) or None
+    QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+    QDRANT_LAYOUT = os.getenv("QDRANT_LAYOUT", "shared")  # "shared", "collection" or "shard"
+
+    # HNSW settings (when VECTOR_DB=hnsw)
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+    # In-process vector storage (when VECTOR_DB=memory)
+    VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "")  # "", "int8" or "binary"
+    VECTOR_STORAGE_DIR = os.getenv("VECTOR_STORAGE_DIR")
+    VECTOR_RESCORE_OVERSAMPLE = int(os.getenv("VECTOR_RESCORE_OVERSAMPLE", "4"))
+    VECTOR_PERSIST = os.getenv("VECTOR_PERSIST", "false").lower() == "true"
+    VECTOR_SEGMENT_ROWS = int(os.getenv("VECTOR_SEGMENT_ROWS", "65536"))
+    VECTOR_MAX_SEGMENTS = int(os.getenv("VECTOR_MAX_SEGMENTS", "8"))
+    VECTOR_SHARDS = int(os.getenv("VECTOR_SHARDS", "1"))
+    VECTOR_SEARCH_THREADS = int(os.getenv("VECTOR_SEARCH_THREADS", "0")) or None
+    # Fraction of tombstoned rows that triggers a background compaction (memory and hnsw)
+    VECTOR_COMPACT_RATIO = float(os.getenv("VECTOR_COMPACT_RATIO", "0.2"))
     
+    # Hybrid retrieval: in-process BM25 index fused with vector hits
+    HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "false").lower() == "true"
+    # Seconds before a domain's BM25 postings are reloaded from the repository (0: load once)
+    HYBRID_RELOAD_SECONDS = float(os.getenv("HYBRID_RELOAD_SECONDS", "300")) or None
+
+    # Exact-match answer cache keyed by domain and normalized question text
+    ANSWER_CACHE = os.getenv("ANSWER_CACHE", "false").lower() == "true"
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+    # Directory shared by all workers holding per-domain cache versions (unset: one worker only)
+    ANSWER_CACHE_VERSION_DIR = os.getenv("ANSWER_CACHE_VERSION_DIR") or None
+    # Paraphrases reuse an answer when their embeddings' cosine similarity reaches the threshold
+    SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+
+    # Embedding cache keyed by (model, sha256(text)): in-memory LRU plus an optional SQLite file
+    EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "true").lower() == "true"
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH") or None
+
+    # Concurrent embed calls are coalesced into one provider request of up to
+    # EMBED_BATCH_SIZE texts, waiting at most EMBED_BATCH_DELAY_MS for company
+    EMBED_BATCHING = os.getenv("EMBED_BATCHING", "true").lower() == "true"
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    EMBED_BATCH_DELAY_MS = float(os.getenv("EMBED_BATCH_DELAY_MS", "5"))
+
+    # Long content is embedded as overlapping chunks of at most CHUNK_SIZE characters;
+    # searches fetch top_k * CHUNK_SEARCH_OVERSAMPLE chunk vectors before collapsing to assets
+    CHUNKING = os.getenv("CHUNKING", "false").lower() == "true"
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1500"))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    CHUNK_SEARCH_OVERSAMPLE = int(os.getenv("CHUNK_SEARCH_OVERSAMPLE", "4"))
+
+    # Asset indexing runs on background workers; create/update return a job id right away.
+    # At most INGESTION_MAX_PENDING jobs wait (503 beyond that), failed jobs are retried with
+    # exponential backoff, and INGESTION_PROVIDER_CONCURRENCY jobs call one provider at a time
+    INGESTION_QUEUE = os.getenv("INGESTION_QUEUE", "false").lower() == "true"
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "4"))
+    INGESTION_MAX_PENDING = int(os.getenv("INGESTION_MAX_PENDING", "1000"))
+    INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+    INGESTION_RETRY_DELAY = float(os.getenv("INGESTION_RETRY_DELAY", "1.0"))
+    INGESTION_PROVIDER_CONCURRENCY = int(os.getenv("INGESTION_PROVIDER_CONCURRENCY", "4"))
+    INGESTION_SHUTDOWN_TIMEOUT = float(os.getenv("INGESTION_SHUTDOWN_TIMEOUT", "10"))
+
+    # Retrieved passages packed into the completion prompt, up to PROMPT_TOKEN_BUDGET tokens
+    # (template and question included) in passages of at most PROMPT_PASSAGE_TOKENS
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+    PROMPT_PASSAGE_TOKENS = int(os.getenv("PROMPT_PASSAGE_TOKENS", "200"))
+    # tiktoken encoding used to count tokens when tiktoken is installed
+    PROMPT_TOKEN_ENCODING = os.getenv("PROMPT_TOKEN_ENCODING", "cl100k_base")
+
+    # Precision of embeddings persisted with assets: "float16" or "float32"
+    EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float16")
+
     # MongoDB settings
     USE_MONGODB = os.getenv("USE_MONGODB", "false").lower() == "true"
     MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
@@ -0,0 +1,51 @@
+import json
+from typing import Any, AsyncIterator
+
+# A line longer than this is reported as an error and skipped rather than buffered
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[int, Any, str | None]]:
+    """Parse newline-delimited JSON from a byte stream as it arrives.
+
+    Yields ``(line_number, value, error)`` per non-blank line, 1-based;
+    ``error`` is set (and ``value`` is None) when the line is not valid
+    JSON or exceeds ``max_line_bytes``. Only the current partial line is
+    buffered, so memory stays flat however large the stream is.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_number += 1
+            if not oversized:
+                buffer += chunk[start:end]
+            if oversized or len(buffer) > max_line_bytes:
+                oversized = False
+                yield line_number, None, f"Line exceeds {max_line_bytes} bytes"
+            elif (parsed := _parse(line_number, buffer)) is not None:
+                yield parsed
+            buffer.clear()
+            start = end + 1
+        if not oversized:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                oversized = True
+                buffer.clear()
+    if oversized:
+        yield line_number + 1, None, f"Line exceeds {max_line_bytes} bytes"
+    elif buffer.strip():
+        yield _parse(line_number + 1, buffer)
+
+
+def _parse(line_number: int, line: bytearray) -> tuple[int, Any, str | None] | None:
+    if not line.strip():
+        return None
+    try:
+        return line_number, json.loads(line), None
+    except ValueError as e:
+        return line_number, None, f"Invalid JSON: {e}"
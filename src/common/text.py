@@ -0,0 +1,112 @@
+import hashlib
+import string
+from collections import OrderedDict
+from functools import lru_cache
+from uuid import UUID
+
+# Tashkeel (harakat, tanween, shadda, sukun, dagger alef) and tatweel carry no
+# lexical meaning and are dropped
+_DIACRITICS = [chr(c) for c in range(0x064B, 0x0653)] + ["ٰ", "ـ"]
+
+# Letter variants folded onto one form so spellings of the same word collide
+_LETTER_FOLDS = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي",
+    "ؤ": "و",
+    "ة": "ه",
+}
+
+# Eastern Arabic and Persian digits become ASCII digits
+_DIGITS = {chr(0x0660 + d): str(d) for d in range(10)}
+_DIGITS.update({chr(0x06F0 + d): str(d) for d in range(10)})
+
+# Punctuation becomes a space so tokenizing is a plain str.split()
+_PUNCTUATION = string.punctuation + "،؛؟«»٪٫٬۔…“”‘’–—"
+
+_NORMALIZE = str.maketrans(
+    {
+        **{c: None for c in _DIACRITICS},
+        **_LETTER_FOLDS,
+        **_DIGITS,
+        **{c: " " for c in _PUNCTUATION},
+    }
+)
+
+# Light10 affixes (Larkey et al.), written in normalized form
+_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ه", "ي")
+
+
+def normalize_text(text: str) -> str:
+    """Fold Arabic spelling variants, strip tashkeel/tatweel and punctuation.
+
+    A single ``str.translate`` pass over a precompiled table followed by
+    ``casefold``, so Latin text is lower-cased as well.
+    """
+    return text.translate(_NORMALIZE).casefold()
+
+
+@lru_cache(maxsize=65536)
+def light_stem(token: str) -> str:
+    """Strip common Arabic prefixes and suffixes (Light10).
+
+    Non-Arabic tokens are returned unchanged. Results are memoized since
+    vocabulary frequencies are heavily skewed.
+    """
+    if not token or not "ء" <= token[0] <= "ي":
+        return token
+    if len(token) >= 4 and token[0] == "و":
+        token = token[1:]
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            token = token[len(prefix):]
+            break
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            token = token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str, stem: bool = True) -> list[str]:
+    """Normalize ``text`` and split it into (optionally stemmed) tokens."""
+    tokens = normalize_text(text).split()
+    if stem:
+        return [light_stem(token) for token in tokens]
+    return tokens
+
+
+def content_digest(text: str) -> bytes:
+    """Stable 128-bit fingerprint of raw content."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenStreamCache:
+    """Bounded LRU of token streams keyed by asset id.
+
+    Each entry remembers the digest of the content it was built from, so
+    re-indexing unchanged content returns the cached tokens and only
+    edited assets are tokenized again.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[UUID, tuple[bytes, list[str]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, asset_id: UUID, text: str) -> tuple[bytes, list[str]]:
+        """Return ``(digest, tokens)`` for the asset's current content."""
+        digest = content_digest(text)
+        entry = self._entries.get(asset_id)
+        if entry is not None and entry[0] == digest:
+            self._entries.move_to_end(asset_id)
+            return entry
+        entry = (digest, tokenize(text))
+        self._entries[asset_id] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, asset_id: UUID) -> None:
+        self._entries.pop(asset_id, None)
@@ -0,0 +1,45 @@
+import math
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# Word runs and single symbols; each is costed separately by the estimator
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Counts prompt tokens, memoizing results per text.
+
+    Uses ``tiktoken`` with ``encoding`` when it is installed. Otherwise it
+    estimates: ASCII words at about one token per 4 bytes, which tracks BPE
+    tokenizers for English, and other words (Arabic in particular) at one
+    token per character, a deliberately high rate since BPE vocabularies
+    split them into much shorter pieces. The estimate is only a guide, so
+    keep some headroom below the model's context limit. Passages repeat
+    across queries, so cached counts make packing a prompt cheap.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", cache_size: int = 65536) -> None:
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding)
+            except Exception:
+                self.encoding = None
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(
+            math.ceil(len(piece) / 4) if piece.isascii() else len(piece) for piece in _PIECES.findall(text)
+        )
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the tokenizer rather than the estimate."""
+        return self.encoding is not None
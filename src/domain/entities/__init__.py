@@ -5,4 +5,5 @@ from .category import Category
 from .chunk import Chunk
 from .query import Query
 from .audit import AuditLog
+from .job import Job
 
@@ -1,5 +1,10 @@
 from dataclasses import dataclass
-from uuid import UUID, uuid4
+from uuid import UUID, uuid4, uuid5
+
+
+def chunk_id(asset_id: UUID, position: int) -> UUID:
+    """Stable id of an asset's ``position``-th chunk, so re-chunking overwrites rather than duplicates"""
+    return uuid5(asset_id, str(position))
 
 
 @dataclass
@@ -7,6 +12,9 @@ class Chunk:
     asset_id: UUID
     text: str
     id: UUID | None = None
+    position: int = 0
+    start: int = 0
+    end: int = 0
 
     def __post_init__(self):
         if self.id is None:
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from ..enums.job_status import JobStatus
+
+
+@dataclass
+class Job:
+    kind: str
+    asset_id: UUID | None = None
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    error: str | None = None
+    id: UUID | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = uuid4()
+        if self.created_at is None:
+            self.created_at = datetime.now(timezone.utc)
+
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def start(self):
+        self.status = JobStatus.RUNNING
+        self.attempts += 1
+        self.started_at = datetime.now(timezone.utc)
+
+    def finish(self, error: str | None = None):
+        self.status = JobStatus.FAILED if error else JobStatus.SUCCEEDED
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+
+    def retry(self, error: str):
+        """Back to the queue after a failed attempt, keeping the error for status readers"""
+        self.status = JobStatus.QUEUED
+        self.error = error
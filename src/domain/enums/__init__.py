@@ -1,3 +1,4 @@
 from .role import Role
 from .asset_type import AssetType
+from .job_status import JobStatus
 
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, Dict, List
 from uuid import UUID
 from ..entities.asset import Asset
+from ..value_objects.asset_embedding import AssetEmbedding
 
 
 class AssetRepository(ABC):
@@ -9,10 +10,26 @@ class AssetRepository(ABC):
     async def add(self, asset: Asset) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_many(self, assets: List[Asset]) -> Dict[UUID, str]:
+        """Insert several assets in one round trip, continuing past individual failures.
+
+        Returns the ids of the assets that were not stored, with the reason.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def get(self, asset_id: UUID, include_deleted: bool = False) -> Asset | None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_many(self, asset_ids: List[UUID], include_deleted: bool = False) -> List[Asset]:
+        """Fetch several assets in one round trip, in the order of ``asset_ids``.
+
+        Ids that do not exist (or are deleted, unless ``include_deleted``) are skipped.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def list(self, domain_id: UUID | None = None, category_id: UUID | None = None, include_deleted: bool = False) -> List[Asset]:
         raise NotImplementedError
@@ -28,3 +45,38 @@ class AssetRepository(ABC):
     @abstractmethod
     async def restore(self, asset_id: UUID) -> None:
         raise NotImplementedError
+
+    @abstractmethod
+    async def save_embedding(
+        self, asset_id: UUID, embedding: List[float], model: str, chunks: List[List[float]] | None = None
+    ) -> None:
+        """Store an asset's embedding and the model that produced it alongside the asset.
+
+        ``chunks`` are the per-chunk embeddings of chunked content, in
+        position order; saving without them drops any stored chunks.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_embeddings(self, embeddings: List[AssetEmbedding]) -> None:
+        """Store several embeddings (with their chunks) in one round trip, as :meth:`save_embedding` would."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_embedding(self, asset_id: UUID) -> AssetEmbedding | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_embeddings(self, asset_ids: List[UUID]) -> List[AssetEmbedding]:
+        """Fetch stored embeddings of several assets in one round trip; assets without one are skipped."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_chunk_owners(self, chunk_ids: List[UUID]) -> Dict[UUID, UUID]:
+        """Map stored chunk ids to the ids of the assets they belong to; unknown ids are left out."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_embeddings(self, domain_id: UUID | None = None) -> AsyncIterator[AssetEmbedding]:
+        """Stream stored embeddings of non-deleted assets, optionally for one domain."""
+        raise NotImplementedError
@@ -62,11 +62,11 @@ def get_asset_repository() -> AssetRepository:
     settings = get_settings()
     if getattr(settings, 'USE_MONGODB', False):
         from src.infrastructure_persistence.mongo_asset_repo import MongoAssetRepository
-        return MongoAssetRepository()
+        return MongoAssetRepository(embedding_dtype=settings.EMBEDDING_STORE_DTYPE)
     else:
         if _asset_repo_instance is None:
             from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
-            _asset_repo_instance = MemoryAssetRepository()
+            _asset_repo_instance = MemoryAssetRepository(embedding_dtype=settings.EMBEDDING_STORE_DTYPE)
         return _asset_repo_instance
 
 
@@ -1 +1,2 @@
 from .permissions import Permissions
+from .asset_embedding import AssetEmbedding
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+from src.domain.enums.asset_type import AssetType
+
+
+@dataclass
+class AssetEmbedding:
+    """Stored embedding of an asset, the model that produced it and the asset's filter attributes
+
+    For content split into several chunks, ``chunks`` holds one vector per
+    chunk in position order and ``vector`` is their normalized mean.
+    """
+    asset_id: UUID
+    domain_id: UUID
+    vector: List[float]
+    model: str
+    category_id: Optional[UUID] = None
+    asset_type: Optional[AssetType] = None
+    chunks: Optional[List[List[float]]] = None
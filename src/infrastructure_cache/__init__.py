@@ -0,0 +1,9 @@
+"""Infrastructure cache - Answer and embedding cache implementations"""
+
+from .memory_answer_cache import MemoryAnswerCache
+from .tiered_embedding_cache import TieredEmbeddingCache
+
+__all__ = [
+    "MemoryAnswerCache",
+    "TieredEmbeddingCache",
+]
@@ -0,0 +1,201 @@
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+from uuid import UUID
+
+import numpy as np
+
+from src.application.caching.answer_cache import AnswerCache, CachedAnswer
+
+
+class _SemanticIndex:
+    """Ring buffer of recent question embeddings (unit-normalized) and their answers."""
+
+    def __init__(self, dim: int, capacity: int) -> None:
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires_at = np.full(capacity, -np.inf)
+        self.answers: list[CachedAnswer | None] = [None] * capacity
+        self.size = 0
+        self.next = 0
+
+    def add(self, unit: np.ndarray, expires_at: float, answer: CachedAnswer) -> None:
+        row = self.next
+        self.vectors[row] = unit
+        self.expires_at[row] = expires_at
+        self.answers[row] = answer
+        self.next = (row + 1) % len(self.answers)
+        self.size = min(self.size + 1, len(self.answers))
+
+    def best(self, unit: np.ndarray, now: float) -> tuple[float, CachedAnswer | None]:
+        scores = self.vectors[: self.size] @ unit
+        scores[self.expires_at[: self.size] <= now] = -np.inf
+        row = int(np.argmax(scores))
+        return float(scores[row]), self.answers[row]
+
+
+class MemoryAnswerCache(AnswerCache):
+    """Process-local LRU of answers with a TTL and per-domain versions.
+
+    Every entry records the version of its domain when it was stored;
+    :meth:`invalidate` just increments that version, so invalidating a
+    domain is O(1) and its stale entries are dropped lazily on lookup or
+    pushed out by the LRU bound.
+
+    With a ``semantic_threshold``, the last ``semantic_entries`` question
+    embeddings of each domain and scope are also kept in a small matrix;
+    a lookup is one matrix-vector product, and the closest unexpired
+    question is a hit when its cosine similarity reaches the threshold.
+    Invalidating a domain drops its semantic entries outright.
+
+    Writers pass the version they read before retrieving; an answer whose
+    domain was invalidated while it was being generated is not stored.
+
+    Entries are per process, but versions need not be: with a
+    ``version_dir`` shared by every worker, :meth:`invalidate` replaces
+    ``<version_dir>/<domain_id>`` with a fresh random token and
+    :meth:`version` reads it back, so an asset change made through one
+    worker makes every worker's cached answers for that domain stale.
+    Without it, the cache is only coherent when a single worker serves
+    the domain.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        semantic_threshold: float | None = None,
+        semantic_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+        version_dir: str | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.semantic_entries = semantic_entries
+        self._clock = clock
+        self.version_dir = version_dir
+        if version_dir:
+            os.makedirs(version_dir, exist_ok=True)
+        self._entries: OrderedDict[tuple[UUID, Hashable], tuple[int, float, CachedAnswer]] = OrderedDict()
+        self._versions: dict[UUID, int] = {}
+        # Semantic indexes per domain, with the domain version they were built under
+        self._semantic: dict[UUID, tuple[int, dict[Hashable, _SemanticIndex]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, domain_id: UUID, key: Hashable) -> CachedAnswer | None:
+        entry_key = (domain_id, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            version, expires_at, answer = entry
+            if version == self.version(domain_id) and expires_at > self._clock():
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return answer
+            del self._entries[entry_key]
+        self.misses += 1
+        return None
+
+    def version(self, domain_id: UUID) -> int:
+        if not self.version_dir:
+            return self._versions.get(domain_id, 0)
+        try:
+            with open(self._version_path(domain_id), "rb") as f:
+                return int.from_bytes(f.read(), "big")
+        except FileNotFoundError:
+            return 0
+
+    def put(self, domain_id: UUID, key: Hashable, answer: CachedAnswer, version: int | None = None) -> None:
+        current = self.version(domain_id)
+        if version is not None and version != current:
+            return
+        entry_key = (domain_id, key)
+        self._entries[entry_key] = (current, self._clock() + self.ttl_seconds, answer)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_similar(self, domain_id: UUID, scope: Hashable, embedding: list[float]) -> CachedAnswer | None:
+        if self.semantic_threshold is None:
+            return None
+        index = self._semantic_scopes(domain_id, self.version(domain_id)).get(scope)
+        unit = self._unit(embedding)
+        if index is not None and index.size and unit is not None and len(unit) == index.vectors.shape[1]:
+            score, answer = index.best(unit, self._clock())
+            if score >= self.semantic_threshold:
+                self.semantic_hits += 1
+                return answer
+        self.semantic_misses += 1
+        return None
+
+    def put_similar(
+        self, domain_id: UUID, scope: Hashable, embedding: list[float], answer: CachedAnswer, version: int | None = None
+    ) -> None:
+        unit = self._unit(embedding)
+        if self.semantic_threshold is None or unit is None:
+            return
+        current = self.version(domain_id)
+        if version is not None and version != current:
+            return
+        scopes = self._semantic_scopes(domain_id, current)
+        if not scopes:
+            self._semantic[domain_id] = (current, scopes)
+        index = scopes.get(scope)
+        if index is None or index.vectors.shape[1] != len(unit):
+            # A new embedding model starts a fresh index
+            index = scopes[scope] = _SemanticIndex(len(unit), self.semantic_entries)
+        index.add(unit, self._clock() + self.ttl_seconds, answer)
+
+    def invalidate(self, domain_id: UUID) -> None:
+        if self.version_dir:
+            # Replace rather than rewrite, so readers in other workers never see a partial token
+            fd, scratch = tempfile.mkstemp(prefix=f"{domain_id}.", dir=self.version_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(os.urandom(8))
+            os.replace(scratch, self._version_path(domain_id))
+        else:
+            self._versions[domain_id] = self._versions.get(domain_id, 0) + 1
+        self._semantic.pop(domain_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        semantic_lookups = self.semantic_hits + self.semantic_misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "semantic_enabled": self.semantic_threshold is not None,
+            "semantic_size": sum(index.size for _, scopes in self._semantic.values() for index in scopes.values()),
+            "semantic_hits": self.semantic_hits,
+            "semantic_misses": self.semantic_misses,
+            "semantic_hit_rate": self.semantic_hits / semantic_lookups if semantic_lookups else 0.0,
+        }
+
+    def _version_path(self, domain_id: UUID) -> str:
+        return os.path.join(self.version_dir, str(domain_id))
+
+    def _semantic_scopes(self, domain_id: UUID, version: int) -> dict[Hashable, _SemanticIndex]:
+        """The domain's semantic indexes, dropped if another worker invalidated the domain since they were built."""
+        built_under, scopes = self._semantic.get(domain_id, (version, {}))
+        if built_under != version:
+            del self._semantic[domain_id]
+            return {}
+        return scopes
+
+    @staticmethod
+    def _unit(embedding: list[float]) -> np.ndarray | None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
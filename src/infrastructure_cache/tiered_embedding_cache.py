@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.application.caching.embedding_cache import EmbeddingCache
+
+# Keys per SELECT ... IN (...), below SQLite's bound-parameter limit
+_LOAD_BATCH = 500
+
+
+class TieredEmbeddingCache(EmbeddingCache):
+    """Embedding cache with an in-memory LRU in front of an optional SQLite file.
+
+    Vectors are stored as little-endian float32 blobs, so a disk hit
+    returns the vector the provider produced (up to float32 rounding).
+    The disk tier survives restarts and is shared by every worker pointing
+    at the same file (SQLite WAL mode lets readers proceed during writes).
+    Disk hits are promoted into the LRU.
+
+    The two tiers are reachable separately so async callers keep only the
+    LRU on the event loop: :meth:`peek_many` and :meth:`remember_many`
+    never touch the file, while :meth:`load_many` (one ``SELECT`` per 500
+    keys) and :meth:`store_many` (one ``executemany`` in one transaction)
+    are meant to run in a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: OrderedDict[bytes, list[float]] = OrderedDict()
+        # Guards the LRU, which the event loop and disk threads both touch; held only briefly
+        self._lock = threading.Lock()
+        # Serializes use of the shared connection; never taken on the event loop by async callers
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> list[float] | None:
+        embedding = self.peek_many([key])[0]
+        if embedding is None:
+            embedding = self.load_many([key])[0]
+        return embedding
+
+    def put(self, key: bytes, embedding: list[float]) -> None:
+        self.remember_many([(key, embedding)])
+        self.store_many([(key, embedding)])
+
+    def peek_many(self, keys: list[bytes]) -> list[list[float] | None]:
+        found = []
+        with self._lock:
+            for key in keys:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                found.append(embedding)
+        return found
+
+    def load_many(self, keys: list[bytes]) -> list[list[float] | None]:
+        rows: dict[bytes, bytes] = {}
+        if self._db is not None and keys:
+            with self._db_lock:
+                for start in range(0, len(keys), _LOAD_BATCH):
+                    batch = keys[start:start + _LOAD_BATCH]
+                    placeholders = ", ".join("?" * len(batch))
+                    rows.update(self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall())
+        found = [np.frombuffer(rows[key], dtype="<f4").tolist() if key in rows else None for key in keys]
+        with self._lock:
+            for key, embedding in zip(keys, found):
+                if embedding is not None:
+                    self._remember(key, embedding)
+            self.disk_hits += sum(embedding is not None for embedding in found)
+            self.misses += sum(embedding is None for embedding in found)
+        return found
+
+    def remember_many(self, entries: list[tuple[bytes, list[float]]]) -> None:
+        with self._lock:
+            for key, embedding in entries:
+                self._remember(key, embedding)
+
+    def store_many(self, entries: list[tuple[bytes, list[float]]]) -> None:
+        if self._db is None or not entries:
+            return
+        rows = [(key, np.asarray(embedding, dtype="<f4").tobytes()) for key, embedding in entries]
+        with self._db_lock:
+            # One transaction (one WAL commit) per batch rather than per vector
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def stats(self) -> dict:
+        saved = self.memory_hits + self.disk_hits
+        lookups = saved + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": saved / lookups if lookups else 0.0,
+            "saved_calls": saved,
+        }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: bytes, embedding: list[float]) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
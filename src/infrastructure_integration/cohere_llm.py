@@ -1,3 +1,5 @@
+import re
+from typing import AsyncIterator
 from src.application.integration.llm_provider import LLMProvider
 
 
@@ -7,3 +9,19 @@ class CohereLLM(LLMProvider):
 
     def embed(self, text: str) -> list[float]:
         return [float(len(text))]
+
+    # The stub does no I/O, so the async methods answer inline instead of on a thread
+
+    async def acomplete(self, prompt: str) -> str:
+        return self.complete(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        # Word-sized pieces, whitespace attached, so joining them restores the completion
+        for piece in re.findall(r"\S+\s*|\s+", self.complete(prompt)):
+            yield piece
+
+    async def aembed(self, text: str) -> list[float]:
+        return self.embed(text)
+
+    async def aembed_many(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_many(texts)
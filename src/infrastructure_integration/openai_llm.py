@@ -1,14 +1,32 @@
+import json
 import os
+import threading
+from typing import AsyncIterator
 from src.application.integration.llm_provider import LLMProvider
 
 try:
-    import openai  # type: ignore
+    import httpx  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
-    openai = None
+    httpx = None
+
+try:
+    import h2  # type: ignore  # noqa: F401
+    HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
 
 
 class OpenAILLM(LLMProvider):
-    """LLM provider that delegates to OpenAI's API."""
+    """LLM provider that calls OpenAI's REST API directly over pooled HTTP connections.
+
+    One ``httpx.AsyncClient`` (and, for the sync shims, one
+    ``httpx.Client``) is created lazily per provider and reused for every
+    call, so requests ride keep-alive connections, negotiate HTTP/2 when
+    ``h2`` is installed, and share one connection pool. The provider is a
+    process-wide singleton; :meth:`aclose` releases the pool at shutdown.
+    """
 
     def __init__(
         self,
@@ -16,41 +34,151 @@ class OpenAILLM(LLMProvider):
         base_url: str | None = None,
         model: str = "gpt-3.5-turbo",
         embed_model: str = "text-embedding-ada-002",
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = True,
     ) -> None:
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        self.base_url = base_url or os.getenv("OPENAI_API_BASE")
+        self.base_url = (base_url or os.getenv("OPENAI_API_BASE") or DEFAULT_BASE_URL).rstrip("/")
         self.model = model
         self.embed_model = embed_model
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._async_client = None
+        self._sync_client = None
+        self._client_lock = threading.Lock()
 
-    def _ensure_client(self) -> None:
-        if openai is None:
-            raise RuntimeError("openai package is not installed")
-        openai.api_key = self.api_key
-        if self.base_url:
-            openai.base_url = self.base_url
+    @property
+    def embedding_model(self) -> str:
+        return self.embed_model
 
     def complete(self, prompt: str) -> str:
-        """Generate a completion for the given prompt."""
-        self._ensure_client()
+        """Generate a completion for the given prompt (blocking)."""
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.7,
-            )
-            return response.choices[0].message.content.strip()
+            response = self._client().post("/chat/completions", json=self._completion_payload(prompt))
+            return self._completion_text(response)
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {e}") from e
 
     def embed(self, text: str) -> list[float]:
-        """Generate an embedding vector for the given text."""
-        self._ensure_client()
+        """Generate an embedding vector for the given text (blocking)."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts with a single blocking request."""
+        if not texts:
+            return []
         try:
-            response = openai.Embedding.create(
-                model=self.embed_model,
-                input=text,
-            )
-            return response.data[0].embedding
+            response = self._client().post("/embeddings", json={"model": self.embed_model, "input": texts})
+            return self._embeddings(response)
         except Exception as e:
             raise RuntimeError(f"OpenAI embedding error: {e}") from e
+
+    async def acomplete(self, prompt: str) -> str:
+        """Generate a completion without blocking the event loop."""
+        try:
+            response = await self._aclient().post("/chat/completions", json=self._completion_payload(prompt))
+            return self._completion_text(response)
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}") from e
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream completion deltas from the server-sent event stream.
+
+        The response is read inside ``client.stream``; when the consumer
+        closes this iterator (e.g. the HTTP client disconnected) the
+        upstream response is closed and OpenAI stops generating tokens.
+        """
+        payload = {**self._completion_payload(prompt), "stream": True}
+        try:
+            async with self._aclient().stream("POST", "/chat/completions", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    piece = choices[0].get("delta", {}).get("content")
+                    if piece:
+                        yield piece
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}") from e
+
+    async def aembed(self, text: str) -> list[float]:
+        return (await self.aembed_many([text]))[0]
+
+    async def aembed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts with a single request; the endpoint accepts an array input."""
+        if not texts:
+            return []
+        try:
+            response = await self._aclient().post("/embeddings", json={"model": self.embed_model, "input": texts})
+            return self._embeddings(response)
+        except Exception as e:
+            raise RuntimeError(f"OpenAI embedding error: {e}") from e
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    def _client_options(self) -> dict:
+        if httpx is None:
+            raise RuntimeError("httpx package is not installed")
+        if not self.api_key and self.base_url == DEFAULT_BASE_URL:
+            raise RuntimeError("OPENAI_API_KEY is not configured")
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        return {
+            "base_url": self.base_url,
+            "headers": headers,
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+            ),
+            "http2": self.http2,
+        }
+
+    def _aclient(self):
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    def _client(self):
+        if self._sync_client is None:
+            with self._client_lock:
+                if self._sync_client is None:
+                    self._sync_client = httpx.Client(**self._client_options())
+        return self._sync_client
+
+    def _completion_payload(self, prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 1000,
+            "temperature": 0.7,
+        }
+
+    @staticmethod
+    def _completion_text(response) -> str:
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    @staticmethod
+    def _embeddings(response) -> list[list[float]]:
+        response.raise_for_status()
+        # Results carry their input index; don't rely on response order
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
@@ -0,0 +1,7 @@
+"""Infrastructure lexical - Keyword index implementations"""
+
+from .memory_bm25_index import MemoryBM25Index
+
+__all__ = [
+    "MemoryBM25Index",
+]
@@ -0,0 +1,121 @@
+import heapq
+import math
+import time
+from collections import Counter
+from typing import Callable, Iterable
+from uuid import UUID
+from src.application.retrieval.lexical_index import LexicalIndex
+from src.common.text import TokenStreamCache, tokenize
+
+
+class _DomainPostings:
+    """Inverted index of one domain: term -> {asset_id: term frequency}."""
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[UUID, int]] = {}
+        self.doc_terms: dict[UUID, Counter] = {}
+        self.doc_lengths: dict[UUID, int] = {}
+        self.doc_digests: dict[UUID, bytes] = {}
+        self.total_length = 0
+
+    def add(self, asset_id: UUID, digest: bytes, tokens: list[str]) -> None:
+        if self.doc_digests.get(asset_id) == digest:
+            return
+        self.remove(asset_id)
+        terms = Counter(tokens)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[asset_id] = tf
+        self.doc_terms[asset_id] = terms
+        self.doc_lengths[asset_id] = len(tokens)
+        self.doc_digests[asset_id] = digest
+        self.total_length += len(tokens)
+
+    def remove(self, asset_id: UUID) -> None:
+        terms = self.doc_terms.pop(asset_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings[term]
+            del docs[asset_id]
+            if not docs:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(asset_id)
+        del self.doc_digests[asset_id]
+
+
+class MemoryBM25Index(LexicalIndex):
+    """In-process inverted index per domain scored with Okapi BM25.
+
+    ``k1`` controls term-frequency saturation and ``b`` document-length
+    normalization. Only the postings of the query terms are visited, so
+    cost scales with how common those terms are rather than domain size.
+
+    Text goes through the Arabic normalizer and light stemmer of
+    :mod:`src.common.text`. Token streams are cached per asset, so
+    re-adding unchanged content (restores, repeated updates) is a digest
+    comparison rather than a re-tokenization.
+
+    The index only sees writes made in this process, so a domain counts as
+    stale until it is loaded from the repository and again
+    ``reload_seconds`` later, which picks up assets written by other
+    workers. Reloading unchanged assets costs a digest comparison each.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        token_cache: TokenStreamCache | None = None,
+        reload_seconds: float | None = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.token_cache = token_cache or TokenStreamCache()
+        self.reload_seconds = reload_seconds
+        self._clock = clock
+        self._domains: dict[UUID, _DomainPostings] = {}
+        self._loaded_at: dict[UUID, float] = {}
+
+    def add(self, domain_id: UUID, asset_id: UUID, text: str) -> None:
+        digest, tokens = self.token_cache.get(asset_id, text)
+        self._domains.setdefault(domain_id, _DomainPostings()).add(asset_id, digest, tokens)
+
+    def remove(self, domain_id: UUID, asset_id: UUID) -> None:
+        domain = self._domains.get(domain_id)
+        if domain is not None:
+            domain.remove(asset_id)
+
+    def load(self, domain_id: UUID, documents: Iterable[tuple[UUID, str]]) -> None:
+        domain = self._domains.setdefault(domain_id, _DomainPostings())
+        live = set()
+        for asset_id, text in documents:
+            digest, tokens = self.token_cache.get(asset_id, text)
+            domain.add(asset_id, digest, tokens)
+            live.add(asset_id)
+        for asset_id in [asset_id for asset_id in domain.doc_lengths if asset_id not in live]:
+            domain.remove(asset_id)
+        self._loaded_at[domain_id] = self._clock()
+
+    def is_stale(self, domain_id: UUID) -> bool:
+        loaded_at = self._loaded_at.get(domain_id)
+        if loaded_at is None:
+            return True
+        return self.reload_seconds is not None and self._clock() - loaded_at >= self.reload_seconds
+
+    def search(self, domain_id: UUID, text: str, top_k: int = 5) -> list[tuple[UUID, float]]:
+        domain = self._domains.get(domain_id)
+        if domain is None or not domain.doc_lengths:
+            return []
+        doc_count = len(domain.doc_lengths)
+        avg_length = domain.total_length / doc_count or 1.0
+        scores: dict[UUID, float] = {}
+        for term in set(tokenize(text)):
+            docs = domain.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for asset_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * domain.doc_lengths[asset_id] / avg_length)
+                scores[asset_id] = scores.get(asset_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda pair: pair[1])
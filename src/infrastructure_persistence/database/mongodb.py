@@ -23,6 +23,8 @@ async def connect_to_mongo():
         
         # Test the connection
         await mongodb.client.admin.command('ismaster')
+        # Chunked assets are found by chunk id when resolving vector search hits
+        await mongodb.database.assets.create_index("chunk_ids", sparse=True)
         logger.info(f"Connected to MongoDB database: {settings.MONGODB_DATABASE}")
         
     except ConnectionFailure as e:
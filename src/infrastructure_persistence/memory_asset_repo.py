@@ -1,23 +1,44 @@
-from typing import List
+from typing import AsyncIterator, Dict, List, Tuple
 from uuid import UUID
 from src.domain.entities.asset import Asset
+from src.domain.entities.chunk import chunk_id
 from src.domain.persistence.asset_repository import AssetRepository
+from src.domain.value_objects.asset_embedding import AssetEmbedding
+from .embedding_codec import decode_chunks, decode_embedding, encode_chunks, encode_embedding
 
 
 class MemoryAssetRepository(AssetRepository):
-    def __init__(self) -> None:
+    def __init__(self, embedding_dtype: str = "float16") -> None:
         self.assets: List[Asset] = []
+        self._by_id: Dict[UUID, Asset] = {}
+        self.embedding_dtype = embedding_dtype
+        # asset_id -> (packed vector, dtype, model, packed chunk vectors), packed like the Mongo binary fields
+        self._embeddings: Dict[UUID, Tuple[bytes, str, str, bytes | None]] = {}
+        self._chunk_owners: Dict[UUID, UUID] = {}
 
     async def add(self, asset: Asset) -> None:
         self.assets.append(asset)
+        self._by_id[asset.id] = asset
+
+    async def add_many(self, assets: List[Asset]) -> Dict[UUID, str]:
+        failed = {}
+        for asset in assets:
+            if asset.id in self._by_id:
+                failed[asset.id] = "Asset already exists"
+            else:
+                await self.add(asset)
+        return failed
 
     async def get(self, asset_id: UUID, include_deleted: bool = False) -> Asset | None:
-        for a in self.assets:
-            if a.id == asset_id:
-                if include_deleted or not a.is_deleted():
-                    return a
+        a = self._by_id.get(asset_id)
+        if a is not None and (include_deleted or not a.is_deleted()):
+            return a
         return None
 
+    async def get_many(self, asset_ids: List[UUID], include_deleted: bool = False) -> List[Asset]:
+        assets = (self._by_id.get(asset_id) for asset_id in asset_ids)
+        return [a for a in assets if a is not None and (include_deleted or not a.is_deleted())]
+
     async def list(self, domain_id: UUID | None = None, category_id: UUID | None = None, include_deleted: bool = False) -> List[Asset]:
         assets = list(self.assets)
         
@@ -40,6 +61,7 @@ class MemoryAssetRepository(AssetRepository):
             if a.id == asset.id:
                 asset.update()
                 self.assets[i] = asset
+                self._by_id[asset.id] = asset
                 break
 
     async def soft_delete(self, asset_id: UUID) -> None:
@@ -51,3 +73,49 @@ class MemoryAssetRepository(AssetRepository):
         asset = await self.get(asset_id, include_deleted=True)
         if asset:
             asset.restore()
+
+    async def save_embedding(
+        self, asset_id: UUID, embedding: List[float], model: str, chunks: List[List[float]] | None = None
+    ) -> None:
+        previous = await self.get_embedding(asset_id)
+        for position in range(len(previous.chunks or ()) if previous else 0):
+            self._chunk_owners.pop(chunk_id(asset_id, position), None)
+        packed_chunks = encode_chunks(chunks, self.embedding_dtype) if chunks else None
+        self._embeddings[asset_id] = (
+            encode_embedding(embedding, self.embedding_dtype), self.embedding_dtype, model, packed_chunks
+        )
+        for position in range(len(chunks or ())):
+            self._chunk_owners[chunk_id(asset_id, position)] = asset_id
+
+    async def save_embeddings(self, embeddings: List[AssetEmbedding]) -> None:
+        for stored in embeddings:
+            await self.save_embedding(stored.asset_id, stored.vector, stored.model, stored.chunks)
+
+    async def get_embedding(self, asset_id: UUID) -> AssetEmbedding | None:
+        asset = self._by_id.get(asset_id)
+        stored = self._embeddings.get(asset_id)
+        if asset is None or stored is None:
+            return None
+        return self._to_embedding(asset, stored)
+
+    async def get_embeddings(self, asset_ids: List[UUID]) -> List[AssetEmbedding]:
+        found = [await self.get_embedding(asset_id) for asset_id in asset_ids]
+        return [stored for stored in found if stored is not None]
+
+    async def get_chunk_owners(self, chunk_ids: List[UUID]) -> Dict[UUID, UUID]:
+        return {cid: self._chunk_owners[cid] for cid in chunk_ids if cid in self._chunk_owners}
+
+    async def iter_embeddings(self, domain_id: UUID | None = None) -> AsyncIterator[AssetEmbedding]:
+        for asset in await self.list(domain_id=domain_id):
+            stored = self._embeddings.get(asset.id)
+            if stored is not None:
+                yield self._to_embedding(asset, stored)
+
+    @staticmethod
+    def _to_embedding(asset: Asset, stored: Tuple[bytes, str, str, bytes | None]) -> AssetEmbedding:
+        data, dtype, model, packed_chunks = stored
+        vector = decode_embedding(data, dtype)
+        return AssetEmbedding(
+            asset.id, asset.domain_id, vector, model, asset.category_id, asset.asset_type,
+            chunks=decode_chunks(packed_chunks, dtype, len(vector)) if packed_chunks else None,
+        )
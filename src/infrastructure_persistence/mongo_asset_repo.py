@@ -1,15 +1,34 @@
-from typing import List
+from typing import AsyncIterator, Dict, List
 from uuid import UUID
+from bson import Binary
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from src.domain.entities.asset import Asset
+from src.domain.entities.chunk import chunk_id
 from src.domain.enums.asset_type import AssetType
 from src.domain.persistence.asset_repository import AssetRepository
+from src.domain.value_objects.asset_embedding import AssetEmbedding
 from .database.mongodb import get_database
+from .embedding_codec import decode_chunks, decode_embedding, encode_chunks, encode_embedding
+
+# Asset reads never need the embedding blobs
+_WITHOUT_EMBEDDING = {"embedding": 0, "chunk_embeddings": 0, "chunk_ids": 0}
+_EMBEDDING_FIELDS = {
+    "domain_id": 1,
+    "category_id": 1,
+    "asset_type": 1,
+    "embedding": 1,
+    "embedding_dtype": 1,
+    "embedding_model": 1,
+    "chunk_embeddings": 1,
+}
 
 
 class MongoAssetRepository(AssetRepository):
-    def __init__(self):
+    def __init__(self, embedding_dtype: str = "float16"):
         self._collection: AsyncIOMotorCollection = None
+        self.embedding_dtype = embedding_dtype
 
     @property
     def collection(self) -> AsyncIOMotorCollection:
@@ -20,56 +39,47 @@ class MongoAssetRepository(AssetRepository):
 
     async def add(self, asset: Asset) -> None:
         """Add an asset to the database"""
-        asset_doc = {
-            "_id": str(asset.id),
-            "name": asset.name,
-            "domain_id": str(asset.domain_id),
-            "asset_type": asset.asset_type.value,
-            "content": asset.content,
-            "category_id": str(asset.category_id) if asset.category_id else None
-        }
-        await self.collection.insert_one(asset_doc)
+        await self.collection.insert_one(self._to_document(asset))
+
+    async def add_many(self, assets: List[Asset]) -> Dict[UUID, str]:
+        """Insert assets with one unordered insert_many, so one bad document does not stop the rest"""
+        if not assets:
+            return {}
+        try:
+            await self.collection.insert_many([self._to_document(asset) for asset in assets], ordered=False)
+        except BulkWriteError as e:
+            return {assets[error["index"]].id: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        return {}
 
     async def get(self, asset_id: UUID) -> Asset | None:
         """Get an asset by ID"""
-        asset_doc = await self.collection.find_one({"_id": str(asset_id)})
+        asset_doc = await self.collection.find_one({"_id": str(asset_id)}, _WITHOUT_EMBEDDING)
         if asset_doc:
-            return Asset(
-                id=UUID(asset_doc["_id"]),
-                name=asset_doc["name"],
-                domain_id=UUID(asset_doc["domain_id"]),
-                asset_type=AssetType(asset_doc["asset_type"]),
-                content=asset_doc.get("content"),
-                category_id=UUID(asset_doc["category_id"]) if asset_doc.get("category_id") else None
-            )
+            return self._to_asset(asset_doc)
         return None
 
+    async def get_many(self, asset_ids: List[UUID], include_deleted: bool = False) -> List[Asset]:
+        """Get several assets with a single $in query, in the order requested"""
+        query = {"_id": {"$in": [str(asset_id) for asset_id in asset_ids]}}
+        if not include_deleted:
+            query["deleted_at"] = None
+        by_id = {}
+        async for asset_doc in self.collection.find(query, _WITHOUT_EMBEDDING):
+            by_id[asset_doc["_id"]] = self._to_asset(asset_doc)
+        return [by_id[str(asset_id)] for asset_id in asset_ids if str(asset_id) in by_id]
+
     async def list(self, domain_id: UUID) -> List[Asset]:
         """List all assets for a domain"""
         assets = []
-        async for asset_doc in self.collection.find({"domain_id": str(domain_id)}):
-            assets.append(Asset(
-                id=UUID(asset_doc["_id"]),
-                name=asset_doc["name"],
-                domain_id=UUID(asset_doc["domain_id"]),
-                asset_type=AssetType(asset_doc["asset_type"]),
-                content=asset_doc.get("content"),
-                category_id=UUID(asset_doc["category_id"]) if asset_doc.get("category_id") else None
-            ))
+        async for asset_doc in self.collection.find({"domain_id": str(domain_id)}, _WITHOUT_EMBEDDING):
+            assets.append(self._to_asset(asset_doc))
         return assets
 
     async def list_by_category(self, category_id: UUID) -> List[Asset]:
         """List all assets for a category"""
         assets = []
-        async for asset_doc in self.collection.find({"category_id": str(category_id)}):
-            assets.append(Asset(
-                id=UUID(asset_doc["_id"]),
-                name=asset_doc["name"],
-                domain_id=UUID(asset_doc["domain_id"]),
-                asset_type=AssetType(asset_doc["asset_type"]),
-                content=asset_doc.get("content"),
-                category_id=UUID(asset_doc["category_id"]) if asset_doc.get("category_id") else None
-            ))
+        async for asset_doc in self.collection.find({"category_id": str(category_id)}, _WITHOUT_EMBEDDING):
+            assets.append(self._to_asset(asset_doc))
         return assets
 
     async def update(self, asset: Asset) -> None:
@@ -89,3 +99,110 @@ class MongoAssetRepository(AssetRepository):
     async def delete(self, asset_id: UUID) -> None:
         """Delete an asset by ID"""
         await self.collection.delete_one({"_id": str(asset_id)})
+
+    async def save_embedding(
+        self, asset_id: UUID, embedding: List[float], model: str, chunks: List[List[float]] | None = None
+    ) -> None:
+        """Store the embedding as packed binary rather than an array of doubles
+
+        Chunk embeddings are packed into one more binary field, and their ids
+        are kept in ``chunk_ids`` (multikey-indexed) to resolve search hits.
+        """
+        await self.collection.update_one({"_id": str(asset_id)}, self._embedding_update(asset_id, embedding, model, chunks))
+
+    async def save_embeddings(self, embeddings: List[AssetEmbedding]) -> None:
+        """Store several embeddings with a single unordered bulk_write"""
+        if not embeddings:
+            return
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": str(stored.asset_id)},
+                    self._embedding_update(stored.asset_id, stored.vector, stored.model, stored.chunks),
+                )
+                for stored in embeddings
+            ],
+            ordered=False,
+        )
+
+    def _embedding_update(
+        self, asset_id: UUID, embedding: List[float], model: str, chunks: List[List[float]] | None
+    ) -> dict:
+        fields = {
+            "embedding": Binary(encode_embedding(embedding, self.embedding_dtype)),
+            "embedding_dtype": self.embedding_dtype,
+            "embedding_model": model,
+        }
+        if chunks:
+            fields["chunk_embeddings"] = Binary(encode_chunks(chunks, self.embedding_dtype))
+            fields["chunk_ids"] = [str(chunk_id(asset_id, position)) for position in range(len(chunks))]
+            return {"$set": fields}
+        return {"$set": fields, "$unset": {"chunk_embeddings": "", "chunk_ids": ""}}
+
+    async def get_embedding(self, asset_id: UUID) -> AssetEmbedding | None:
+        """Get the stored embedding of an asset"""
+        asset_doc = await self.collection.find_one(
+            {"_id": str(asset_id), "embedding": {"$exists": True}}, _EMBEDDING_FIELDS
+        )
+        if asset_doc:
+            return self._to_embedding(asset_doc)
+        return None
+
+    async def get_embeddings(self, asset_ids: List[UUID]) -> List[AssetEmbedding]:
+        """Get stored embeddings of several assets with a single $in query"""
+        query = {"_id": {"$in": [str(asset_id) for asset_id in asset_ids]}, "embedding": {"$exists": True}}
+        return [self._to_embedding(asset_doc) async for asset_doc in self.collection.find(query, _EMBEDDING_FIELDS)]
+
+    async def get_chunk_owners(self, chunk_ids: List[UUID]) -> Dict[UUID, UUID]:
+        """Resolve chunk ids to asset ids with a single $in query on the chunk_ids index"""
+        wanted = {str(cid) for cid in chunk_ids}
+        owners = {}
+        async for asset_doc in self.collection.find({"chunk_ids": {"$in": list(wanted)}}, {"chunk_ids": 1}):
+            for cid in wanted.intersection(asset_doc["chunk_ids"]):
+                owners[UUID(cid)] = UUID(asset_doc["_id"])
+        return owners
+
+    async def iter_embeddings(self, domain_id: UUID | None = None) -> AsyncIterator[AssetEmbedding]:
+        """Stream stored embeddings of non-deleted assets in server-side batches"""
+        query = {"embedding": {"$exists": True}, "deleted_at": None}
+        if domain_id is not None:
+            query["domain_id"] = str(domain_id)
+        async for asset_doc in self.collection.find(query, _EMBEDDING_FIELDS).batch_size(1000):
+            yield self._to_embedding(asset_doc)
+
+    @staticmethod
+    def _to_embedding(asset_doc: dict) -> AssetEmbedding:
+        vector = decode_embedding(asset_doc["embedding"], asset_doc["embedding_dtype"])
+        packed_chunks = asset_doc.get("chunk_embeddings")
+        return AssetEmbedding(
+            asset_id=UUID(asset_doc["_id"]),
+            domain_id=UUID(asset_doc["domain_id"]),
+            vector=vector,
+            model=asset_doc["embedding_model"],
+            category_id=UUID(asset_doc["category_id"]) if asset_doc.get("category_id") else None,
+            asset_type=AssetType(asset_doc["asset_type"]) if asset_doc.get("asset_type") else None,
+            chunks=decode_chunks(packed_chunks, asset_doc["embedding_dtype"], len(vector)) if packed_chunks else None,
+        )
+
+    @staticmethod
+    def _to_document(asset: Asset) -> dict:
+        return {
+            "_id": str(asset.id),
+            "name": asset.name,
+            "domain_id": str(asset.domain_id),
+            "asset_type": asset.asset_type.value,
+            "content": asset.content,
+            "category_id": str(asset.category_id) if asset.category_id else None
+        }
+
+    @staticmethod
+    def _to_asset(asset_doc: dict) -> Asset:
+        """Map a stored document back to an Asset entity"""
+        return Asset(
+            id=UUID(asset_doc["_id"]),
+            name=asset_doc["name"],
+            domain_id=UUID(asset_doc["domain_id"]),
+            asset_type=AssetType(asset_doc["asset_type"]),
+            content=asset_doc.get("content"),
+            category_id=UUID(asset_doc["category_id"]) if asset_doc.get("category_id") else None
+        )
@@ -1,9 +1,13 @@
 """Infrastructure VectorDB - Vector database implementations"""
 
 from .memory_vector_db import MemoryVectorDB
+from .hnsw_vector_db import HNSWVectorDB
 from .qdrant_vector_db import QdrantVectorDB
+from .chunked_vector_db import ChunkedVectorDB
 
 __all__ = [
     "MemoryVectorDB",
+    "HNSWVectorDB",
     "QdrantVectorDB",
+    "ChunkedVectorDB",
 ]
@@ -0,0 +1,150 @@
+from typing import Iterable
+from uuid import UUID
+from src.domain.entities.asset import Asset
+from src.domain.entities.chunk import chunk_id
+from src.domain.enums.asset_type import AssetType
+from src.application.vectordb.vector_db import VectorDB, VectorRecord
+from src.domain.persistence.asset_repository import AssetRepository
+from .hydration import hydrate
+
+
+class ChunkedVectorDB(VectorDB):
+    """Chunk-level vectors on top of any vector DB.
+
+    ``add_chunks`` writes one vector per chunk to the wrapped backend under
+    the chunk's stable id, so the backend needs no notion of chunks. A
+    search asks the backend for ``top_k * oversample`` vectors, maps chunk
+    ids back to their assets, scores each asset by its best chunk and keeps
+    the first ``top_k`` assets. Unchunked assets keep a single vector under
+    their own id and pass straight through.
+
+    The vector -> asset map lives in memory. Ids this process has not
+    written (a persistent backend after a restart) are resolved through the
+    repository once and remembered.
+    """
+
+    def __init__(self, inner: VectorDB, asset_repo: AssetRepository, oversample: int = 4) -> None:
+        self.inner = inner
+        self._asset_repo = asset_repo
+        self.oversample = oversample
+        self._owners: dict[UUID, UUID] = {}
+        self._chunk_counts: dict[UUID, int] = {}
+
+    async def add(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        await self._drop_chunks(domain_id, asset_id)
+        await self.inner.add(domain_id, asset_id, embedding, category_id, asset_type)
+        self._owners[asset_id] = asset_id
+
+    async def add_many(self, domain_id: UUID, items: Iterable[VectorRecord | tuple[UUID, list[float]]]) -> None:
+        records = [VectorRecord(*item) for item in items]
+        for record in records:
+            if self._chunk_counts.get(record.asset_id):
+                await self._drop_chunks(domain_id, record.asset_id)
+            self._owners[record.asset_id] = record.asset_id
+        await self.inner.add_many(domain_id, records)
+
+    async def add_chunks(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embeddings: list[list[float]],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        """Write one vector per chunk; chunk ids are stable, so re-chunking overwrites in place."""
+        await self._drop_chunks(domain_id, asset_id, keep=len(embeddings))
+        await self.inner.delete(domain_id, asset_id)
+        self._owners.pop(asset_id, None)
+        ids = [chunk_id(asset_id, position) for position in range(len(embeddings))]
+        await self.inner.add_many(
+            domain_id,
+            [VectorRecord(cid, embedding, category_id, asset_type) for cid, embedding in zip(ids, embeddings)],
+        )
+        self._owners.update((cid, asset_id) for cid in ids)
+        self._chunk_counts[asset_id] = len(ids)
+
+    async def update(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        await self._drop_chunks(domain_id, asset_id)
+        await self.inner.update(domain_id, asset_id, embedding, category_id, asset_type)
+        self._owners[asset_id] = asset_id
+
+    async def delete(self, domain_id: UUID, asset_id: UUID) -> None:
+        await self._drop_chunks(domain_id, asset_id)
+        await self.inner.delete(domain_id, asset_id)
+        self._owners.pop(asset_id, None)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    async def search(
+        self,
+        domain_id: UUID,
+        embedding: list[float],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[tuple[Asset, float]]:
+        [hits] = await self.search_many(domain_id, [embedding], top_k, category_id, asset_type)
+        return await hydrate(self._asset_repo, hits)
+
+    async def search_many(
+        self,
+        domain_id: UUID,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        per_query = await self.inner.search_many(
+            domain_id, embeddings, top_k * self.oversample, category_id, asset_type
+        )
+        await self._resolve_owners({vector_id for hits in per_query for vector_id, _ in hits})
+        return [self._collapse(hits, top_k) for hits in per_query]
+
+    def _collapse(self, hits: list[tuple[UUID, float]], top_k: int) -> list[tuple[UUID, float]]:
+        """Keep each asset's first (best scoring) vector, in rank order."""
+        best: dict[UUID, float] = {}
+        for vector_id, score in hits:
+            best.setdefault(self._owners[vector_id], score)
+            if len(best) == top_k:
+                break
+        return list(best.items())
+
+    async def _resolve_owners(self, vector_ids: set[UUID]) -> None:
+        unknown = [vector_id for vector_id in vector_ids if vector_id not in self._owners]
+        if not unknown:
+            return
+        owners = await self._asset_repo.get_chunk_owners(unknown)
+        for vector_id in unknown:
+            self._owners[vector_id] = owners.get(vector_id, vector_id)
+
+    async def _drop_chunks(self, domain_id: UUID, asset_id: UUID, keep: int = 0) -> None:
+        """Delete the asset's chunk vectors from position ``keep`` on.
+
+        Call before the repository stores the asset's new embedding: after a
+        restart the previous chunk count is only known from what is stored.
+        """
+        count = self._chunk_counts.pop(asset_id, None)
+        if count is None and asset_id in self._owners:
+            count = 0
+        if count is None:
+            stored = await self._asset_repo.get_embedding(asset_id)
+            count = len(stored.chunks) if stored is not None and stored.chunks else 0
+        for position in range(keep, count):
+            cid = chunk_id(asset_id, position)
+            await self.inner.delete(domain_id, cid)
+            self._owners.pop(cid, None)
@@ -0,0 +1,16 @@
+from uuid import UUID
+
+from src.domain.enums.asset_type import AssetType
+
+
+def filter_labels(category_id: UUID | None = None, asset_type: AssetType | str | None = None) -> list[str]:
+    """Row labels used by the in-process indexes for the filterable asset attributes.
+
+    The same labels tag rows on insert and select them on search.
+    """
+    labels = []
+    if category_id is not None:
+        labels.append(f"category_id:{category_id}")
+    if asset_type is not None:
+        labels.append(f"asset_type:{AssetType(asset_type).value}")
+    return labels
@@ -0,0 +1,183 @@
+import threading
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+
+from .row_table import RowTable
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows (or a single vector) to unit length, leaving zero vectors untouched."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def as_vector(embedding: list[float], dim: int) -> np.ndarray:
+    """Convert an embedding to a float32 array, checking its dimension."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    if vector.shape != (dim,):
+        raise ValueError(f"Expected embedding of dimension {dim}, got {vector.shape[-1] if vector.ndim else 0}")
+    return vector
+
+
+def as_matrix(embeddings: list[list[float]], dim: int) -> np.ndarray:
+    """Convert a batch of embeddings to a float32 matrix, checking its dimension."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.size == 0:
+        return np.empty((0, dim), dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[1] != dim:
+        raise ValueError(f"Expected embeddings of dimension {dim}, got shape {matrix.shape}")
+    return matrix
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the ``top_k`` highest scores, best first.
+
+    ``argpartition`` selects the candidates in linear time so only ``top_k``
+    values are actually sorted.
+    """
+    if top_k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < scores.size:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise :func:`top_k_indices` for a ``(queries, candidates)`` score matrix.
+
+    Returns the selected column indices and their scores, best first per row.
+    """
+    top_k = min(top_k, scores.shape[1])
+    if top_k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.intp), empty
+    if top_k < scores.shape[1]:
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+# Upper bound on score-matrix cells materialized per batched query block
+_BATCH_CELLS = 1 << 24
+
+
+class FlatIndex:
+    """Exact cosine index for one domain backed by a contiguous float32 matrix.
+
+    Rows are normalized on insert so a query is a single matrix-vector
+    product. Storage grows geometrically to keep appends amortized O(1).
+
+    Deletes and re-adds tombstone the old row (see :class:`RowTable`);
+    :meth:`compact` rewrites the matrix without dead rows and can run on a
+    background thread while searches and inserts continue.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024) -> None:
+        self.dim = dim
+        self._vectors = np.empty((max(capacity, 1), dim), dtype=np.float32)
+        self._rows = RowTable(capacity)
+        self._lock = threading.Lock()
+        self._compacting = False
+
+    def __len__(self) -> int:
+        return self._rows.live
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the populated rows, tombstoned ones included."""
+        return self._vectors[: len(self._rows)]
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes used by the populated rows."""
+        return self.vectors.nbytes
+
+    def add(self, asset_id: UUID, embedding: list[float], labels: Iterable[str] = ()) -> None:
+        """Insert or replace the vector stored for ``asset_id``, tagged with ``labels``."""
+        vector = normalize(as_vector(embedding, self.dim))
+        with self._lock:
+            size = len(self._rows)
+            if size == self._vectors.shape[0]:
+                grown = np.empty((size * 2, self.dim), dtype=np.float32)
+                grown[:size] = self._vectors
+                self._vectors = grown
+            self._vectors[size] = vector
+            self._rows.append(asset_id, labels)
+
+    def delete(self, asset_id: UUID) -> bool:
+        """Tombstone the row stored for ``asset_id``; returns whether it existed."""
+        with self._lock:
+            return self._rows.tombstone(asset_id)
+
+    def search(
+        self, embedding: list[float], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Return up to ``top_k`` ``(asset_id, cosine score)`` pairs, best first.
+
+        With ``where``, only rows carrying every listed label are eligible.
+        """
+        query = normalize(as_vector(embedding, self.dim))
+        vectors, excluded, ids = self._snapshot(where)
+        scores = vectors @ query
+        scores[excluded] = -np.inf
+        return [(ids[i], float(scores[i])) for i in top_k_indices(scores, top_k) if scores[i] > -np.inf]
+
+    def search_many(
+        self, embeddings: list[list[float]], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[list[tuple[UUID, float]]]:
+        """Batched :meth:`search`: one matrix-matrix product per block of queries."""
+        queries = normalize(as_matrix(embeddings, self.dim))
+        vectors, excluded, ids = self._snapshot(where)
+        block = max(1, _BATCH_CELLS // max(len(vectors), 1))
+        results: list[list[tuple[UUID, float]]] = []
+        for start in range(0, len(queries), block):
+            scores = queries[start : start + block] @ vectors.T
+            scores[:, excluded] = -np.inf
+            rows, row_scores = top_k_rows(scores, top_k)
+            for row, q_scores in zip(rows.tolist(), row_scores.tolist()):
+                results.append([(ids[i], s) for i, s in zip(row, q_scores) if s > -np.inf])
+        return results
+
+    def needs_compaction(self, ratio: float) -> bool:
+        return not self._compacting and self._rows.dead_ratio() > ratio
+
+    def compact(self) -> None:
+        """Rewrite storage without tombstoned rows."""
+        with self._lock:
+            if self._compacting or not self._rows.dead:
+                return
+            self._compacting = True
+            size = len(self._rows)
+            rows = self._rows.live_rows(size)
+            vectors, ids = self._vectors, self._rows.ids
+        try:
+            prefix_ids = [ids[row] for row in rows.tolist()]
+            dense = np.empty((max(2 * len(rows), 1024), self.dim), dtype=np.float32)
+            dense[: len(rows)] = vectors[rows]
+            with self._lock:
+                # Rows appended while copying go after the compacted prefix
+                tail = self._vectors[size : len(self._rows)]
+                if len(rows) + len(tail) > dense.shape[0]:
+                    grown = np.empty((2 * (len(rows) + len(tail)), self.dim), dtype=np.float32)
+                    grown[: len(rows)] = dense[: len(rows)]
+                    dense = grown
+                dense[len(rows) : len(rows) + len(tail)] = tail
+                self._rows = self._rows.compacted(rows, size, prefix_ids)
+                self._vectors = dense
+        finally:
+            self._compacting = False
+
+    def _snapshot(self, where: Iterable[str] | None) -> tuple[np.ndarray, np.ndarray, list[UUID]]:
+        """Rows, excluded-row mask and ids as of now; later appends and compactions don't touch them."""
+        with self._lock:
+            size = len(self._rows)
+            vectors, rows = self._vectors[:size], self._rows
+        return vectors, rows.excluded(size, where), rows.ids
@@ -0,0 +1,251 @@
+import heapq
+import math
+import random
+import threading
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+
+from .flat_index import as_vector, normalize
+from .row_table import RowTable
+
+
+class HNSWIndex:
+    """Hierarchical navigable small world graph over unit-normalized vectors.
+
+    Follows Malkov & Yashunin (2016): every node is assigned a random top
+    layer, upper layers are traversed greedily and the bottom layer with a
+    beam of ``ef`` candidates. Similarity is the cosine of normalized rows,
+    so a neighbour expansion is one small matrix-vector product.
+
+    ``m`` bounds the out-degree per layer (``2 * m`` on layer 0),
+    ``ef_construction`` is the beam width used while linking a new node and
+    ``ef_search`` the default beam width for queries. Inserts are
+    incremental; nothing has to be rebuilt when the domain grows.
+
+    Deleted nodes stay in the graph as tombstones so routing through them
+    still works, but are never returned. Re-adding an asset tombstones its
+    old node. :meth:`compact` rebuilds the graph from live nodes on the
+    calling thread and swaps it in, replaying changes made meanwhile.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        capacity: int = 1024,
+        seed: int | None = None,
+    ) -> None:
+        if m < 2:
+            raise ValueError("m must be at least 2")
+        self.dim = dim
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = max(ef_construction, m)
+        self.ef_search = ef_search
+        self._level_mult = 1 / math.log(m)
+        self._rng = random.Random(seed)
+        self._seed = seed
+        self._vectors = np.empty((max(capacity, 1), dim), dtype=np.float32)
+        self._rows = RowTable(capacity)
+        self._links: list[list[list[int]]] = []
+        self._entry_point: int | None = None
+        self._max_level = -1
+        self._lock = threading.Lock()
+        self._compacting = False
+
+    def __len__(self) -> int:
+        return self._rows.live
+
+    def add(self, asset_id: UUID, embedding: list[float], labels: Iterable[str] = ()) -> None:
+        """Insert ``asset_id`` tagged with ``labels``, replacing (tombstoning) any previous node for it."""
+        with self._lock:
+            self._insert(asset_id, normalize(as_vector(embedding, self.dim)), labels)
+
+    def delete(self, asset_id: UUID) -> bool:
+        """Tombstone the node stored for ``asset_id``; returns whether it existed."""
+        with self._lock:
+            return self._rows.tombstone(asset_id)
+
+    def _insert(self, asset_id: UUID, vector: np.ndarray, labels: Iterable[str] = ()) -> None:
+        node = self._append(asset_id, vector, labels)
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._links.append([[] for _ in range(level + 1)])
+
+        if self._entry_point is None:
+            self._entry_point = node
+            self._max_level = level
+            return
+
+        entry = self._entry_point
+        for layer in range(self._max_level, level, -1):
+            entry = self._search_layer(vector, [entry], 1, layer)[0][1]
+
+        entries = [entry]
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(vector, entries, self.ef_construction, layer)
+            neighbours = self._select_neighbours(candidates, self.m)
+            self._links[node][layer] = neighbours
+            max_degree = self.m0 if layer == 0 else self.m
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(node)
+                if len(links) > max_degree:
+                    self._links[neighbour][layer] = self._prune(neighbour, links, max_degree)
+            entries = [n for _, n in candidates]
+
+        if level > self._max_level:
+            self._entry_point = node
+            self._max_level = level
+
+    def search(
+        self,
+        embedding: list[float],
+        top_k: int = 5,
+        ef_search: int | None = None,
+        where: Iterable[str] | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """Return up to ``top_k`` approximate ``(asset_id, cosine score)`` pairs, best first.
+
+        With ``where``, only nodes carrying every listed label are returned;
+        the graph is still traversed through the others.
+        """
+        query = normalize(as_vector(embedding, self.dim))
+        with self._lock:
+            if self._entry_point is None or top_k <= 0:
+                return []
+            entry = self._entry_point
+            for layer in range(self._max_level, 0, -1):
+                entry = self._search_layer(query, [entry], 1, layer)[0][1]
+            ef = max(ef_search or self.ef_search, top_k)
+            deleted, ids = self._rows.deleted, self._rows.ids
+            required = [self._rows.labels.get(label) for label in where or ()]
+            if any(bits is None for bits in required):
+                return []
+            while True:
+                found = self._search_layer(query, [entry], ef, 0)
+                live = [
+                    (ids[node], score)
+                    for score, node in found
+                    if not deleted[node] and all(bits[node] for bits in required)
+                ]
+                # Tombstones and filtered-out nodes can crowd the beam; widen it until enough survive
+                if len(live) >= top_k or ef >= len(ids):
+                    return live[:top_k]
+                ef *= 2
+
+    def search_many(
+        self,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        ef_search: int | None = None,
+        where: Iterable[str] | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        """Run :meth:`search` for each query; graph traversal is inherently per query."""
+        return [self.search(embedding, top_k, ef_search, where) for embedding in embeddings]
+
+    def needs_compaction(self, ratio: float) -> bool:
+        return not self._compacting and self._rows.dead_ratio() > ratio
+
+    def compact(self) -> None:
+        """Rebuild the graph from live nodes and swap it in.
+
+        The rebuild reads only rows that existed when it started, so inserts
+        and deletes keep working; they are replayed onto the new graph under
+        the lock before the swap.
+        """
+        with self._lock:
+            if self._compacting or not self._rows.dead:
+                return
+            self._compacting = True
+            size = len(self._rows)
+            rows = self._rows.live_rows(size)
+            vectors, ids = self._vectors, self._rows.ids
+            labels = dict(self._rows.labels)
+        try:
+            fresh = HNSWIndex(
+                self.dim,
+                m=self.m,
+                ef_construction=self.ef_construction,
+                ef_search=self.ef_search,
+                capacity=max(2 * len(rows), 1024),
+                seed=self._seed,
+            )
+            for row in rows.tolist():
+                fresh._insert(ids[row], vectors[row], [label for label, bits in labels.items() if bits[row]])
+            with self._lock:
+                # Nodes deleted or replaced during the rebuild
+                for row in rows[self._rows.deleted[rows]].tolist():
+                    fresh._rows.tombstone(ids[row])
+                for row in range(size, len(self._rows)):
+                    if not self._rows.deleted[row]:
+                        tags = [label for label, bits in self._rows.labels.items() if bits[row]]
+                        fresh._insert(self._rows.ids[row], self._vectors[row], tags)
+                self._vectors = fresh._vectors
+                self._rows = fresh._rows
+                self._links = fresh._links
+                self._entry_point = fresh._entry_point
+                self._max_level = fresh._max_level
+        finally:
+            self._compacting = False
+
+    def _search_layer(
+        self, query: np.ndarray, entries: list[int], ef: int, layer: int
+    ) -> list[tuple[float, int]]:
+        """Beam search on one layer; returns ``(score, node)`` sorted best first."""
+        visited = set(entries)
+        scores = (self._vectors[entries] @ query).tolist()
+        candidates = [(-s, n) for s, n in zip(scores, entries)]
+        heapq.heapify(candidates)
+        results = [(s, n) for s, n in zip(scores, entries)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if -neg_score < results[0][0] and len(results) >= ef:
+                break
+            fresh = [n for n in self._links[node][layer] if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for score, neighbour in zip((self._vectors[fresh] @ query).tolist(), fresh):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbour))
+                    heapq.heappush(results, (score, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _select_neighbours(self, candidates: list[tuple[float, int]], limit: int) -> list[int]:
+        """Diversity heuristic: keep a candidate only if it is closer to the
+        base node than to every neighbour already kept."""
+        selected: list[int] = []
+        for score, node in candidates:
+            if len(selected) >= limit:
+                break
+            if selected:
+                to_selected = self._vectors[selected] @ self._vectors[node]
+                if to_selected.max() > score:
+                    continue
+            selected.append(node)
+        return selected
+
+    def _prune(self, node: int, links: list[int], limit: int) -> list[int]:
+        scores = (self._vectors[links] @ self._vectors[node]).tolist()
+        candidates = sorted(zip(scores, links), reverse=True)
+        return self._select_neighbours(candidates, limit)
+
+    def _append(self, asset_id: UUID, vector: np.ndarray, labels: Iterable[str] = ()) -> int:
+        node = len(self._rows)
+        if node == self._vectors.shape[0]:
+            grown = np.empty((node * 2, self.dim), dtype=np.float32)
+            grown[:node] = self._vectors
+            self._vectors = grown
+        self._vectors[node] = vector
+        self._rows.append(asset_id, labels)
+        return node
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+from src.domain.entities.asset import Asset
+from src.domain.enums.asset_type import AssetType
+from src.application.vectordb.vector_db import VectorDB
+from src.domain.persistence.asset_repository import AssetRepository
+from .filters import filter_labels
+from .hnsw_index import HNSWIndex
+from .hydration import hydrate
+
+
+class HNSWVectorDB(VectorDB):
+    """In-process approximate vector DB keeping one HNSW graph per domain.
+
+    Deletes tombstone graph nodes; once more than ``compact_ratio`` of a
+    domain's nodes are dead its graph is rebuilt on a background thread.
+    ``category_id`` / ``asset_type`` filters are checked against per-label
+    node bitmaps while collecting results.
+    """
+
+    def __init__(
+        self,
+        asset_repo: AssetRepository,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        compact_ratio: float = 0.2,
+    ) -> None:
+        self._asset_repo = asset_repo
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.compact_ratio = compact_ratio
+        self._index: dict[UUID, HNSWIndex] = {}
+        self._compactor: ThreadPoolExecutor | None = None
+
+    async def add(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        index = self._index.get(domain_id)
+        if index is None:
+            index = self._index[domain_id] = HNSWIndex(
+                len(embedding),
+                m=self.m,
+                ef_construction=self.ef_construction,
+                ef_search=self.ef_search,
+            )
+        index.add(asset_id, embedding, filter_labels(category_id, asset_type))
+
+    async def update(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        # Adding an existing asset tombstones its previous node
+        await self.add(domain_id, asset_id, embedding, category_id, asset_type)
+        self._maybe_compact(self._index[domain_id])
+
+    async def delete(self, domain_id: UUID, asset_id: UUID) -> None:
+        index = self._index.get(domain_id)
+        if index is not None and index.delete(asset_id):
+            self._maybe_compact(index)
+
+    def _maybe_compact(self, index: HNSWIndex) -> None:
+        if index.needs_compaction(self.compact_ratio):
+            if self._compactor is None:
+                self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hnsw-compact")
+            self._compactor.submit(index.compact)
+
+    async def search(
+        self,
+        domain_id: UUID,
+        embedding: list[float],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[tuple[Asset, float]]:
+        index = self._index.get(domain_id)
+        if index is None:
+            return []
+        hits = index.search(embedding, top_k, where=filter_labels(category_id, asset_type))
+        return await hydrate(self._asset_repo, hits)
+
+    async def search_many(
+        self,
+        domain_id: UUID,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        index = self._index.get(domain_id)
+        if index is None:
+            return [[] for _ in embeddings]
+        return index.search_many(embeddings, top_k, where=filter_labels(category_id, asset_type))
@@ -0,0 +1,15 @@
+from uuid import UUID
+from src.domain.entities.asset import Asset
+from src.domain.persistence.asset_repository import AssetRepository
+
+
+async def hydrate(asset_repo: AssetRepository, hits: list[tuple[UUID, float]]) -> list[tuple[Asset, float]]:
+    """Resolve ranked ``(asset_id, score)`` hits to ``(asset, score)`` with one bulk lookup.
+
+    Rank order and scores are preserved; hits whose asset no longer exists
+    (or is soft deleted) are dropped.
+    """
+    if not hits:
+        return []
+    assets = {a.id: a for a in await asset_repo.get_many([asset_id for asset_id, _ in hits])}
+    return [(assets[asset_id], score) for asset_id, score in hits if asset_id in assets]
@@ -1,26 +1,230 @@
-from typing import Iterable
+import asyncio
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from uuid import UUID
-from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
 from src.domain.entities.asset import Asset
+from src.domain.enums.asset_type import AssetType
 from src.application.vectordb.vector_db import VectorDB
+from src.domain.persistence.asset_repository import AssetRepository
+from .filters import filter_labels
+from .flat_index import FlatIndex
+from .hydration import hydrate
+from .quantized_index import QuantizedIndex
+from .segmented_index import MANIFEST, SegmentedIndex, SegmentLockedError
+from .sharded_index import ShardedIndex
 
 
 class MemoryVectorDB(VectorDB):
-    """A very small in-memory vector DB for tests."""
+    """In-process exact vector DB keeping one float32 matrix per domain.
 
-    def __init__(self, asset_repo: MemoryAssetRepository):
+    With ``quantization`` set to ``"int8"`` or ``"binary"`` each domain keeps
+    only compressed codes in memory and rescores a shortlist of
+    ``top_k * oversample`` candidates from full-precision vectors stored
+    under ``storage_dir``. Those files are scratch space private to this
+    process (uniquely named, so workers sharing the directory never write
+    to each other's) and are removed by :meth:`close`, along with the
+    temporary directory used when ``storage_dir`` is unset.
+
+    With ``persistent=True`` each domain is a :class:`SegmentedIndex` under
+    ``storage_dir/<domain_id>``: existing domains are memory-mapped on
+    startup instead of being re-embedded, and sealed segments are merged on
+    a background thread once a domain has more than ``max_segments``. The
+    first process to open a domain writes it; other processes (e.g. the
+    remaining uvicorn workers) get a read-only view that follows the writer,
+    and refuse writes to that domain.
+
+    Updates and deletes tombstone rows in O(1) through an id -> row map.
+    Once more than ``compact_ratio`` of a domain's rows are dead, the domain
+    is compacted on a background thread.
+
+    ``category_id`` / ``asset_type`` filters are label bitmaps kept per
+    domain; a filtered search masks the score vector before top-k.
+
+    Searches run on a thread pool of ``search_threads`` workers rather than
+    on the event loop. With ``shards > 1`` each in-memory domain is split
+    into that many shards scanned concurrently on a second pool, so one
+    large domain uses several cores.
+    """
+
+    def __init__(
+        self,
+        asset_repo: AssetRepository,
+        quantization: str | None = None,
+        storage_dir: str | None = None,
+        oversample: int = 4,
+        persistent: bool = False,
+        segment_rows: int = 65536,
+        max_segments: int = 8,
+        shards: int = 1,
+        search_threads: int | None = None,
+        compact_ratio: float = 0.2,
+    ):
+        if quantization and quantization not in QuantizedIndex.MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        if persistent and quantization:
+            raise ValueError("Persistent segments do not support quantization")
+        if persistent and storage_dir is None:
+            raise ValueError("storage_dir is required for persistent vectors")
         self._asset_repo = asset_repo
-        self._index: dict[UUID, list[tuple[list[float], UUID]]] = {}
-
-    def add(self, domain_id: UUID, asset_id: UUID, embedding: list[float]) -> None:
-        self._index.setdefault(domain_id, []).append((embedding, asset_id))
-
-    async def search(self, domain_id: UUID, embedding: list[float], top_k: int = 5) -> Iterable[Asset]:
-        scored: list[tuple[float, UUID]] = []
-        for emb, asset_id in self._index.get(domain_id, []):
-            score = sum(e1 * e2 for e1, e2 in zip(emb, embedding))
-            scored.append((score, asset_id))
-        scored.sort(reverse=True)
-        asset_ids = {a_id for _, a_id in scored[:top_k]}
-        assets = await self._asset_repo.list(domain_id)
-        return [a for a in assets if a.id in asset_ids]
+        self.quantization = quantization or None
+        self.storage_dir = storage_dir
+        self.oversample = oversample
+        self.persistent = persistent
+        self.segment_rows = segment_rows
+        self.max_segments = max_segments
+        self.shards = max(shards, 1)
+        self.search_threads = search_threads or os.cpu_count() or 1
+        self.compact_ratio = compact_ratio
+        self._index: dict[UUID, FlatIndex | QuantizedIndex | SegmentedIndex | ShardedIndex] = {}
+        self._merger: ThreadPoolExecutor | None = None
+        self._searcher: ThreadPoolExecutor | None = None
+        self._shard_pool: ThreadPoolExecutor | None = None
+        self._scratch_paths: list[str] = []
+        self._temp_dir: str | None = None
+        if persistent:
+            self._open_segments()
+
+    async def add(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        index = self._existing_index(domain_id)
+        if index is None:
+            index = self._index[domain_id] = self._new_index(domain_id, len(embedding))
+        index.add(asset_id, embedding, filter_labels(category_id, asset_type))
+        if self.persistent and index.needs_merge(self.max_segments):
+            self._in_background(index.merge)
+
+    async def update(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        # Adding an existing asset tombstones its previous row
+        await self.add(domain_id, asset_id, embedding, category_id, asset_type)
+        self._maybe_compact(self._index[domain_id])
+
+    async def delete(self, domain_id: UUID, asset_id: UUID) -> None:
+        index = self._existing_index(domain_id)
+        if index is not None and index.delete(asset_id):
+            self._maybe_compact(index)
+
+    async def search(
+        self,
+        domain_id: UUID,
+        embedding: list[float],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[tuple[Asset, float]]:
+        index = self._existing_index(domain_id)
+        if index is None:
+            return []
+        hits = await self._offload(index.search, embedding, top_k, filter_labels(category_id, asset_type))
+        return await hydrate(self._asset_repo, hits)
+
+    async def search_many(
+        self,
+        domain_id: UUID,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        index = self._existing_index(domain_id)
+        if index is None:
+            return [[] for _ in embeddings]
+        return await self._offload(index.search_many, embeddings, top_k, filter_labels(category_id, asset_type))
+
+    async def close(self) -> None:
+        """Wait for background merges, close every index and remove this process's scratch files."""
+        for executor in (self._merger, self._searcher, self._shard_pool):
+            if executor is not None:
+                await asyncio.to_thread(executor.shutdown)
+        self._merger = self._searcher = self._shard_pool = None
+        for index in self._index.values():
+            if isinstance(index, (QuantizedIndex, SegmentedIndex, ShardedIndex)):
+                index.close()
+        self._index.clear()
+        for path in self._scratch_paths:
+            for leftover in (path, path + ".compact"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        self._scratch_paths.clear()
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self.storage_dir = self._temp_dir = None
+
+    def _existing_index(self, domain_id: UUID):
+        """The domain's index, opening one another process has persisted since startup."""
+        index = self._index.get(domain_id)
+        if index is None and self.persistent:
+            directory = os.path.join(self.storage_dir, str(domain_id))
+            if os.path.exists(os.path.join(directory, MANIFEST)):
+                index = self._index[domain_id] = self._open_domain(directory)
+        return index
+
+    def _open_domain(self, directory: str) -> SegmentedIndex:
+        """Open a persisted domain for writing, or read-only when another process writes it."""
+        try:
+            return SegmentedIndex.open(directory, segment_rows=self.segment_rows)
+        except SegmentLockedError:
+            return SegmentedIndex.open(directory, segment_rows=self.segment_rows, read_only=True)
+
+    def _maybe_compact(self, index) -> None:
+        if index.needs_compaction(self.compact_ratio):
+            self._in_background(index.compact)
+
+    def _in_background(self, fn) -> None:
+        """Run merges and compactions one at a time off the event loop."""
+        if self._merger is None:
+            self._merger = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-merge")
+        self._merger.submit(fn)
+
+    async def _offload(self, fn, *args):
+        """Run a blocking index call on the search pool, keeping the event loop free."""
+        if self._searcher is None:
+            self._searcher = ThreadPoolExecutor(max_workers=self.search_threads, thread_name_prefix="vector-search")
+        return await asyncio.get_running_loop().run_in_executor(self._searcher, fn, *args)
+
+    def _new_index(self, domain_id: UUID, dim: int) -> FlatIndex | QuantizedIndex | SegmentedIndex | ShardedIndex:
+        if self.persistent:
+            directory = os.path.join(self.storage_dir, str(domain_id))
+            return SegmentedIndex(directory, dim, segment_rows=self.segment_rows)
+        if self.shards == 1:
+            return self._new_shard(domain_id, dim, None)
+        if self._shard_pool is None:
+            self._shard_pool = ThreadPoolExecutor(max_workers=self.search_threads, thread_name_prefix="vector-shard")
+        return ShardedIndex(
+            [self._new_shard(domain_id, dim, n) for n in range(self.shards)],
+            self._shard_pool,
+        )
+
+    def _new_shard(self, domain_id: UUID, dim: int, shard: int | None) -> FlatIndex | QuantizedIndex:
+        if self.quantization is None:
+            return FlatIndex(dim)
+        if self.storage_dir is None:
+            self.storage_dir = self._temp_dir = tempfile.mkdtemp(prefix="daleel-vectors-")
+        os.makedirs(self.storage_dir, exist_ok=True)
+        name = str(domain_id) if shard is None else f"{domain_id}.{shard}"
+        fd, path = tempfile.mkstemp(prefix=f"{name}.", suffix=".f32", dir=self.storage_dir)
+        os.close(fd)
+        self._scratch_paths.append(path)
+        return QuantizedIndex(dim, path, mode=self.quantization, oversample=self.oversample)
+
+    def _open_segments(self) -> None:
+        """Map every domain already persisted under ``storage_dir``."""
+        os.makedirs(self.storage_dir, exist_ok=True)
+        for name in os.listdir(self.storage_dir):
+            directory = os.path.join(self.storage_dir, name)
+            if os.path.exists(os.path.join(directory, MANIFEST)):
+                self._index[UUID(name)] = self._open_domain(directory)
@@ -1,21 +1,47 @@
+import asyncio
+from itertools import islice
 from typing import Iterable
 from uuid import UUID
-import os
 
 from src.domain.entities.asset import Asset
-from src.application.vectordb.vector_db import VectorDB
+from src.domain.enums.asset_type import AssetType
+from src.application.vectordb.vector_db import VectorDB, VectorRecord
 from src.domain.persistence.asset_repository import AssetRepository
+from .hydration import hydrate
 
 try:
-    from qdrant_client import QdrantClient
+    from qdrant_client import AsyncQdrantClient
     from qdrant_client.http import models as qmodels
 except Exception:  # pragma: no cover - optional dependency
-    QdrantClient = None
+    AsyncQdrantClient = None
     qmodels = None
 
 
 class QdrantVectorDB(VectorDB):
-    """Vector DB backed by Qdrant."""
+    """Vector DB backed by Qdrant.
+
+    Uses a single ``AsyncQdrantClient`` (HTTP or, with ``prefer_grpc``,
+    gRPC) whose connection pool is shared by every request, so calls never
+    block the event loop. Collection existence is checked once per process.
+
+    ``layout`` decides how domains (tenants) are isolated:
+
+    - ``"shared"``: one collection filtered on an ``is_tenant`` keyword index
+      on ``domain_id``; the HNSW graph is built per tenant (``payload_m``)
+      instead of globally (``m=0``).
+    - ``"collection"``: one collection per domain, no filter needed.
+    - ``"shard"``: one collection with custom sharding and a shard key per
+      domain, so a search only touches that domain's shard.
+
+    ``category_id`` and ``asset_type`` are stored in the payload and always
+    get keyword indexes, so filtered searches are resolved inside the HNSW
+    traversal rather than by post-filtering the top-k.
+
+    Searching or deleting in a domain nothing was added to yet (no
+    collection, or no shard key) finds nothing instead of failing.
+    """
+
+    LAYOUTS = ("shared", "collection", "shard")
 
     def __init__(
         self,
@@ -23,94 +49,302 @@ class QdrantVectorDB(VectorDB):
         api_key: str | None = None,
         collection: str = "assets",
         asset_repo: AssetRepository | None = None,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        pool_size: int | None = None,
+        batch_size: int = 256,
+        timeout: int | None = None,
+        layout: str = "shared",
     ) -> None:
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown Qdrant layout: {layout}")
         self.asset_repo = asset_repo
         self.collection = collection
-        if QdrantClient is not None:
-            self.client = QdrantClient(url=url, api_key=api_key)
+        self.batch_size = batch_size
+        self.layout = layout
+        self._ready_collections: set[str] = set()
+        self._ready_shard_keys: set[str] = set()
+        self._known_collections: set[str] = set()
+        self._collection_lock = asyncio.Lock()
+        if AsyncQdrantClient is not None:
+            self.client = AsyncQdrantClient(
+                url=url,
+                api_key=api_key,
+                prefer_grpc=prefer_grpc,
+                grpc_port=grpc_port,
+                pool_size=pool_size,
+                timeout=timeout,
+                check_compatibility=False,
+            )
         else:
             self.client = None
 
-    def add(self, domain_id: UUID, asset_id: UUID, embedding: list[float]) -> None:
+    async def add(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
         """Store embedding for an asset within a domain."""
         if self.client is None:
             raise RuntimeError("Qdrant client is not available")
-        
+
         try:
             # Ensure collection exists
-            self._ensure_collection(len(embedding))
-            
+            await self._ensure_collection(domain_id, len(embedding))
+
             # Add point to collection
-            self.client.upsert(
-                collection_name=self.collection,
-                points=[
-                    qmodels.PointStruct(
-                        id=str(asset_id),
-                        vector=embedding,
-                        payload={
-                            "domain_id": str(domain_id),
-                            "asset_id": str(asset_id)
-                        }
-                    )
-                ]
+            await self.client.upsert(
+                collection_name=self._collection_name(domain_id),
+                points=[self._point(domain_id, VectorRecord(asset_id, embedding, category_id, asset_type))],
+                shard_key_selector=self._shard_key(domain_id),
             )
         except Exception as e:
             raise RuntimeError(f"Qdrant add error: {e}") from e
 
-    async def search(self, domain_id: UUID, embedding: list[float], top_k: int = 5) -> Iterable[Asset]:
+    async def add_many(self, domain_id: UUID, items: Iterable[VectorRecord | tuple[UUID, list[float]]]) -> None:
+        """Upsert embeddings in batches of ``batch_size`` without waiting for indexing."""
+        if self.client is None:
+            raise RuntimeError("Qdrant client is not available")
+
+        try:
+            records = (VectorRecord(*item) for item in items)
+            while batch := list(islice(records, self.batch_size)):
+                await self._ensure_collection(domain_id, len(batch[0].embedding))
+                await self.client.upsert(
+                    collection_name=self._collection_name(domain_id),
+                    points=[self._point(domain_id, record) for record in batch],
+                    wait=False,
+                    shard_key_selector=self._shard_key(domain_id),
+                )
+        except Exception as e:
+            raise RuntimeError(f"Qdrant add error: {e}") from e
+
+    async def close(self) -> None:
+        """Close the client's connection pool."""
+        if self.client is not None:
+            await self.client.close()
+
+    async def update(
+        self,
+        domain_id: UUID,
+        asset_id: UUID,
+        embedding: list[float],
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> None:
+        """Replace an asset's point; the point id is the asset id, so this is an upsert."""
+        await self.add(domain_id, asset_id, embedding, category_id, asset_type)
+
+    async def delete(self, domain_id: UUID, asset_id: UUID) -> None:
+        """Delete an asset's point. Qdrant vacuums deleted points in its own optimizer."""
+        if self.client is None:
+            raise RuntimeError("Qdrant client is not available")
+
+        try:
+            if not await self._has_collection(domain_id):
+                return
+            await self.client.delete(
+                collection_name=self._collection_name(domain_id),
+                points_selector=qmodels.PointIdsList(points=[str(asset_id)]),
+                shard_key_selector=self._shard_key(domain_id),
+            )
+        except Exception as e:
+            if self._missing_shard_key(e):
+                return
+            raise RuntimeError(f"Qdrant delete error: {e}") from e
+
+    async def search(
+        self,
+        domain_id: UUID,
+        embedding: list[float],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[tuple[Asset, float]]:
         """Search for relevant assets by embedding within a domain."""
         if self.client is None:
             raise RuntimeError("Qdrant client is not available")
-        
+
         if self.asset_repo is None:
             raise RuntimeError("Asset repository is required for search")
-        
+
         try:
+            if not await self._has_collection(domain_id):
+                return []
+
             # Search in Qdrant
-            search_result = self.client.search(
-                collection_name=self.collection,
-                query_vector=embedding,
-                query_filter=qmodels.Filter(
-                    must=[
-                        qmodels.FieldCondition(
-                            key="domain_id",
-                            match=qmodels.MatchValue(value=str(domain_id))
-                        )
-                    ]
-                ),
-                limit=top_k
+            response = await self.client.query_points(
+                collection_name=self._collection_name(domain_id),
+                query=embedding,
+                query_filter=self._search_filter(domain_id, category_id, asset_type),
+                shard_key_selector=self._shard_key(domain_id),
+                limit=top_k,
+                with_payload=True,
             )
-            
-            # Get asset IDs from search results
-            asset_ids = [UUID(hit.payload["asset_id"]) for hit in search_result]
-            
-            # Fetch actual assets from repository
-            assets = []
-            for asset_id in asset_ids:
-                asset = await self.asset_repo.get(asset_id)
-                if asset:
-                    assets.append(asset)
-            
-            return assets
+
+            # Fetch all hits from the repository in one round trip, keeping rank and score
+            hits = [(UUID(point.payload["asset_id"]), point.score) for point in response.points]
+            return await hydrate(self.asset_repo, hits)
         except Exception as e:
+            if self._missing_shard_key(e):
+                return []
             raise RuntimeError(f"Qdrant search error: {e}") from e
 
-    def _ensure_collection(self, vector_size: int) -> None:
-        """Ensure the collection exists with the right vector configuration."""
+    async def search_many(
+        self,
+        domain_id: UUID,
+        embeddings: list[list[float]],
+        top_k: int = 5,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        """Search several embeddings within a domain in a single batch request."""
         if self.client is None:
-            return
-        
+            raise RuntimeError("Qdrant client is not available")
+
         try:
-            collections = self.client.get_collections()
-            collection_names = [c.name for c in collections.collections]
-            
-            if self.collection not in collection_names:
-                self.client.create_collection(
-                    collection_name=self.collection,
-                    vectors_config=qmodels.VectorParams(
-                        size=vector_size,
-                        distance=qmodels.Distance.COSINE
+            if not await self._has_collection(domain_id):
+                return [[] for _ in embeddings]
+
+            query_filter = self._search_filter(domain_id, category_id, asset_type)
+            responses = await self.client.query_batch_points(
+                collection_name=self._collection_name(domain_id),
+                requests=[
+                    qmodels.QueryRequest(
+                        query=embedding,
+                        filter=query_filter,
+                        shard_key=self._shard_key(domain_id),
+                        limit=top_k,
+                        with_payload=True,
                     )
-                )
+                    for embedding in embeddings
+                ],
+            )
+            return [
+                [(UUID(point.payload["asset_id"]), point.score) for point in response.points]
+                for response in responses
+            ]
         except Exception as e:
-            raise RuntimeError(f"Qdrant collection setup error: {e}") from e
+            if self._missing_shard_key(e):
+                return [[] for _ in embeddings]
+            raise RuntimeError(f"Qdrant search error: {e}") from e
+
+    def _point(self, domain_id: UUID, record: VectorRecord):
+        payload = {
+            "domain_id": str(domain_id),
+            "asset_id": str(record.asset_id)
+        }
+        if record.category_id is not None:
+            payload["category_id"] = str(record.category_id)
+        if record.asset_type is not None:
+            payload["asset_type"] = AssetType(record.asset_type).value
+        return qmodels.PointStruct(
+            id=str(record.asset_id),
+            vector=record.embedding,
+            payload=payload
+        )
+
+    def _collection_name(self, domain_id: UUID) -> str:
+        if self.layout == "collection":
+            return f"{self.collection}_{domain_id.hex}"
+        return self.collection
+
+    def _shard_key(self, domain_id: UUID) -> str | None:
+        return str(domain_id) if self.layout == "shard" else None
+
+    def _search_filter(
+        self,
+        domain_id: UUID,
+        category_id: UUID | None = None,
+        asset_type: AssetType | None = None,
+    ):
+        """Payload filter for a search: the domain (shared layout only) plus any category/type."""
+        values = {
+            "domain_id": str(domain_id) if self.layout == "shared" else None,
+            "category_id": str(category_id) if category_id is not None else None,
+            "asset_type": AssetType(asset_type).value if asset_type is not None else None,
+        }
+        must = [
+            qmodels.FieldCondition(key=key, match=qmodels.MatchValue(value=value))
+            for key, value in values.items()
+            if value is not None
+        ]
+        return qmodels.Filter(must=must) if must else None
+
+    async def _has_collection(self, domain_id: UUID) -> bool:
+        """Whether a domain's collection exists, in any layout; a positive answer is cached."""
+        name = self._collection_name(domain_id)
+        if name in self._ready_collections or name in self._known_collections:
+            return True
+        if not await self.client.collection_exists(name):
+            return False
+        self._known_collections.add(name)
+        return True
+
+    def _missing_shard_key(self, error: Exception) -> bool:
+        """Whether Qdrant rejected a request because the domain has no shard key yet."""
+        return self.layout == "shard" and "shard key" in str(error).lower()
+
+    async def _ensure_collection(self, domain_id: UUID, vector_size: int) -> None:
+        """Ensure the domain's collection (and shard key) exists with its payload indexes.
+
+        The answer is cached after the first successful check, so steady-state
+        writes cost no extra round trip.
+        """
+        name = self._collection_name(domain_id)
+        shard_key = self._shard_key(domain_id)
+        if self.client is None or (
+            name in self._ready_collections and (shard_key is None or shard_key in self._ready_shard_keys)
+        ):
+            return
+
+        async with self._collection_lock:
+            try:
+                if name not in self._ready_collections:
+                    if not await self.client.collection_exists(name):
+                        await self._create_collection(name, vector_size)
+                    await self._create_payload_indexes(name)
+                    self._ready_collections.add(name)
+                if shard_key is not None and shard_key not in self._ready_shard_keys:
+                    try:
+                        await self.client.create_shard_key(name, shard_key)
+                    except Exception as e:
+                        if "already exists" not in str(e):
+                            raise
+                    self._ready_shard_keys.add(shard_key)
+            except Exception as e:
+                raise RuntimeError(f"Qdrant collection setup error: {e}") from e
+
+    async def _create_collection(self, name: str, vector_size: int) -> None:
+        options = {}
+        if self.layout == "shared":
+            # Build HNSW links per tenant instead of one global graph
+            options["hnsw_config"] = qmodels.HnswConfigDiff(payload_m=16, m=0)
+        elif self.layout == "shard":
+            options["sharding_method"] = qmodels.ShardingMethod.CUSTOM
+        await self.client.create_collection(
+            collection_name=name,
+            vectors_config=qmodels.VectorParams(
+                size=vector_size,
+                distance=qmodels.Distance.COSINE
+            ),
+            **options,
+        )
+
+    async def _create_payload_indexes(self, name: str) -> None:
+        """Keyword indexes for filtered search; re-creating an existing index is a no-op."""
+        if self.layout == "shared":
+            await self.client.create_payload_index(
+                collection_name=name,
+                field_name="domain_id",
+                field_schema=qmodels.KeywordIndexParams(type="keyword", is_tenant=True),
+            )
+        for field_name in ("category_id", "asset_type"):
+            await self.client.create_payload_index(
+                collection_name=name,
+                field_name=field_name,
+                field_schema=qmodels.KeywordIndexParams(type="keyword"),
+            )
@@ -0,0 +1,251 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+
+from .flat_index import as_matrix, as_vector, normalize, top_k_indices
+from .row_table import RowTable
+
+# Rows scored per block so int8 codes are never upcast all at once
+_SCORE_BLOCK = 2048
+
+# Number of set bits for every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+class QuantizedIndex:
+    """Compressed cosine index for one domain with full-precision rescoring.
+
+    Only compact codes stay resident:
+
+    - ``int8``: one signed byte per dimension plus a float32 scale per row
+      (about 4x smaller than float32).
+    - ``binary``: the sign bit of each dimension packed eight to a byte
+      (32x smaller), compared by Hamming distance.
+
+    The normalized float32 vectors are appended to ``path`` and read back
+    through ``np.memmap``. A query ranks every code, keeps the best
+    ``top_k * oversample`` candidates and rescores only those rows exactly,
+    so the page cache holds just the shortlisted vectors.
+
+    Deletes tombstone rows; :meth:`compact` drops them from the codes and
+    the exact-vector file.
+    """
+
+    MODES = ("int8", "binary")
+
+    def __init__(
+        self,
+        dim: int,
+        path: str,
+        mode: str = "int8",
+        oversample: int = 4,
+        capacity: int = 1024,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.dim = dim
+        self.path = path
+        self.mode = mode
+        self.oversample = max(oversample, 1)
+        capacity = max(capacity, 1)
+        if mode == "int8":
+            self._codes = np.empty((capacity, dim), dtype=np.int8)
+            self._scales = np.empty(capacity, dtype=np.float32)
+        else:
+            self._codes = np.empty((capacity, (dim + 7) // 8), dtype=np.uint8)
+            self._scales = None
+        self._rows = RowTable(capacity)
+        self._file = open(path, "wb")
+        self._exact: np.memmap | None = None
+        self._lock = threading.Lock()
+        self._compacting = False
+
+    def __len__(self) -> int:
+        return self._rows.live
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes used by the populated codes."""
+        size = len(self._rows)
+        total = self._codes[:size].nbytes
+        if self.mode == "int8":
+            total += self._scales[:size].nbytes
+        return total
+
+    def add(self, asset_id: UUID, embedding: list[float], labels: Iterable[str] = ()) -> None:
+        """Insert or replace the vector stored for ``asset_id``, tagged with ``labels``."""
+        vector = normalize(as_vector(embedding, self.dim))
+        with self._lock:
+            size = len(self._rows)
+            if size == self._codes.shape[0]:
+                self._codes = self._grow(self._codes)
+                if self.mode == "int8":
+                    self._scales = self._grow(self._scales)
+            if self.mode == "int8":
+                scale = float(np.abs(vector).max()) / 127 or 1.0
+                self._codes[size] = np.rint(vector / scale)
+                self._scales[size] = scale
+            else:
+                self._codes[size] = np.packbits(vector > 0)
+            self._file.write(vector.tobytes())
+            self._file.flush()
+            self._rows.append(asset_id, labels)
+
+    def delete(self, asset_id: UUID) -> bool:
+        """Tombstone the row stored for ``asset_id``; returns whether it existed."""
+        with self._lock:
+            return self._rows.tombstone(asset_id)
+
+    def search(
+        self, embedding: list[float], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Return up to ``top_k`` ``(asset_id, cosine score)`` pairs, best first.
+
+        With ``where``, only rows carrying every listed label are eligible.
+        """
+        query = normalize(as_vector(embedding, self.dim))
+        snapshot = self._snapshot(where)
+        if snapshot.live == 0 or top_k <= 0:
+            return []
+        if self.mode == "int8":
+            approx = self._int8_scores(snapshot, query[None, :])[0]
+        else:
+            approx = self._hamming_scores(snapshot, query)
+        return self._rescore(snapshot, query, approx, top_k)
+
+    def search_many(
+        self, embeddings: list[list[float]], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[list[tuple[UUID, float]]]:
+        """Batched :meth:`search`; int8 codes are decoded once for all queries."""
+        queries = normalize(as_matrix(embeddings, self.dim))
+        snapshot = self._snapshot(where)
+        if snapshot.live == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        if self.mode == "int8":
+            approx = self._int8_scores(snapshot, queries)
+        else:
+            approx = [self._hamming_scores(snapshot, query) for query in queries]
+        return [self._rescore(snapshot, query, scores, top_k) for query, scores in zip(queries, approx)]
+
+    def needs_compaction(self, ratio: float) -> bool:
+        return not self._compacting and self._rows.dead_ratio() > ratio
+
+    def compact(self) -> None:
+        """Rewrite codes and the exact-vector file without tombstoned rows.
+
+        Live rows are copied to ``path + ".compact"`` outside the lock; rows
+        appended meanwhile are copied under it before the file is swapped in.
+        Searches still reading the old file keep their mapping until done.
+        """
+        with self._lock:
+            if self._compacting or not self._rows.dead:
+                return
+            self._compacting = True
+            size = len(self._rows)
+            rows = self._rows.live_rows(size)
+            ids = self._rows.ids
+            codes = self._codes[rows]
+            scales = self._scales[rows] if self.mode == "int8" else None
+            exact = self._map_exact(size)
+        try:
+            prefix_ids = [ids[row] for row in rows.tolist()]
+            compact_path = self.path + ".compact"
+            with open(compact_path, "wb") as f:
+                for start in range(0, len(rows), _SCORE_BLOCK):
+                    f.write(np.ascontiguousarray(exact[rows[start : start + _SCORE_BLOCK]]).tobytes())
+            with self._lock:
+                now = len(self._rows)
+                with open(compact_path, "ab") as f:
+                    f.write(np.ascontiguousarray(self._map_exact(now)[size:now]).tobytes())
+                self._codes = self._dense(codes, self._codes[size:now])
+                if self.mode == "int8":
+                    self._scales = self._dense(scales, self._scales[size:now])
+                self._rows = self._rows.compacted(rows, size, prefix_ids)
+                self._file.close()
+                os.replace(compact_path, self.path)
+                self._file = open(self.path, "ab")
+                self._exact = None
+        finally:
+            self._compacting = False
+
+    def close(self) -> None:
+        self._file.close()
+        self._exact = None
+
+    def _snapshot(self, where: Iterable[str] | None = None) -> "_Snapshot":
+        with self._lock:
+            size = len(self._rows)
+            rows = self._rows
+            codes = self._codes[:size]
+            scales = self._scales[:size] if self.mode == "int8" else None
+            exact = self._map_exact(size)
+        excluded = rows.excluded(size, where)
+        return _Snapshot(
+            codes=codes,
+            scales=scales,
+            excluded=excluded,
+            ids=rows.ids,
+            exact=exact,
+            live=size - int(excluded.sum()),
+        )
+
+    def _map_exact(self, size: int) -> np.ndarray:
+        """Mapping of at least ``size`` exact rows; only remapped when the file has grown."""
+        if size == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if self._exact is None or self._exact.shape[0] < size:
+            self._exact = np.memmap(self.path, dtype=np.float32, mode="r", shape=(size, self.dim))
+        return self._exact
+
+    def _rescore(
+        self, snapshot: "_Snapshot", query: np.ndarray, approx: np.ndarray, top_k: int
+    ) -> list[tuple[UUID, float]]:
+        approx[snapshot.excluded] = -np.inf
+        shortlist = np.sort(top_k_indices(approx, min(top_k * self.oversample, snapshot.live)))
+        scores = snapshot.exact[shortlist] @ query
+        return [(snapshot.ids[shortlist[i]], float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def _int8_scores(self, snapshot: "_Snapshot", queries: np.ndarray) -> np.ndarray:
+        """Approximate scores of shape ``(queries, rows)``."""
+        size = len(snapshot.codes)
+        scores = np.empty((len(queries), size), dtype=np.float32)
+        for start in range(0, size, _SCORE_BLOCK):
+            end = min(start + _SCORE_BLOCK, size)
+            scores[:, start:end] = queries @ snapshot.codes[start:end].astype(np.float32).T
+        return scores * snapshot.scales
+
+    def _hamming_scores(self, snapshot: "_Snapshot", query: np.ndarray) -> np.ndarray:
+        code = np.packbits(query > 0)
+        distances = _POPCOUNT[snapshot.codes ^ code].sum(axis=1, dtype=np.int32)
+        return -distances.astype(np.float32)
+
+    @staticmethod
+    def _dense(prefix: np.ndarray, tail: np.ndarray) -> np.ndarray:
+        """``prefix`` followed by ``tail`` with room to grow."""
+        size = len(prefix) + len(tail)
+        dense = np.empty((max(2 * size, 1024),) + prefix.shape[1:], dtype=prefix.dtype)
+        dense[: len(prefix)] = prefix
+        dense[len(prefix) : size] = tail
+        return dense
+
+    @staticmethod
+    def _grow(array: np.ndarray) -> np.ndarray:
+        grown = np.empty((array.shape[0] * 2,) + array.shape[1:], dtype=array.dtype)
+        grown[: array.shape[0]] = array
+        return grown
+
+
+@dataclass
+class _Snapshot:
+    """Consistent view of the first ``len(codes)`` rows used by one search."""
+
+    codes: np.ndarray
+    scales: np.ndarray | None
+    excluded: np.ndarray
+    ids: list[UUID]
+    exact: np.ndarray
+    live: int
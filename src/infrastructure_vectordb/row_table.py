@@ -0,0 +1,105 @@
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+
+
+class RowTable:
+    """Row bookkeeping shared by the append-only in-memory indexes.
+
+    Rows are never rewritten in place: re-adding an asset appends a new row
+    and tombstones the old one, so a reader that captured the first ``n``
+    rows keeps seeing consistent data. ``slots`` maps every live asset to
+    its row, which makes deletes O(1).
+
+    Rows can carry string labels (e.g. ``"category_id:<uuid>"``). Each label
+    owns a row bitmap, so a filtered search ANDs a few boolean arrays and
+    masks the score vector before top-k instead of post-filtering hits.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.ids: list[UUID] = []
+        self.slots: dict[UUID, int] = {}
+        self.deleted = np.zeros(max(capacity, 1), dtype=bool)
+        self.labels: dict[str, np.ndarray] = {}
+        self.dead = 0
+
+    def __len__(self) -> int:
+        """Number of rows, including tombstoned ones."""
+        return len(self.ids)
+
+    @property
+    def live(self) -> int:
+        return len(self.ids) - self.dead
+
+    def dead_ratio(self) -> float:
+        return self.dead / len(self.ids) if self.ids else 0.0
+
+    def append(self, asset_id: UUID, labels: Iterable[str] = ()) -> int:
+        """Reserve the next row for ``asset_id``, tombstoning its previous row."""
+        self.tombstone(asset_id)
+        row = len(self.ids)
+        if row == len(self.deleted):
+            self.deleted = self._grow(self.deleted)
+            self.labels = {label: self._grow(bits) for label, bits in self.labels.items()}
+        for label in labels:
+            bits = self.labels.get(label)
+            if bits is None:
+                bits = self.labels[label] = np.zeros(len(self.deleted), dtype=bool)
+            bits[row] = True
+        self.ids.append(asset_id)
+        self.slots[asset_id] = row
+        return row
+
+    def tombstone(self, asset_id: UUID) -> bool:
+        row = self.slots.pop(asset_id, None)
+        if row is None:
+            return False
+        self.deleted[row] = True
+        self.dead += 1
+        return True
+
+    def excluded(self, size: int, where: Iterable[str] | None = None) -> np.ndarray:
+        """Rows among the first ``size`` a search must skip: tombstoned or missing a ``where`` label."""
+        excluded = self.deleted[:size].copy()
+        for label in where or ():
+            bits = self.labels.get(label)
+            if bits is None:
+                excluded[:] = True
+                break
+            excluded |= ~bits[:size]
+        return excluded
+
+    def live_rows(self, size: int) -> np.ndarray:
+        return np.flatnonzero(~self.deleted[:size])
+
+    def compacted(self, rows: np.ndarray, size: int, prefix_ids: list[UUID]) -> "RowTable":
+        """Dense table holding ``rows`` of the first ``size`` rows, then every row added since.
+
+        ``prefix_ids`` are the ids of ``rows`` (built by the caller outside
+        the lock). Tombstones set after ``rows`` was chosen carry over, so
+        concurrent deletes are never lost. Call with the owner's lock held.
+        """
+        tail = len(self.ids) - size
+        table = RowTable(len(rows) + tail)
+        table.ids = prefix_ids + self.ids[size:]
+        table.deleted[: len(rows)] = self.deleted[rows]
+        table.deleted[len(rows) : len(rows) + tail] = self.deleted[size : len(self.ids)]
+        for label, bits in self.labels.items():
+            table.labels[label] = np.zeros(len(table.deleted), dtype=bool)
+            table.labels[label][: len(rows)] = bits[rows]
+            table.labels[label][len(rows) : len(rows) + tail] = bits[size : len(self.ids)]
+        table.dead = int(table.deleted.sum())
+        table.slots = dict(zip(prefix_ids, range(len(rows))))
+        for row in np.flatnonzero(table.deleted[: len(rows)]).tolist():
+            del table.slots[prefix_ids[row]]
+        for row in range(len(rows), len(table.ids)):
+            if not table.deleted[row]:
+                table.slots[table.ids[row]] = row
+        return table
+
+    @staticmethod
+    def _grow(bits: np.ndarray) -> np.ndarray:
+        grown = np.zeros(len(bits) * 2, dtype=bool)
+        grown[: len(bits)] = bits
+        return grown
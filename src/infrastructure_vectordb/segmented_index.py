@@ -0,0 +1,514 @@
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Iterable
+from uuid import UUID
+
+import numpy as np
+
+from .flat_index import as_matrix, as_vector, normalize, top_k_indices, top_k_rows
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+MANIFEST = "manifest.json"
+LOCK = "writer.lock"
+_ID_BYTES = 16
+
+
+class SegmentLockedError(RuntimeError):
+    """Another process holds the writer lock of a segment directory."""
+
+
+def _read_labels(path: str, rows: int) -> dict[str, np.ndarray]:
+    """Per-label row bitmaps from a ``.lbl`` file holding one JSON list per row."""
+    labels: dict[str, np.ndarray] = {}
+    if not os.path.exists(path):
+        return labels
+    with open(path) as f:
+        for row, line in enumerate(f):
+            if row >= rows:
+                break
+            for label in json.loads(line):
+                bits = labels.get(label)
+                if bits is None:
+                    bits = labels[label] = np.zeros(rows, dtype=bool)
+                bits[row] = True
+    return labels
+
+
+def _write_tombstone(path: str, deleted: np.ndarray, row: int) -> None:
+    """Persist the tombstone of ``row`` by rewriting only the bitmap byte that holds it."""
+    start = row - row % 8
+    byte = np.packbits(deleted[start : start + 8])
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.seek(row // 8)
+        f.write(byte.tobytes())
+
+
+def _read_array(path: str, dtype, row_shape: tuple[int, ...], rows: int) -> np.ndarray:
+    """Memory-map ``rows`` records of ``path`` read-only (mmap refuses empty files)."""
+    if rows == 0:
+        return np.empty((0,) + row_shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,) + row_shape)
+
+
+class SealedSegment:
+    """Immutable run of rows memory-mapped from disk.
+
+    Vectors and ids are shared read-only mappings, so every process opening
+    the same directory reads them through one copy in the page cache. Only
+    the tombstone bitmap is private; a delete rewrites only its byte of it.
+    Label bitmaps are built from the ``.lbl`` file on the first filtered
+    search and cached, since a sealed segment never changes.
+    """
+
+    def __init__(self, base: str, dim: int) -> None:
+        self.base = base
+        self.dim = dim
+        # A crash can leave a torn trailing row; only whole rows count
+        rows = min(
+            os.path.getsize(base + ".vec") // (4 * dim),
+            os.path.getsize(base + ".ids") // _ID_BYTES,
+        )
+        self.vectors = _read_array(base + ".vec", np.float32, (dim,), rows)
+        self.ids = _read_array(base + ".ids", np.uint8, (_ID_BYTES,), rows)
+        self.deleted = np.zeros(rows, dtype=bool)
+        if os.path.exists(base + ".del"):
+            bits = np.unpackbits(np.fromfile(base + ".del", dtype=np.uint8))[:rows]
+            self.deleted[: len(bits)] = bits.astype(bool)
+        self._labels: dict[str, np.ndarray] | None = None
+        self.stamp = self.file_stamp(base)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @staticmethod
+    def file_stamp(base: str) -> tuple[int, int, int]:
+        """Changes whenever the writer appends rows or tombstones one."""
+        deleted = base + ".del"
+        return (
+            os.path.getsize(base + ".vec"),
+            os.path.getsize(base + ".ids"),
+            os.stat(deleted).st_mtime_ns if os.path.exists(deleted) else 0,
+        )
+
+    def label_bits(self, label: str) -> np.ndarray | None:
+        if self._labels is None:
+            self._labels = _read_labels(self.base + ".lbl", len(self))
+        return self._labels.get(label)
+
+    def row_labels(self) -> list[str]:
+        """Raw ``.lbl`` lines, one per row."""
+        if not os.path.exists(self.base + ".lbl"):
+            return ["[]\n"] * len(self)
+        with open(self.base + ".lbl") as f:
+            lines = f.readlines()[: len(self)]
+        return lines + ["[]\n"] * (len(self) - len(lines))
+
+    def asset_id(self, row: int) -> UUID:
+        return UUID(bytes=self.ids[row].tobytes())
+
+    def mark_deleted(self, row: int) -> None:
+        self.deleted[row] = True
+        _write_tombstone(self.base + ".del", self.deleted, row)
+
+    def close(self) -> None:
+        pass
+
+
+class AppendSegment:
+    """Segment receiving new rows: held in memory and written through to disk."""
+
+    def __init__(self, base: str, dim: int, capacity: int = 1024) -> None:
+        self.base = base
+        self.dim = dim
+        self._vectors = np.empty((capacity, dim), dtype=np.float32)
+        self._ids = np.empty((capacity, _ID_BYTES), dtype=np.uint8)
+        self._deleted = np.zeros(capacity, dtype=bool)
+        self._labels: dict[str, np.ndarray] = {}
+        self._size = 0
+        self._vec_file = open(base + ".vec", "ab")
+        self._ids_file = open(base + ".ids", "ab")
+        self._lbl_file = open(base + ".lbl", "a")
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[: self._size]
+
+    @property
+    def deleted(self) -> np.ndarray:
+        return self._deleted[: self._size]
+
+    def append(self, asset_id: UUID, vector: np.ndarray, labels: Iterable[str] = ()) -> int:
+        row = self._size
+        labels = list(labels)
+        if row == self._vectors.shape[0]:
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+            self._ids = np.concatenate([self._ids, np.empty_like(self._ids)])
+            self._deleted = np.concatenate([self._deleted, np.zeros_like(self._deleted)])
+            self._labels = {k: np.concatenate([v, np.zeros_like(v)]) for k, v in self._labels.items()}
+        for label in labels:
+            if label not in self._labels:
+                self._labels[label] = np.zeros(self._vectors.shape[0], dtype=bool)
+            self._labels[label][row] = True
+        self._vectors[row] = vector
+        self._ids[row] = np.frombuffer(asset_id.bytes, dtype=np.uint8)
+        self._vec_file.write(vector.tobytes())
+        self._ids_file.write(asset_id.bytes)
+        self._lbl_file.write(json.dumps(labels) + "\n")
+        self._vec_file.flush()
+        self._ids_file.flush()
+        self._lbl_file.flush()
+        self._size += 1
+        return row
+
+    def label_bits(self, label: str) -> np.ndarray | None:
+        bits = self._labels.get(label)
+        return None if bits is None else bits[: self._size]
+
+    def asset_id(self, row: int) -> UUID:
+        return UUID(bytes=self._ids[row].tobytes())
+
+    def mark_deleted(self, row: int) -> None:
+        self._deleted[row] = True
+        _write_tombstone(self.base + ".del", self.deleted, row)
+
+    def close(self) -> None:
+        self._vec_file.close()
+        self._ids_file.close()
+        self._lbl_file.close()
+
+
+class SegmentedIndex:
+    """Persistent exact cosine index for one domain made of on-disk segments.
+
+    Each segment is a set of files sharing a sequence number: ``.vec`` holds
+    fixed-width normalized float32 rows, ``.ids`` the matching 16-byte asset
+    ids, ``.lbl`` one JSON list of filter labels per row and ``.del`` a
+    packed tombstone bitmap. ``manifest.json`` lists the live segments and
+    is replaced atomically, so a crash mid-merge never exposes duplicate
+    rows.
+
+    New rows go to a single :class:`AppendSegment`; once it holds
+    ``segment_rows`` rows it is sealed and memory-mapped. :meth:`merge`
+    rewrites all sealed segments into one, dropping deleted rows, and is
+    safe to run on a background thread while the index keeps serving.
+
+    Only one process may write a directory: the writer holds an exclusive
+    ``flock`` on ``writer.lock`` until :meth:`close`, and a second writer
+    gets :class:`SegmentLockedError`. Other processes open the directory
+    with ``read_only=True``, which never touches the files, maps every
+    segment in the manifest (the writer's append segment up to its last
+    whole row) and re-reads the manifest and changed segments at most every
+    ``refresh_seconds`` before a search.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        segment_rows: int = 65536,
+        read_only: bool = False,
+        refresh_seconds: float = 1.0,
+    ) -> None:
+        self.directory = directory
+        self.dim = dim
+        self.segment_rows = segment_rows
+        self.read_only = read_only
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._merging = False
+        self._sealed: list[SealedSegment] = []
+        self._active: AppendSegment | None = None
+        self._lock_file = None
+        self._refreshed_at = time.monotonic()
+        self._locations: dict[UUID, tuple[SealedSegment | AppendSegment, int]] | None = None
+
+        if read_only:
+            self._sealed = [SealedSegment(self._base(seq), dim) for seq in self._read_manifest()]
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._acquire_writer_lock()
+        try:
+            sequences = self._read_manifest() if os.path.exists(os.path.join(directory, MANIFEST)) else []
+            self._remove_orphans(sequences)
+            self._sealed = [SealedSegment(self._base(seq), dim) for seq in sequences]
+            self._next_seq = max(sequences, default=0) + 1
+            self._active = self._new_append_segment()
+            self._write_manifest()
+        except BaseException:
+            self._release_writer_lock()
+            raise
+
+    @classmethod
+    def open(
+        cls, directory: str, segment_rows: int = 65536, read_only: bool = False, refresh_seconds: float = 1.0
+    ) -> "SegmentedIndex":
+        """Reopen an index previously written to ``directory``."""
+        with open(os.path.join(directory, MANIFEST)) as f:
+            dim = json.load(f)["dim"]
+        return cls(directory, dim, segment_rows=segment_rows, read_only=read_only, refresh_seconds=refresh_seconds)
+
+    def __len__(self) -> int:
+        return sum(int((~s.deleted).sum()) for s in self._segments())
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments())
+
+    def add(self, asset_id: UUID, embedding: list[float], labels: Iterable[str] = ()) -> None:
+        """Insert ``asset_id`` tagged with ``labels``, tombstoning the row previously stored for it."""
+        self._check_writable()
+        vector = normalize(as_vector(embedding, self.dim))
+        with self._lock:
+            locations = self._id_locations()
+            previous = locations.pop(asset_id, None)
+            if previous is not None:
+                segment, row = previous
+                segment.mark_deleted(row)
+            row = self._active.append(asset_id, vector, labels)
+            locations[asset_id] = (self._active, row)
+            if len(self._active) >= self.segment_rows:
+                self._seal()
+
+    def delete(self, asset_id: UUID) -> bool:
+        """Tombstone the row stored for ``asset_id``; returns whether it existed."""
+        self._check_writable()
+        with self._lock:
+            location = self._id_locations().pop(asset_id, None)
+            if location is None:
+                return False
+            segment, row = location
+            segment.mark_deleted(row)
+            return True
+
+    def search(
+        self, embedding: list[float], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Return up to ``top_k`` ``(asset_id, cosine score)`` pairs, best first.
+
+        With ``where``, only rows carrying every listed label are eligible.
+        """
+        self._maybe_refresh()
+        query = normalize(as_vector(embedding, self.dim))
+        hits: list[tuple[float, int, SealedSegment | AppendSegment, int]] = []
+        for n, segment in enumerate(self._segments()):
+            scores = segment.vectors @ query
+            scores[self._excluded(segment, len(scores), where)] = -np.inf
+            for row in top_k_indices(scores, top_k):
+                if scores[row] > -np.inf:
+                    hits.append((float(scores[row]), n, segment, int(row)))
+        best = heapq.nlargest(top_k, hits, key=lambda hit: (hit[0], -hit[1]))
+        return [(segment.asset_id(row), score) for score, _, segment, row in best]
+
+    def search_many(
+        self, embeddings: list[list[float]], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[list[tuple[UUID, float]]]:
+        """Batched :meth:`search`: one matrix-matrix product per segment."""
+        self._maybe_refresh()
+        queries = normalize(as_matrix(embeddings, self.dim))
+        hits: list[list[tuple[float, int, SealedSegment | AppendSegment, int]]] = [[] for _ in queries]
+        for n, segment in enumerate(self._segments()):
+            scores = queries @ segment.vectors.T
+            scores[:, self._excluded(segment, scores.shape[1], where)] = -np.inf
+            rows, row_scores = top_k_rows(scores, top_k)
+            for q, (q_rows, q_scores) in enumerate(zip(rows.tolist(), row_scores.tolist())):
+                hits[q].extend((s, n, segment, r) for r, s in zip(q_rows, q_scores) if s > -np.inf)
+        return [
+            [(segment.asset_id(row), score) for score, _, segment, row in heapq.nlargest(top_k, q_hits, key=lambda h: (h[0], -h[1]))]
+            for q_hits in hits
+        ]
+
+    def needs_merge(self, max_segments: int) -> bool:
+        return not self.read_only and not self._merging and len(self._sealed) > max(max_segments, 1)
+
+    def needs_compaction(self, ratio: float) -> bool:
+        """Whether tombstones exceed ``ratio`` of the sealed rows."""
+        rows = sum(len(s) for s in self._sealed)
+        dead = sum(int(s.deleted.sum()) for s in self._sealed)
+        return not self.read_only and not self._merging and rows > 0 and dead / rows > ratio
+
+    def compact(self) -> None:
+        self.merge()
+
+    def merge(self) -> None:
+        """Compact every sealed segment into one, dropping tombstoned rows."""
+        self._check_writable()
+        with self._lock:
+            if self._merging or not self._sealed:
+                return
+            self._merging = True
+            sources = list(self._sealed)
+            keep = [~s.deleted.copy() for s in sources]
+            seq = self._next_seq
+            self._next_seq += 1
+        try:
+            base = self._base(seq)
+            with (
+                open(base + ".vec", "wb") as vec_file,
+                open(base + ".ids", "wb") as ids_file,
+                open(base + ".lbl", "w") as lbl_file,
+            ):
+                for segment, mask in zip(sources, keep):
+                    vec_file.write(np.ascontiguousarray(segment.vectors[mask]).tobytes())
+                    ids_file.write(np.ascontiguousarray(segment.ids[mask]).tobytes())
+                    lbl_file.writelines(line for line, kept in zip(segment.row_labels(), mask) if kept)
+            merged = SealedSegment(base, self.dim)
+
+            with self._lock:
+                # Rows deleted while the merge was writing must stay deleted
+                offset = 0
+                for segment, mask in zip(sources, keep):
+                    positions = np.cumsum(mask) - 1 + offset
+                    late = segment.deleted & mask
+                    if late.any():
+                        merged.deleted[positions[late]] = True
+                    offset += int(mask.sum())
+                if merged.deleted.any():
+                    np.packbits(merged.deleted).tofile(base + ".del")
+                self._sealed = [s for s in self._sealed if s not in sources] + [merged]
+                self._locations = None
+                self._write_manifest()
+            for segment in sources:
+                self._unlink(segment.base)
+        finally:
+            self._merging = False
+
+    def refresh(self) -> None:
+        """Read-only: pick up segments, rows and tombstones the writer has added since the last refresh.
+
+        Unchanged segments keep their mappings. A manifest naming files the
+        writer has just merged away leaves the current view in place until
+        the next refresh.
+        """
+        if not self.read_only:
+            return
+        try:
+            current = {segment.base: segment for segment in self._sealed}
+            sealed = []
+            for seq in self._read_manifest():
+                base = self._base(seq)
+                segment = current.get(base)
+                if segment is None or segment.stamp != SealedSegment.file_stamp(base):
+                    segment = SealedSegment(base, self.dim)
+                sealed.append(segment)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._sealed = sealed
+            self._locations = None
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments():
+                segment.close()
+        self._release_writer_lock()
+
+    @staticmethod
+    def _excluded(segment: SealedSegment | AppendSegment, rows: int, where: Iterable[str] | None) -> np.ndarray:
+        """Rows a search must skip: tombstoned or missing one of the ``where`` labels."""
+        excluded = segment.deleted[:rows].copy()
+        for label in where or ():
+            bits = segment.label_bits(label)
+            if bits is None:
+                excluded[:] = True
+                break
+            excluded |= ~bits[:rows]
+        return excluded
+
+    def _segments(self) -> list[SealedSegment | AppendSegment]:
+        return self._sealed + ([self._active] if self._active is not None else [])
+
+    def _maybe_refresh(self) -> None:
+        if self.read_only and time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self._refreshed_at = time.monotonic()
+            self.refresh()
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Index in {self.directory} is open read-only")
+
+    def _acquire_writer_lock(self) -> None:
+        if fcntl is None:
+            return
+        self._lock_file = open(os.path.join(self.directory, LOCK), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise SegmentLockedError(f"Index in {self.directory} is already open for writing") from None
+
+    def _release_writer_lock(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _read_manifest(self) -> list[int]:
+        with open(os.path.join(self.directory, MANIFEST)) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index in {self.directory} has dimension {meta['dim']}, not {self.dim}")
+        return meta["segments"]
+
+    def _seal(self) -> None:
+        self._active.close()
+        sealed = SealedSegment(self._active.base, self.dim)
+        if self._locations is not None:
+            for row in np.flatnonzero(~sealed.deleted).tolist():
+                self._locations[sealed.asset_id(row)] = (sealed, row)
+        self._sealed.append(sealed)
+        self._active = self._new_append_segment()
+        self._write_manifest()
+
+    def _id_locations(self) -> dict[UUID, tuple[SealedSegment | AppendSegment, int]]:
+        """Lazily built ``asset_id -> (segment, row)`` map of live rows."""
+        if self._locations is None:
+            locations = {}
+            for segment in self._segments():
+                for row in np.flatnonzero(~segment.deleted).tolist():
+                    locations[segment.asset_id(row)] = (segment, row)
+            self._locations = locations
+        return self._locations
+
+    def _new_append_segment(self) -> AppendSegment:
+        seq = self._next_seq
+        self._next_seq += 1
+        return AppendSegment(self._base(seq), self.dim)
+
+    def _write_manifest(self) -> None:
+        sequences = [int(os.path.basename(s.base)) for s in self._segments()]
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"dim": self.dim, "segments": sequences}, f)
+        os.replace(path + ".tmp", path)
+
+    def _remove_orphans(self, live: list[int]) -> None:
+        """Delete segment files left behind by an interrupted merge."""
+        keep = {f"{seq:08d}" for seq in live}
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext in (".vec", ".ids", ".del", ".lbl") and stem not in keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def _base(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:08d}")
+
+    @staticmethod
+    def _unlink(base: str) -> None:
+        for ext in (".vec", ".ids", ".del", ".lbl"):
+            if os.path.exists(base + ext):
+                os.remove(base + ext)
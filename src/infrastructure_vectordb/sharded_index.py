@@ -0,0 +1,87 @@
+import heapq
+from concurrent.futures import Executor
+from typing import Callable, Iterable
+from uuid import UUID
+
+from .flat_index import FlatIndex
+from .quantized_index import QuantizedIndex
+
+ShardIndex = FlatIndex | QuantizedIndex
+
+
+class ShardedIndex:
+    """One domain split across independent shard indexes searched in parallel.
+
+    An asset always lives in shard ``asset_id.int % len(shards)``, so its
+    shard is known without a lookup table. Each shard returns its own top-k
+    and the partial lists are merged with a heap.
+
+    The shard kernels are NumPy matrix products, which release the GIL, so
+    a thread pool scales with cores without copying vectors into worker
+    processes. Domains smaller than ``parallel_rows`` are scanned inline,
+    where dispatch overhead would outweigh the speed-up.
+    """
+
+    def __init__(
+        self,
+        shards: list[ShardIndex],
+        executor: Executor,
+        parallel_rows: int = 16384,
+    ) -> None:
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = shards
+        self.executor = executor
+        self.parallel_rows = parallel_rows
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def shard_for(self, asset_id: UUID) -> ShardIndex:
+        return self.shards[asset_id.int % len(self.shards)]
+
+    def add(self, asset_id: UUID, embedding: list[float], labels: Iterable[str] = ()) -> None:
+        self.shard_for(asset_id).add(asset_id, embedding, labels)
+
+    def delete(self, asset_id: UUID) -> bool:
+        return self.shard_for(asset_id).delete(asset_id)
+
+    def needs_compaction(self, ratio: float) -> bool:
+        return any(shard.needs_compaction(ratio) for shard in self.shards)
+
+    def compact(self, ratio: float = 0.0) -> None:
+        """Compact every shard whose tombstones exceed ``ratio``."""
+        for shard in self.shards:
+            if shard.needs_compaction(ratio):
+                shard.compact()
+
+    def search(
+        self, embedding: list[float], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Return up to ``top_k`` ``(asset_id, score)`` pairs, best first."""
+        partials = self._map(lambda shard: shard.search(embedding, top_k, where))
+        return self._merge(partials, top_k)
+
+    def search_many(
+        self, embeddings: list[list[float]], top_k: int = 5, where: Iterable[str] | None = None
+    ) -> list[list[tuple[UUID, float]]]:
+        """Batched :meth:`search`; every shard answers the whole batch at once."""
+        partials = self._map(lambda shard: shard.search_many(embeddings, top_k, where))
+        if not partials:
+            return [[] for _ in embeddings]
+        return [self._merge(per_query, top_k) for per_query in zip(*partials)]
+
+    def close(self) -> None:
+        for shard in self.shards:
+            if isinstance(shard, QuantizedIndex):
+                shard.close()
+
+    def _map(self, fn: Callable[[ShardIndex], list]) -> list:
+        shards = [shard for shard in self.shards if len(shard)]
+        if len(shards) < 2 or len(self) < self.parallel_rows:
+            return [fn(shard) for shard in shards]
+        return list(self.executor.map(fn, shards))
+
+    @staticmethod
+    def _merge(partials, top_k: int) -> list[tuple[UUID, float]]:
+        return heapq.nlargest(top_k, (hit for hits in partials for hit in hits), key=lambda hit: hit[1])
@@ -14,6 +14,10 @@ async def lifespan(app: FastAPI):
         await connect_to_mongo()
     yield
     # Shutdown
+    from src.application.integration.dependencies import close_job_queue, close_llm_provider, close_vector_db
+    await close_job_queue()
+    await close_llm_provider()
+    await close_vector_db()
     if settings.USE_MONGODB:
         await close_mongo_connection()
 
@@ -27,12 +31,14 @@ def create_app() -> FastAPI:
     app.include_router(v1.user_controller.router, prefix="/api/v1")
     app.include_router(v1.query_controller.router, prefix="/api/v1")
     app.include_router(v1.auth_controller.router, prefix="/api/v1")
+    app.include_router(v1.job_controller.router, prefix="/api/v1")
 
     app.include_router(admin.user_controller.router, prefix="/admin/v1")
     app.include_router(admin.asset_controller.router, prefix="/admin/v1")
     app.include_router(admin.domain_controller.router, prefix="/admin/v1")
     app.include_router(admin.category_controller.router, prefix="/admin/v1")
     app.include_router(admin.audit_controller.router, prefix="/admin/v1")
+    app.include_router(admin.cache_controller.router, prefix="/admin/v1")
 
     @app.get("/health")
     async def health():
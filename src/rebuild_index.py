@@ -0,0 +1,47 @@
+"""
+Rebuild the configured vector database from embeddings stored with the assets,
+and the keyword index from their content.
+
+No embedding API calls are made, so switching VECTOR_DB, recovering a wiped
+Qdrant or warming a new node costs only a database scan.
+
+Usage:
+    python -m src.rebuild_index [--domain DOMAIN_ID] [--model MODEL] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+from src.common.config import get_settings
+from src.common.logging import logger
+from src.application.integration.dependencies import get_lexical_index, get_vector_db
+from src.application.services.index_rebuild_service import IndexRebuildService
+from src.domain.persistence.dependencies import get_asset_repository
+
+
+async def main(domain_id: UUID | None, model: str | None, batch_size: int) -> None:
+    settings = get_settings()
+    if settings.USE_MONGODB:
+        from src.infrastructure_persistence.database.mongodb import connect_to_mongo, close_mongo_connection
+        await connect_to_mongo()
+    try:
+        service = IndexRebuildService(
+            repo=get_asset_repository(), vector_db=get_vector_db(), lexical_index=get_lexical_index()
+        )
+        indexed, skipped = await service.rebuild(domain_id, model=model, batch_size=batch_size)
+        logger.info(f"Indexed {indexed} embeddings into {settings.VECTOR_DB}, skipped {skipped} from other models")
+        if settings.HYBRID_SEARCH:
+            logger.info(f"Indexed {await service.rebuild_lexical(domain_id)} assets into the keyword index")
+    finally:
+        if settings.USE_MONGODB:
+            await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domain", type=UUID, help="Only rebuild this domain")
+    parser.add_argument("--model", help="Only load embeddings produced by this model")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(main(args.domain, args.model, args.batch_size))
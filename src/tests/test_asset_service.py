@@ -2,6 +2,7 @@ import pytest
 from uuid import uuid4, UUID
 from src.application.services.asset_service import AssetService
 from src.application.dtos.asset_dtos import CreateAssetRequestDto, UpdateAssetRequestDto
+from src.domain.entities.asset import Asset
 from src.domain.enums.asset_type import AssetType
 from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
 from fastapi import HTTPException
@@ -219,3 +220,304 @@ async def test_asset_service_with_embedding():
         asset = await service_no_embedding.create_asset(create_dto)
         assert asset.name == "doc"
         assert asset.content == "hello"
+
+
+@pytest.mark.asyncio
+async def test_repository_get_many_keeps_requested_order():
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    assets = [Asset(name=f"a{i}", domain_id=domain_id, asset_type=AssetType.DOCUMENT) for i in range(3)]
+    for asset in assets:
+        await repo.add(asset)
+    await repo.soft_delete(assets[1].id)
+
+    found = await repo.get_many([assets[2].id, uuid4(), assets[1].id, assets[0].id])
+    assert [a.id for a in found] == [assets[2].id, assets[0].id]
+    found = await repo.get_many([assets[1].id], include_deleted=True)
+    assert [a.id for a in found] == [assets[1].id]
+
+
+def test_embedding_codec_round_trip():
+    from src.infrastructure_persistence.embedding_codec import decode_embedding, encode_embedding
+
+    vector = [0.1, -2.5, 3.0]
+    assert len(encode_embedding(vector, "float16")) == 6
+    assert decode_embedding(encode_embedding(vector, "float32"), "float32") == pytest.approx(vector)
+    assert decode_embedding(encode_embedding(vector, "float16"), "float16") == pytest.approx(vector, rel=1e-3)
+    with pytest.raises(ValueError):
+        encode_embedding(vector, "float64")
+
+
+@pytest.mark.asyncio
+async def test_stored_embeddings_rebuild_index_without_llm():
+    from src.application.services.index_rebuild_service import IndexRebuildService
+    from src.infrastructure_integration.cohere_llm import CohereLLM
+    from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+
+    class CountingLLM(CohereLLM):
+        calls = 0
+
+        def embed(self, text: str) -> list[float]:
+            CountingLLM.calls += 1
+            return [float(len(text)), 1.0]
+
+    repo = MemoryAssetRepository()
+    service = AssetService(repo, llm=CountingLLM(), vector_db=MemoryVectorDB(repo))
+    domain_id = uuid4()
+    asset = await service.create_asset(
+        CreateAssetRequestDto(name="doc", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="hello")
+    )
+    stored = await repo.get_embedding(asset.id)
+    assert stored.model == "CountingLLM" and stored.vector == [5.0, 1.0]
+
+    # Restoring reuses the stored embedding instead of calling the provider
+    await service.delete_asset(asset.id)
+    await service.restore_asset(asset.id)
+    assert CountingLLM.calls == 1
+
+    other = Asset(name="other", domain_id=uuid4(), asset_type=AssetType.DOCUMENT)
+    await repo.add(other)
+    await repo.save_embedding(other.id, [0.0, 1.0], "other-model")
+
+    fresh = MemoryVectorDB(repo)
+    indexed, skipped = await IndexRebuildService(repo=repo, vector_db=fresh).rebuild(model="CountingLLM", batch_size=1)
+    assert (indexed, skipped) == (1, 1)
+    results = await fresh.search(domain_id, [5.0, 1.0])
+    assert [a.id for a, _ in results] == [asset.id]
+    assert CountingLLM.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_category_change_relabels_vector_and_survives_rebuild():
+    from src.application.services.index_rebuild_service import IndexRebuildService
+    from src.infrastructure_integration.cohere_llm import CohereLLM
+    from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    service = AssetService(repo, llm=CohereLLM(), vector_db=vector_db)
+    domain_id, old_category, new_category = uuid4(), uuid4(), uuid4()
+    asset = await service.create_asset(
+        CreateAssetRequestDto(
+            name="doc", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="hello", category_id=old_category
+        )
+    )
+    assert await vector_db.search(domain_id, [5.0], category_id=old_category)
+
+    await service.update_asset(asset.id, UpdateAssetRequestDto(category_id=new_category))
+    assert await vector_db.search(domain_id, [5.0], category_id=old_category) == []
+    results = await vector_db.search(domain_id, [5.0], category_id=new_category, asset_type=AssetType.DOCUMENT)
+    assert [a.id for a, _ in results] == [asset.id]
+
+    fresh = MemoryVectorDB(repo)
+    await IndexRebuildService(repo=repo, vector_db=fresh).rebuild()
+    results = await fresh.search(domain_id, [5.0], category_id=new_category)
+    assert [a.id for a, _ in results] == [asset.id]
+
+
+def test_chunker_prefers_sentence_boundaries_and_overlaps():
+    from src.application.chunking.chunker import Chunker
+    from src.domain.entities.chunk import chunk_id
+
+    text = "تقدم الطلبات عبر البوابة. تدفع الرسوم نقدا، ثم تحدد المقابلة؟ نعم.\n\nSecond paragraph here."
+    asset_id = uuid4()
+    chunks = list(Chunker(max_chars=40, overlap=10).chunks(asset_id, text))
+    assert chunks[0].text == "تقدم الطلبات عبر البوابة."
+    assert all(len(chunk.text) <= 40 and chunk.text == text[chunk.start:chunk.end] for chunk in chunks)
+    assert [chunk.id for chunk in chunks] == [chunk_id(asset_id, n) for n in range(len(chunks))]
+    # Consecutive chunks overlap on whole words and together cover the text
+    assert all(b.start < a.end for a, b in zip(chunks, chunks[1:]))
+    assert chunks[-1].text.endswith("Second paragraph here.")
+    assert list(Chunker(max_chars=4, overlap=0).spans("abcdefghij")) == [(0, 4), (4, 8), (8, 10)]
+
+
+@pytest.mark.asyncio
+async def test_chunked_asset_is_ranked_by_its_best_chunk():
+    from src.application.chunking.chunker import Chunker
+    from src.application.services.index_rebuild_service import IndexRebuildService
+    from src.infrastructure_integration.cohere_llm import CohereLLM
+    from src.infrastructure_vectordb.chunked_vector_db import ChunkedVectorDB
+    from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+
+    class TopicLLM(CohereLLM):
+        def embed(self, text: str) -> list[float]:
+            return [1.0, 0.0, 0.0] if "visa" in text else [0.0, 1.0, 0.0] if "fee" in text else [0.0, 0.0, 1.0]
+
+    repo = MemoryAssetRepository()
+    inner = MemoryVectorDB(repo)
+    vector_db = ChunkedVectorDB(inner, repo)
+    service = AssetService(repo, llm=TopicLLM(), vector_db=vector_db, chunker=Chunker(max_chars=40, overlap=0))
+    domain_id = uuid4()
+    content = "Office hours run from nine to five.\n\nThe visa office opens on Sunday.\n\nThe fee is paid in cash."
+    long_doc = await service.create_asset(
+        CreateAssetRequestDto(name="guide", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content=content)
+    )
+    short_doc = await service.create_asset(
+        CreateAssetRequestDto(name="note", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="fee table")
+    )
+    stored = await repo.get_embedding(long_doc.id)
+    assert len(stored.chunks) == 3 and (await repo.get_embedding(short_doc.id)).chunks is None
+
+    # One hit per asset, scored by the matching chunk rather than the whole document
+    results = await vector_db.search(domain_id, [1.0, 0.0, 0.0], top_k=2)
+    assert [(a.id, round(score, 3)) for a, score in results][0] == (long_doc.id, 1.0)
+    assert [a.id for a, _ in results] == [long_doc.id, short_doc.id]
+
+    # A restarted process resolves chunk ids through the repository
+    restarted = ChunkedVectorDB(inner, repo)
+    assert [a.id for a, _ in await restarted.search(domain_id, [0.0, 0.0, 1.0], top_k=1)] == [long_doc.id]
+
+    fresh = ChunkedVectorDB(MemoryVectorDB(repo), repo)
+    assert await IndexRebuildService(repo=repo, vector_db=fresh).rebuild() == (2, 0)
+    assert [a.id for a, _ in await fresh.search(domain_id, [1.0, 0.0, 0.0], top_k=1)] == [long_doc.id]
+
+    # Shrinking the content to one chunk drops the old chunk vectors
+    await service.update_asset(long_doc.id, UpdateAssetRequestDto(content="visa desk"))
+    assert (await repo.get_embedding(long_doc.id)).chunks is None
+    hits = await inner.search_many(domain_id, [[1.0, 0.0, 0.0]], top_k=10)
+    assert {vector_id for vector_id, _ in hits[0]} == {long_doc.id, short_doc.id}
+    await service.delete_asset(long_doc.id)
+    assert [a.id for a, _ in await vector_db.search(domain_id, [1.0, 0.0, 0.0])] == [short_doc.id]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_retries_coalesces_and_bounds_pending():
+    import asyncio
+    from src.application.jobs.job_queue import JobQueue
+    from src.domain.enums.job_status import JobStatus
+
+    queue = JobQueue(workers=2, max_pending=2, max_attempts=3, retry_delay=0.001)
+    calls = {"flaky": 0, "broken": 0}
+
+    async def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise RuntimeError("provider timeout")
+
+    async def broken():
+        calls["broken"] += 1
+        raise RuntimeError("bad input")
+
+    key = uuid4()
+    first = queue.submit("index_asset", flaky, key=key)
+    assert queue.submit("index_asset", flaky, key=key) is first
+    failing = queue.submit("index_asset", broken)
+    with pytest.raises(asyncio.QueueFull):
+        queue.submit("index_asset", broken)
+
+    await queue.join()
+    assert (first.status, first.attempts, calls["flaky"]) == (JobStatus.SUCCEEDED, 3, 3)
+    assert (failing.status, failing.attempts) == (JobStatus.FAILED, 3)
+    assert failing.error == "RuntimeError: bad input"
+    assert queue.get(first.id) is first and queue.latest(key) is first
+    assert queue.stats()["retried"] == 4
+    await queue.close()
+
+
+def test_asset_indexing_runs_in_background_job():
+    import asyncio
+    import time
+    from fastapi.testclient import TestClient
+    from src.application.integration.dependencies import get_job_queue
+    from src.application.jobs.job_queue import JobQueue
+    from src.infrastructure_integration.cohere_llm import CohereLLM
+    from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+    from src.main import create_app
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    queue = JobQueue(workers=1)
+    app = create_app()
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[AssetService] = lambda: AssetService(repo, llm=CohereLLM(), vector_db=vector_db, jobs=queue)
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/assets/",
+            json={"name": "doc", "domain_id": str(uuid4()), "asset_type": "document", "content": "hello"},
+        )
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        for _ in range(100):
+            job = client.get(f"/api/v1/jobs/{job_id}").json()
+            if job["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+        assert job["status"] == "succeeded" and job["asset_id"] == response.json()["id"]
+        assert client.get(f"/api/v1/jobs/{uuid4()}").status_code == 404
+    assert asyncio.run(repo.get_embedding(UUID(response.json()["id"]))).vector == [5.0]
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_reassembles_lines_across_chunks():
+    from src.common.ndjson import iter_ndjson
+
+    async def chunks():
+        for chunk in (b'{"a": 1}\n{"b"', b': 2}\n\n not json\n', b"x" * 20 + b"\n", b'[3]'):
+            yield chunk
+
+    parsed = [record async for record in iter_ndjson(chunks(), max_line_bytes=16)]
+    assert [(line, value) for line, value, _ in parsed] == [(1, {"a": 1}), (2, {"b": 2}), (4, None), (5, None), (6, [3])]
+    assert parsed[2][2].startswith("Invalid JSON") and parsed[3][2] == "Line exceeds 16 bytes"
+
+
+def test_bulk_import_reports_bad_records_and_indexes_the_rest():
+    import asyncio
+    import json
+    import time
+    from fastapi.testclient import TestClient
+    from src.application.chunking.chunker import Chunker
+    from src.application.integration.dependencies import get_job_queue
+    from src.application.jobs.job_queue import JobQueue
+    from src.infrastructure_integration.cohere_llm import CohereLLM
+    from src.infrastructure_vectordb.chunked_vector_db import ChunkedVectorDB
+    from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+    from src.main import create_app
+
+    class TopicLLM(CohereLLM):
+        def embed(self, text: str) -> list[float]:
+            return [1.0, 0.0] if "visa" in text else [0.0, 1.0]
+
+    repo = MemoryAssetRepository()
+    vector_db = ChunkedVectorDB(MemoryVectorDB(repo), repo)
+    queue = JobQueue(workers=1)
+    app = create_app()
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[AssetService] = lambda: AssetService(
+        repo, llm=TopicLLM(), vector_db=vector_db, chunker=Chunker(max_chars=40, overlap=0), jobs=queue
+    )
+    domain_id = str(uuid4())
+    lines = [
+        json.dumps({"name": "short", "domain_id": domain_id, "asset_type": "document", "content": "visa desk"}),
+        "{not json",
+        json.dumps({"name": "", "domain_id": domain_id, "asset_type": "document"}),
+        json.dumps({"name": "bad type", "domain_id": domain_id, "asset_type": "video"}),
+        json.dumps({
+            "name": "long", "domain_id": domain_id, "asset_type": "document",
+            "content": "The fee is paid in cash.\n\nThe visa office opens on Sunday.",
+        }),
+        json.dumps({"name": "empty", "domain_id": domain_id, "asset_type": "document"}),
+    ]
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/assets/import",
+            content="\n".join(lines).encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        result = response.json()
+        assert (result["imported"], result["failed"]) == (3, 3)
+        assert [error["line"] for error in result["errors"]] == [2, 3, 4]
+        assert result["errors"][1]["error"] == "name must be a non-empty string"
+        assert len(result["job_ids"]) == 1
+        for _ in range(100):
+            if client.get(f"/api/v1/jobs/{result['job_ids'][0]}").json()["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+
+    assets = {asset.name: asset for asset in asyncio.run(repo.list(domain_id=UUID(domain_id)))}
+    assert set(assets) == {"short", "long", "empty"}
+    assert asyncio.run(repo.get_embedding(assets["short"].id)).chunks is None
+    assert len(asyncio.run(repo.get_embedding(assets["long"].id)).chunks) == 2
+    assert asyncio.run(repo.get_embedding(assets["empty"].id)) is None
+    hits = asyncio.run(vector_db.search(UUID(domain_id), [1.0, 0.0], top_k=2))
+    assert {asset.name for asset, score in hits if score > 0.99} == {"short", "long"}
@@ -1,17 +1,28 @@
+import asyncio
+import json
+import threading
 from uuid import uuid4
 import pytest
+from fastapi.testclient import TestClient
 from src.application.integration.dependencies import (
     get_llm_provider,
     get_vector_db,
 )
+from src.application.caching.embedding_cache import embedding_key
+from src.application.integration.cached_llm import CachedEmbeddingLLM
+from src.application.integration.embedding_batcher import EmbeddingBatcher
+from src.infrastructure_cache.memory_answer_cache import MemoryAnswerCache
+from src.infrastructure_cache.tiered_embedding_cache import TieredEmbeddingCache
 from src.infrastructure_integration.cohere_llm import CohereLLM
 from src.infrastructure_integration.openai_llm import OpenAILLM
 from src.infrastructure_vectordb.qdrant_vector_db import QdrantVectorDB
 from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
 from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
 from src.application.services.query_service import QueryService
+from src.application.dtos.query_dtos import QueryRequestDto
 from src.domain.entities.asset import Asset
 from src.domain.enums.asset_type import AssetType
+from src.main import create_app
 
 
 def test_get_llm_provider():
@@ -38,11 +49,234 @@ async def test_query_service_with_memory_db_and_llm():
     
     # Skip the embedding test if openai is not available
     try:
-        vector_db.add(domain_id, asset.id, llm.embed(asset.content))
-        service = QueryService(llm=llm, vector_db=vector_db)
+        await vector_db.add(domain_id, asset.id, llm.embed(asset.content))
+        service = QueryService(llm=llm, vector_db=vector_db, lexical_index=None, repo=repo, answer_cache=None, embedder=None, prompt_builder=None)
         answer, assets = service.query(domain_id, "hello")
         assert answer.startswith("OpenAI response")
         assert len(list(assets)) == 1
     except RuntimeError:
         # OpenAI not installed, skip this test
         pass
+
+
+@pytest.mark.asyncio
+async def test_query_service_returns_ranked_assets_with_scores():
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    vector_db = MemoryVectorDB(repo)
+    short = Asset(name="short", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="hi")
+    await repo.add(short)
+    await vector_db.add(domain_id, short.id, [1.0])
+    long = Asset(name="long", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="hello")
+    await repo.add(long)
+    await vector_db.add(domain_id, long.id, [-1.0])
+
+    service = QueryService(llm=CohereLLM(), vector_db=vector_db, lexical_index=None, repo=repo, answer_cache=None, embedder=None, prompt_builder=None)
+    answer, hits = await service.query(QueryRequestDto(domain_id=domain_id, text="hello"))
+    assert answer == "Cohere response to: hello"
+    assert [a.id for a, _ in hits] == [short.id, long.id]
+    assert hits[0][1] == pytest.approx(1.0)
+
+
+def test_cached_embedding_llm_reuses_vectors_across_restarts(tmp_path):
+    class CountingLLM(CohereLLM):
+        calls = 0
+
+        def embed(self, text: str) -> list[float]:
+            CountingLLM.calls += 1
+            return [float(len(text)), 0.5]
+
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = TieredEmbeddingCache(max_entries=1, path=path)
+    llm = CachedEmbeddingLLM(CountingLLM(), cache)
+    assert llm.embedding_model == "CountingLLM"
+    assert llm.embed("leave policy") == [12.0, 0.5]
+    assert llm.embed("leave  policy ") == [12.0, 0.5]
+    llm.embed("visa")
+    # "leave policy" was pushed out of the LRU but is still on disk
+    assert llm.embed("leave policy") == [12.0, 0.5]
+    assert CountingLLM.calls == 2
+    assert cache.stats()["memory_hits"] == 1 and cache.stats()["disk_hits"] == 1
+    assert cache.stats()["saved_calls"] == 2
+    cache.close()
+
+    reopened = CachedEmbeddingLLM(CountingLLM(), TieredEmbeddingCache(path=path))
+    assert reopened.embed("visa") == [4.0, 0.5]
+    assert CountingLLM.calls == 2
+    assert embedding_key("other-model", "visa") != embedding_key("CountingLLM", "visa")
+    assert reopened.complete("hi") == "Cohere response to: hi"
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_coalesces_concurrent_calls():
+    class BatchCountingLLM(CohereLLM):
+        batches = []
+
+        def embed_many(self, texts: list[str]) -> list[list[float]]:
+            BatchCountingLLM.batches.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(BatchCountingLLM(), max_batch_size=3, max_delay_ms=20)
+    results = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "a", "cccc", "ddddd"]))
+    assert results == [[1.0], [2.0], [1.0], [4.0], [5.0]]
+    # The first batch filled up at 3 texts (one duplicate), the rest went out after the delay
+    assert BatchCountingLLM.batches == [["a", "bb"], ["cccc", "ddddd"]]
+    assert await batcher.embed_many(["x", "yy"]) == [[1.0], [2.0]]
+    assert (batcher.batches, batcher.texts) == (3, 7)
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_fails_every_caller_of_a_failed_batch():
+    class FailingLLM(CohereLLM):
+        def embed_many(self, texts: list[str]) -> list[list[float]]:
+            raise RuntimeError("upstream down")
+
+    batcher = EmbeddingBatcher(FailingLLM(), max_delay_ms=1)
+    results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cached_embed_many_only_sends_misses_upstream():
+    class BatchCountingLLM(CohereLLM):
+        sent = []
+
+        def embed_many(self, texts: list[str]) -> list[list[float]]:
+            BatchCountingLLM.sent.append(list(texts))
+            return super().embed_many(texts)
+
+    llm = CachedEmbeddingLLM(BatchCountingLLM(), TieredEmbeddingCache())
+    llm.embed("known")
+    assert llm.embed_many(["known", "new", "newer"]) == [[5.0], [3.0], [5.0]]
+    assert BatchCountingLLM.sent == [["new", "newer"]]
+
+
+@pytest.mark.asyncio
+async def test_cached_aembed_many_keeps_disk_tier_off_the_event_loop(tmp_path):
+    class RecordingCache(TieredEmbeddingCache):
+        calls = []
+
+        def load_many(self, keys):
+            RecordingCache.calls.append(("load", len(keys), threading.get_ident()))
+            return super().load_many(keys)
+
+        def store_many(self, entries):
+            RecordingCache.calls.append(("store", len(entries), threading.get_ident()))
+            super().store_many(entries)
+
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = RecordingCache(path=path)
+    llm = CachedEmbeddingLLM(CohereLLM(), cache)
+    assert await llm.aembed_many(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert await llm.aembed_many(["bb", "a"]) == [[2.0], [1.0]]
+    loop_thread = threading.get_ident()
+    assert [(step, count) for step, count, _ in RecordingCache.calls] == [("load", 3), ("store", 3)]
+    assert all(thread != loop_thread for _, _, thread in RecordingCache.calls)
+    assert cache.stats()["memory_hits"] == 2 and cache.stats()["misses"] == 3
+    cache.close()
+
+    reopened = TieredEmbeddingCache(path=path)
+    keys = [embedding_key("CohereLLM", text) for text in ["ccc", "a", "missing"]]
+    assert reopened.load_many(keys) == [[3.0], [1.0], None]
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_openai_llm_async_calls_share_one_pooled_client(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        body = json.loads(request.content)
+        if request.url.path.endswith("/embeddings"):
+            data = [{"index": i, "embedding": [float(len(text))]} for i, text in enumerate(body["input"])]
+            return httpx.Response(200, json={"data": list(reversed(data))})
+        return httpx.Response(200, json={"choices": [{"message": {"content": " hi there "}}]})
+
+    llm = OpenAILLM(api_key="test-key", model="m", embed_model="e")
+    llm._async_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url=llm.base_url, headers={"Authorization": "Bearer test-key"}
+    )
+    assert await llm.acomplete("hello") == "hi there"
+    assert await llm.aembed_many(["a", "bbb"]) == [[1.0], [3.0]]
+    assert await llm.aembed("cc") == [2.0]
+    assert [r.url.path for r in requests] == ["/v1/chat/completions", "/v1/embeddings", "/v1/embeddings"]
+    assert requests[0].headers["authorization"] == "Bearer test-key"
+
+    llm._async_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(500)), base_url=llm.base_url
+    )
+    with pytest.raises(RuntimeError, match="OpenAI embedding error"):
+        await llm.aembed("x")
+    await llm.aclose()
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_BASE", raising=False)
+    with pytest.raises(RuntimeError, match="OPENAI_API_KEY"):
+        OpenAILLM().complete("hi")
+
+
+@pytest.mark.asyncio
+async def test_query_stream_yields_sources_then_tokens_and_caches_full_answers():
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    vector_db = MemoryVectorDB(repo)
+    asset = Asset(name="doc", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="hello")
+    await repo.add(asset)
+    await vector_db.add(domain_id, asset.id, [1.0])
+    cache = MemoryAnswerCache()
+    service = QueryService(
+        llm=CohereLLM(), vector_db=vector_db, lexical_index=None, repo=repo, answer_cache=cache, embedder=None, prompt_builder=None
+    )
+    dto = QueryRequestDto(domain_id=domain_id, text="hello there")
+
+    # An abandoned stream is not cached
+    partial = service.stream(dto)
+    assert (await anext(partial))[0] == "sources"
+    assert await anext(partial) == ("token", "Cohere ")
+    await partial.aclose()
+    assert len(cache) == 0
+
+    events = [event async for event in service.stream(dto)]
+    assert events[0][0] == "sources" and [a.id for a, _ in events[0][1]] == [asset.id]
+    assert "".join(text for name, text in events[1:]) == "Cohere response to: hello there"
+    cached = [event async for event in service.stream(dto)]
+    assert cached[1:] == [("token", "Cohere response to: hello there")]
+
+
+def test_query_stream_endpoint_emits_server_sent_events():
+    repo = MemoryAssetRepository()
+    app = create_app()
+    app.dependency_overrides[QueryService] = lambda: QueryService(
+        llm=CohereLLM(), vector_db=MemoryVectorDB(repo), lexical_index=None, repo=repo,
+        answer_cache=None, embedder=None, prompt_builder=None,
+    )
+    client = TestClient(app)
+    response = client.get("/api/v1/queries/stream", params={"domain_id": str(uuid4()), "text": "hi"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: sources"] + ["event: token"] * 4 + ["event: done"]
+    assert json.loads(events[0][1][len("data: "):]) == {"assets": []}
+    assert json.loads(events[-2][1][len("data: "):]) == {"text": "hi"}
+
+    bad = client.get("/api/v1/queries/stream", params={"domain_id": str(uuid4()), "text": "hi", "mode": "fuzzy"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_openai_llm_streams_completion_deltas():
+    httpx = pytest.importorskip("httpx")
+    chunks = [{"choices": [{"delta": {"role": "assistant"}}]}] + [
+        {"choices": [{"delta": {"content": piece}}]} for piece in ["Hel", "lo", "!"]
+    ]
+    body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    llm = OpenAILLM(api_key="test-key")
+    llm._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=llm.base_url)
+    assert [piece async for piece in llm.astream("hi")] == ["Hel", "lo", "!"]
+    await llm.aclose()
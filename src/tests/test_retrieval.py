@@ -0,0 +1,456 @@
+import os
+from uuid import uuid4
+import pytest
+from fastapi import HTTPException
+import numpy as np
+from src.application.retrieval.fusion import reciprocal_rank_fusion
+from src.application.retrieval.mmr import mmr_select
+from src.common.text import TokenStreamCache, light_stem, normalize_text, tokenize
+from src.common.tokens import TokenCounter
+from src.application.caching.answer_cache import CachedAnswer
+from src.application.prompting.prompt_builder import PromptBuilder
+from src.application.services.asset_service import AssetService
+from src.application.services.query_service import QueryService
+from src.application.dtos.asset_dtos import CreateAssetRequestDto, UpdateAssetRequestDto
+from src.application.dtos.query_dtos import QueryRequestDto
+from src.domain.entities.asset import Asset
+from src.domain.enums.asset_type import AssetType
+from src.infrastructure_cache.memory_answer_cache import MemoryAnswerCache
+from src.infrastructure_integration.cohere_llm import CohereLLM
+from src.infrastructure_lexical.memory_bm25_index import MemoryBM25Index
+from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
+from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+
+
+def test_bm25_ranks_rare_terms_and_supports_upsert_and_remove():
+    index = MemoryBM25Index()
+    domain_id = uuid4()
+    a, b, c = uuid4(), uuid4(), uuid4()
+    index.add(domain_id, a, "visa application requirements")
+    index.add(domain_id, b, "application deadline")
+    index.add(domain_id, c, "office hours")
+
+    hits = index.search(domain_id, "visa application")
+    assert [asset_id for asset_id, _ in hits] == [a, b]
+    assert index.search(uuid4(), "visa") == []
+
+    # Re-adding replaces the previous text
+    index.add(domain_id, a, "office parking")
+    assert [asset_id for asset_id, _ in index.search(domain_id, "visa")] == []
+    index.remove(domain_id, c)
+    assert [asset_id for asset_id, _ in index.search(domain_id, "office")] == [a]
+
+
+def test_normalize_text_folds_arabic_variants():
+    assert normalize_text("أَحْمَد") == normalize_text("احمد") == "احمد"
+    assert normalize_text("مدرسة") == normalize_text("مدرسه")
+    assert normalize_text("مستشفى") == normalize_text("مستشفي")
+    assert normalize_text("كتـــاب") == "كتاب"
+    assert normalize_text("٢٠٢٤، Visa!") == "2024  visa "
+
+
+def test_tokenize_applies_light_stemming():
+    assert light_stem("والكتاب") == "كتاب"
+    assert light_stem("المعلمون") == "معلم"
+    assert light_stem("visa") == "visa"
+    # Different surface forms of the same word share a token
+    assert tokenize("بالمدرسة") == tokenize("المدرسه") == tokenize("مدرسة")
+    assert tokenize("Passport, renewal") == ["passport", "renewal"]
+
+
+def test_token_stream_cache_reuses_unchanged_content():
+    cache = TokenStreamCache(max_entries=2)
+    asset_id = uuid4()
+    first = cache.get(asset_id, "طلب التأشيرة")
+    assert cache.get(asset_id, "طلب التأشيرة") is first
+    changed = cache.get(asset_id, "تجديد جواز السفر")
+    assert changed[0] != first[0] and changed[1] == tokenize("تجديد جواز السفر")
+    cache.get(uuid4(), "a")
+    cache.get(uuid4(), "b")
+    assert len(cache) == 2
+
+
+def test_bm25_matches_arabic_spelling_variants():
+    index = MemoryBM25Index()
+    domain_id = uuid4()
+    asset_id = uuid4()
+    index.add(domain_id, asset_id, "شروط الحصول على تأشيرة العمل")
+    assert [a for a, _ in index.search(domain_id, "تاشيره")] == [asset_id]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]], k=60)
+    assert fused[0][0] == "y"
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert {item for item, _ in fused} == {"x", "y", "z", "w"}
+
+
+@pytest.mark.asyncio
+async def test_fresh_lexical_index_loads_domains_from_repository():
+    from src.application.services.index_rebuild_service import IndexRebuildService
+
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    visa = Asset(name="visa", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="visa renewal fees")
+    hours = Asset(name="hours", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="office hours")
+    for asset in (visa, hours):
+        await repo.add(asset)
+
+    # A restarted worker: nothing was indexed through this process
+    now = [0.0]
+    lexical = MemoryBM25Index(reload_seconds=60, clock=lambda: now[0])
+    service = QueryService(llm=CohereLLM(), vector_db=MemoryVectorDB(repo), lexical_index=lexical, repo=repo)
+    hits = await service.retrieve(QueryRequestDto(domain_id=domain_id, text="visa", mode="lexical"))
+    assert [asset.id for asset, _ in hits] == [visa.id]
+
+    # Writes from another worker show up once the domain is reloaded
+    await repo.soft_delete(visa.id)
+    permit = Asset(name="permit", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="visa permit")
+    await repo.add(permit)
+    assert not lexical.is_stale(domain_id)
+    now[0] = 61.0
+    hits = await service.retrieve(QueryRequestDto(domain_id=domain_id, text="visa", mode="lexical"))
+    assert [asset.id for asset, _ in hits] == [permit.id]
+
+    rebuilt = MemoryBM25Index()
+    rebuild = IndexRebuildService(repo=repo, vector_db=MemoryVectorDB(repo), lexical_index=rebuilt)
+    assert await rebuild.rebuild_lexical() == 2
+    assert not rebuilt.is_stale(domain_id)
+    assert [asset_id for asset_id, _ in rebuilt.search(domain_id, "office")] == [hours.id]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_query_fuses_lexical_and_vector_hits():
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    lexical = MemoryBM25Index()
+    domain_id = uuid4()
+    # CohereLLM embeds text as [len(text)], so every asset matches the vector side
+    keyword = Asset(name="keyword", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="passport renewal")
+    other = Asset(name="other", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="unrelated")
+    unembedded = Asset(name="unembedded", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="passport photo")
+    for asset in (keyword, other, unembedded):
+        await repo.add(asset)
+        lexical.add(domain_id, asset.id, asset.content)
+    await vector_db.add(domain_id, other.id, [1.0])
+    await vector_db.add(domain_id, keyword.id, [1.0])
+
+    service = QueryService(llm=CohereLLM(), vector_db=vector_db, lexical_index=lexical, repo=repo)
+    hits = await service.retrieve(QueryRequestDto(domain_id=domain_id, text="passport renewal"))
+    names = [asset.name for asset, _ in hits]
+    assert names[0] == "keyword"
+    assert set(names) == {"keyword", "other", "unembedded"}
+
+    lexical_only = await service.retrieve(
+        QueryRequestDto(domain_id=domain_id, text="passport", mode="lexical", top_k=1)
+    )
+    assert len(lexical_only) == 1 and lexical_only[0][0].name in {"keyword", "unembedded"}
+
+
+@pytest.mark.asyncio
+async def test_query_filters_by_category_and_type_in_every_mode():
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    lexical = MemoryBM25Index()
+    domain_id, category_id = uuid4(), uuid4()
+    inside = Asset(
+        name="inside", domain_id=domain_id, asset_type=AssetType.LINK, content="visa fees", category_id=category_id
+    )
+    outside = Asset(name="outside", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="visa fees")
+    for asset in (inside, outside):
+        await repo.add(asset)
+        lexical.add(domain_id, asset.id, asset.content)
+        await vector_db.add(domain_id, asset.id, [1.0], asset.category_id, asset.asset_type)
+
+    service = QueryService(llm=CohereLLM(), vector_db=vector_db, lexical_index=lexical, repo=repo)
+    for mode in ("hybrid", "vector", "lexical"):
+        by_category = await service.retrieve(
+            QueryRequestDto(domain_id=domain_id, text="visa", mode=mode, category_id=category_id)
+        )
+        assert [asset.name for asset, _ in by_category] == ["inside"]
+        by_type = await service.retrieve(
+            QueryRequestDto(domain_id=domain_id, text="visa", mode=mode, asset_type=AssetType.DOCUMENT)
+        )
+        assert [asset.name for asset, _ in by_type] == ["outside"]
+
+
+def test_mmr_select_skips_near_duplicates():
+    vectors = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0], [0.0, 0.0]])
+    relevance = np.array([0.9, 0.89, 0.5, 0.1])
+    assert mmr_select(relevance, vectors, k=2, lambda_=0.5) == [0, 2]
+    assert mmr_select(relevance, vectors, k=3, lambda_=1.0) == [0, 1, 2]
+    # A candidate without an embedding is never redundant
+    assert mmr_select(relevance, vectors, k=3, lambda_=0.3) == [0, 2, 3]
+    assert mmr_select(relevance, vectors, k=10)[:1] == [0] and len(mmr_select(relevance, vectors, k=10)) == 4
+
+
+@pytest.mark.asyncio
+async def test_query_mmr_diversifies_near_duplicate_assets():
+    class DirectionLLM(CohereLLM):
+        def embed(self, text: str) -> list[float]:
+            return [1.0, 0.0] if "visa" in text else [0.6, 0.8]
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    llm = DirectionLLM()
+    domain_id = uuid4()
+    assets = [
+        Asset(name=f"visa-v{i}", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="visa policy")
+        for i in range(3)
+    ] + [Asset(name="fees", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="fee schedule")]
+    for asset in assets:
+        await repo.add(asset)
+        embedding = llm.embed(asset.content)
+        await repo.save_embedding(asset.id, embedding, llm.embedding_model)
+        await vector_db.add(domain_id, asset.id, embedding)
+
+    service = QueryService(llm=llm, vector_db=vector_db, repo=repo)
+    plain = await service.retrieve(QueryRequestDto(domain_id=domain_id, text="visa", mode="vector", top_k=2))
+    assert all(asset.name.startswith("visa") for asset, _ in plain)
+    diverse = await service.retrieve(
+        QueryRequestDto(domain_id=domain_id, text="visa", mode="vector", top_k=2, mmr_lambda=0.3)
+    )
+    assert diverse[0][0].name.startswith("visa") and diverse[1][0].name == "fees"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.retrieve(QueryRequestDto(domain_id=domain_id, text="visa", mmr_lambda=1.5))
+    assert exc_info.value.status_code == 400
+
+
+def test_memory_answer_cache_expires_and_invalidates_per_domain():
+    now = [0.0]
+    cache = MemoryAnswerCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    domain_id, other_domain = uuid4(), uuid4()
+    cache.put(domain_id, "q", CachedAnswer("a", []))
+    cache.put(other_domain, "q", CachedAnswer("b", []))
+    assert cache.get(domain_id, "q").answer == "a"
+
+    cache.invalidate(domain_id)
+    assert cache.get(domain_id, "q") is None
+    assert cache.get(other_domain, "q").answer == "b"
+
+    now[0] = 11.0
+    assert cache.get(other_domain, "q") is None
+    cache.put(domain_id, "x", CachedAnswer("x", []))
+    cache.put(domain_id, "y", CachedAnswer("y", []))
+    cache.put(domain_id, "z", CachedAnswer("z", []))
+    assert len(cache) == 2 and cache.get(domain_id, "x") is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 3
+
+
+def test_answer_caches_sharing_a_version_dir_see_each_others_invalidations(tmp_path):
+    workers = [MemoryAnswerCache(semantic_threshold=0.9, version_dir=str(tmp_path)) for _ in range(2)]
+    domain_id, other_domain = uuid4(), uuid4()
+    for cache in workers:
+        cache.put(domain_id, "q", CachedAnswer("a", []))
+        cache.put_similar(domain_id, "scope", [1.0, 0.0], CachedAnswer("a", []))
+        cache.put(other_domain, "q", CachedAnswer("b", []))
+    version = workers[1].version(domain_id)
+
+    workers[0].invalidate(domain_id)
+    assert workers[1].get(domain_id, "q") is None
+    assert workers[1].get_similar(domain_id, "scope", [1.0, 0.0]) is None
+    assert workers[1].get(other_domain, "q").answer == "b"
+    # An answer generated across the other worker's invalidation is not stored
+    workers[1].put(domain_id, "q", CachedAnswer("stale", []), version=version)
+    assert workers[1].get(domain_id, "q") is None
+    assert os.listdir(tmp_path) == [str(domain_id)]
+
+
+@pytest.mark.asyncio
+async def test_query_answers_repeats_from_cache_until_domain_changes():
+    class CountingLLM(CohereLLM):
+        completions = 0
+
+        def complete(self, prompt: str) -> str:
+            CountingLLM.completions += 1
+            return f"answer {CountingLLM.completions}"
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    llm = CountingLLM()
+    cache = MemoryAnswerCache()
+    assets = AssetService(repo, llm=llm, vector_db=vector_db, answer_cache=cache)
+    domain_id = uuid4()
+    asset = await assets.create_asset(
+        CreateAssetRequestDto(name="leave", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="leave policy")
+    )
+    service = QueryService(llm=llm, vector_db=vector_db, repo=repo, answer_cache=cache)
+
+    first = await service.query(QueryRequestDto(domain_id=domain_id, text="What is the leave policy?"))
+    again = await service.query(QueryRequestDto(domain_id=domain_id, text="  what is the LEAVE policy "))
+    assert again[0] == first[0] == "answer 1"
+    assert [a.id for a, _ in again[1]] == [asset.id]
+    other_options = await service.query(QueryRequestDto(domain_id=domain_id, text="what is the leave policy", top_k=1))
+    assert other_options[0] == "answer 2"
+
+    await assets.update_asset(asset.id, UpdateAssetRequestDto(name="leave 2024"))
+    refreshed = await service.query(QueryRequestDto(domain_id=domain_id, text="What is the leave policy?"))
+    assert refreshed[0] == "answer 3"
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_query_reuses_answers_for_paraphrases_within_scope():
+    class ParaphraseLLM(CohereLLM):
+        completions = 0
+
+        def embed(self, text: str) -> list[float]:
+            return [1.0, 0.02 * len(text) / 100] if "leave" in text else [0.0, 1.0]
+
+        def complete(self, prompt: str) -> str:
+            ParaphraseLLM.completions += 1
+            return f"answer {ParaphraseLLM.completions}"
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    llm = ParaphraseLLM()
+    cache = MemoryAnswerCache(semantic_threshold=0.98)
+    assets = AssetService(repo, llm=llm, vector_db=vector_db, answer_cache=cache)
+    domain_id = uuid4()
+    asset = await assets.create_asset(
+        CreateAssetRequestDto(name="leave", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="leave policy")
+    )
+    service = QueryService(llm=llm, vector_db=vector_db, repo=repo, answer_cache=cache)
+
+    first = await service.query(QueryRequestDto(domain_id=domain_id, text="what is the leave policy"))
+    paraphrase = await service.query(QueryRequestDto(domain_id=domain_id, text="how much leave do I get"))
+    assert paraphrase[0] == first[0] == "answer 1"
+    assert [a.id for a, _ in paraphrase[1]] == [asset.id]
+    assert (await service.query(QueryRequestDto(domain_id=domain_id, text="visa fees")))[0] == "answer 2"
+    # Different retrieval options never share answers
+    assert (await service.query(QueryRequestDto(domain_id=domain_id, text="leave rules", top_k=1)))[0] == "answer 3"
+    assert cache.stats()["semantic_hits"] == 1
+
+    await assets.delete_asset(asset.id)
+    assert (await service.query(QueryRequestDto(domain_id=domain_id, text="leave entitlement")))[0] == "answer 4"
+    assert cache.stats()["semantic_size"] == 1
+
+
+def test_prompt_builder_packs_ranked_passages_within_budget():
+    counter = TokenCounter()
+    assert counter.count("visa fees") == 2 and counter.count("visa fees") == 2
+    domain_id = uuid4()
+    policy = Asset(
+        name="policy", domain_id=domain_id, asset_type=AssetType.DOCUMENT,
+        content="Office hours are nine to five.\n\nVisa fees are paid at the embassy counter in cash.",
+    )
+    copy = Asset(
+        name="policy-copy", domain_id=domain_id, asset_type=AssetType.DOCUMENT,
+        content="Visa fees are paid at the embassy counter in cash!",
+    )
+    filler = Asset(name="filler", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="word " * 400)
+    hits = [(policy, 0.9), (copy, 0.8), (filler, 0.7)]
+
+    builder = PromptBuilder(token_budget=120, passage_tokens=50, counter=counter)
+    prompt = builder.build("How are visa fees paid?", hits)
+    assert prompt.text.endswith("Question: How are visa fees paid?\nAnswer:")
+    assert prompt.prompt_tokens == counter.count(prompt.text) <= 120
+    # The passage matching the question leads, the duplicate asset is dropped, the filler does not fit
+    assert prompt.text.index("Visa fees") < prompt.text.index("Office hours")
+    assert prompt.skipped_duplicates == 1 and prompt.sources == [policy.id]
+    assert prompt.truncated and builder.stats()["prompts"] == 1
+    assert all(counter.count(passage) <= 50 for passage in builder.split(filler.content))
+
+
+def test_prompt_stats_are_served_on_the_admin_api():
+    from fastapi.testclient import TestClient
+    from src.application.integration.dependencies import get_prompt_builder
+    from src.main import create_app
+
+    counter = TokenCounter()
+    if not counter.exact:
+        # The estimate charges a token per character outside ASCII
+        assert counter.count("رسوم التأشيرة") == 12 and counter.count("visa fees") == 2
+    builder = PromptBuilder(token_budget=500, counter=counter)
+    asset = Asset(name="fees", domain_id=uuid4(), asset_type=AssetType.DOCUMENT, content="Visa fees are paid in cash.")
+    builder.build("How are visa fees paid?", [(asset, 1.0)])
+    app = create_app()
+    app.dependency_overrides[get_prompt_builder] = lambda: builder
+    with TestClient(app) as client:
+        stats = client.get("/admin/v1/cache/prompts/stats").json()
+    assert stats["prompts"] == 1 and stats["prompt_tokens_max"] > 0 and stats["token_budget"] == 500
+    assert stats["exact_token_counts"] == counter.exact
+
+
+@pytest.mark.asyncio
+async def test_query_completes_with_retrieved_context():
+    class EchoLLM(CohereLLM):
+        def complete(self, prompt: str) -> str:
+            return prompt
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    llm = EchoLLM()
+    domain_id = uuid4()
+    asset = Asset(name="fees", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="Fees are paid in cash.")
+    await repo.add(asset)
+    await vector_db.add(domain_id, asset.id, llm.embed(asset.content))
+
+    service = QueryService(llm=llm, vector_db=vector_db, repo=repo, prompt_builder=PromptBuilder())
+    answer, hits = await service.query(QueryRequestDto(domain_id=domain_id, text="fees", mode="vector"))
+    assert [a.id for a, _ in hits] == [asset.id]
+    assert "[1] fees\nFees are paid in cash." in answer and answer.endswith("Question: fees\nAnswer:")
+
+
+@pytest.mark.asyncio
+async def test_answer_generated_across_invalidation_is_not_cached():
+    import asyncio
+
+    class SlowLLM(CohereLLM):
+        completions = 0
+
+        async def acomplete(self, prompt: str) -> str:
+            SlowLLM.completions += 1
+            answer = f"answer v{SlowLLM.completions}"
+            await asyncio.sleep(0.05)
+            return answer
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    llm = SlowLLM()
+    cache = MemoryAnswerCache()
+    domain_id = uuid4()
+    service = QueryService(llm=llm, vector_db=vector_db, repo=repo, answer_cache=cache)
+    dto = QueryRequestDto(domain_id=domain_id, text="leave policy")
+
+    # An asset changes while the first answer is being generated
+    pending = asyncio.create_task(service.query(dto))
+    await asyncio.sleep(0.01)
+    cache.invalidate(domain_id)
+    assert (await pending)[0] == "answer v1"
+
+    assert (await service.query(dto))[0] == "answer v2"
+    assert (await service.query(dto))[0] == "answer v2"
+
+
+@pytest.mark.asyncio
+async def test_semantic_answer_generated_across_invalidation_is_not_cached():
+    import asyncio
+
+    class SlowLLM(CohereLLM):
+        completions = 0
+
+        def embed(self, text: str) -> list[float]:
+            return [1.0, 0.0]
+
+        async def acomplete(self, prompt: str) -> str:
+            SlowLLM.completions += 1
+            answer = f"answer v{SlowLLM.completions}"
+            await asyncio.sleep(0.05)
+            return answer
+
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    cache = MemoryAnswerCache(semantic_threshold=0.9)
+    domain_id = uuid4()
+    service = QueryService(llm=SlowLLM(), vector_db=vector_db, repo=repo, answer_cache=cache)
+
+    pending = asyncio.create_task(service.query(QueryRequestDto(domain_id=domain_id, text="leave policy")))
+    await asyncio.sleep(0.01)
+    cache.invalidate(domain_id)
+    assert (await pending)[0] == "answer v1"
+    assert cache.stats()["semantic_size"] == 0
+
+    paraphrase = await service.query(QueryRequestDto(domain_id=domain_id, text="how much leave"))
+    assert paraphrase[0] == "answer v2"
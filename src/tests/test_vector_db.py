@@ -0,0 +1,527 @@
+import os
+import numpy as np
+import pytest
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
+from src.domain.entities.asset import Asset
+from src.domain.enums.asset_type import AssetType
+from src.infrastructure_persistence.memory_asset_repo import MemoryAssetRepository
+from src.infrastructure_vectordb.flat_index import FlatIndex
+from src.infrastructure_vectordb.hnsw_index import HNSWIndex
+from src.infrastructure_vectordb.hnsw_vector_db import HNSWVectorDB
+from src.infrastructure_vectordb.memory_vector_db import MemoryVectorDB
+from src.infrastructure_vectordb.qdrant_vector_db import QdrantVectorDB
+from src.infrastructure_vectordb.quantized_index import QuantizedIndex
+from src.infrastructure_vectordb.segmented_index import SegmentedIndex
+from src.infrastructure_vectordb.sharded_index import ShardedIndex
+
+
+def test_flat_index_ranks_by_cosine_similarity():
+    index = FlatIndex(dim=3, capacity=1)
+    ids = [uuid4() for _ in range(4)]
+    index.add(ids[0], [1.0, 0.0, 0.0])
+    index.add(ids[1], [0.0, 10.0, 0.0])
+    index.add(ids[2], [0.7, 0.7, 0.0])
+    index.add(ids[3], [0.0, 0.0, 1.0])
+
+    results = index.search([0.0, 1.0, 0.0], top_k=2)
+    assert [asset_id for asset_id, _ in results] == [ids[1], ids[2]]
+    assert results[0][1] == pytest.approx(1.0)
+    assert len(index) == 4
+
+
+def test_flat_index_rejects_wrong_dimension():
+    index = FlatIndex(dim=3)
+    with pytest.raises(ValueError):
+        index.add(uuid4(), [1.0, 2.0])
+
+
+@pytest.mark.asyncio
+async def test_memory_vector_db_search_returns_top_assets():
+    repo = MemoryAssetRepository()
+    vector_db = MemoryVectorDB(repo)
+    domain_id = uuid4()
+    near = Asset(name="near", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="a")
+    far = Asset(name="far", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="b")
+    for asset, embedding in ((near, [1.0, 0.1]), (far, [-1.0, 0.0])):
+        await repo.add(asset)
+        await vector_db.add(domain_id, asset.id, embedding)
+
+    results = await vector_db.search(domain_id, [1.0, 0.0], top_k=2)
+    assert [a.id for a, _ in results] == [near.id, far.id]
+    assert results[0][1] > results[1][1]
+    assert await vector_db.search(uuid4(), [1.0, 0.0]) == []
+
+
+def test_hnsw_index_matches_exact_search_on_small_domain():
+    rng = np.random.default_rng(7)
+    data = rng.standard_normal((300, 16))
+    ids = [uuid4() for _ in range(len(data))]
+    flat = FlatIndex(dim=16)
+    hnsw = HNSWIndex(dim=16, m=8, ef_construction=64, ef_search=64, seed=1)
+    for asset_id, row in zip(ids, data):
+        flat.add(asset_id, row)
+        hnsw.add(asset_id, row)
+
+    query = rng.standard_normal(16)
+    exact = [a for a, _ in flat.search(query, top_k=5)]
+    approx = [a for a, _ in hnsw.search(query, top_k=5)]
+    assert len(set(exact) & set(approx)) >= 4
+    assert approx[0] == exact[0]
+
+
+@pytest.mark.asyncio
+async def test_hnsw_vector_db_search_returns_top_assets():
+    repo = MemoryAssetRepository()
+    vector_db = HNSWVectorDB(repo, m=4, ef_construction=16, ef_search=16)
+    domain_id = uuid4()
+    near = Asset(name="near", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="a")
+    far = Asset(name="far", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="b")
+    for asset, embedding in ((near, [1.0, 0.1]), (far, [-1.0, 0.0])):
+        await repo.add(asset)
+        await vector_db.add(domain_id, asset.id, embedding)
+
+    results = await vector_db.search(domain_id, [1.0, 0.0], top_k=1)
+    assert [a.id for a, _ in results] == [near.id]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_index_rescores_with_exact_vectors(tmp_path, mode):
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal((500, 64))
+    ids = [uuid4() for _ in range(len(data))]
+    flat = FlatIndex(dim=64)
+    index = QuantizedIndex(dim=64, path=str(tmp_path / "vectors.f32"), mode=mode, oversample=20, capacity=8)
+    for asset_id, row in zip(ids, data):
+        flat.add(asset_id, row)
+        index.add(asset_id, row)
+
+    query = data[42] + 0.1 * rng.standard_normal(64)
+    exact = flat.search(query, top_k=3)
+    results = index.search(query, top_k=3)
+    assert results[0][0] == ids[42]
+    assert results[0][1] == pytest.approx(exact[0][1], rel=1e-5)
+    assert index.nbytes < flat.nbytes / 3
+    index.close()
+
+
+def test_memory_vector_db_rejects_unknown_quantization():
+    with pytest.raises(ValueError):
+        MemoryVectorDB(MemoryAssetRepository(), quantization="int4")
+
+
+@pytest.mark.asyncio
+async def test_quantized_workers_sharing_storage_keep_private_rescoring_files(tmp_path):
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    first, second = uuid4(), uuid4()
+    workers = [
+        MemoryVectorDB(repo, quantization="int8", storage_dir=str(tmp_path)),
+        MemoryVectorDB(repo, quantization="int8", storage_dir=str(tmp_path)),
+    ]
+    await workers[0].add(domain_id, first, [1.0, 0.0])
+    await workers[1].add(domain_id, second, [0.0, 1.0])
+    await workers[0].add(domain_id, uuid4(), [0.6, 0.8])
+
+    assert len(list(tmp_path.glob("*.f32"))) == 2
+    assert (await workers[0].search_many(domain_id, [[1.0, 0.0]], top_k=1))[0] == [(first, pytest.approx(1.0))]
+    assert (await workers[1].search_many(domain_id, [[0.0, 1.0]], top_k=1))[0] == [(second, pytest.approx(1.0))]
+    for worker in workers:
+        await worker.close()
+    assert list(tmp_path.iterdir()) == []
+
+    scratch = MemoryVectorDB(repo, quantization="binary")
+    await scratch.add(domain_id, first, [1.0, 0.0])
+    temp_dir = scratch.storage_dir
+    await scratch.close()
+    assert not os.path.exists(temp_dir)
+
+
+@pytest.mark.asyncio
+async def test_search_many_matches_single_searches(tmp_path):
+    rng = np.random.default_rng(11)
+    data = rng.standard_normal((200, 8))
+    queries = rng.standard_normal((5, 8)).tolist()
+    domain_id = uuid4()
+    backends = [
+        MemoryVectorDB(MemoryAssetRepository()),
+        MemoryVectorDB(MemoryAssetRepository(), quantization="int8", storage_dir=str(tmp_path), oversample=50),
+        MemoryVectorDB(MemoryAssetRepository(), shards=3, search_threads=2),
+    ]
+    flat = FlatIndex(dim=8)
+    for row in data:
+        asset_id = uuid4()
+        flat.add(asset_id, row)
+        for vector_db in backends:
+            await vector_db.add(domain_id, asset_id, row)
+
+    expected = [flat.search(q, top_k=3) for q in queries]
+    for vector_db in backends:
+        results = await vector_db.search_many(domain_id, queries, top_k=3)
+        assert [[a for a, _ in r] for r in results] == [[a for a, _ in e] for e in expected]
+        assert results[0][0][1] == pytest.approx(expected[0][0][1], rel=1e-5)
+    assert await backends[0].search_many(uuid4(), queries) == [[]] * 5
+
+
+def test_flat_index_delete_update_and_compact():
+    index = FlatIndex(dim=2, capacity=2)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    index.add(a, [1.0, 0.0])
+    index.add(b, [0.0, 1.0])
+    index.add(c, [1.0, 1.0])
+    assert index.delete(b)
+    assert not index.delete(b)
+    index.add(a, [0.0, 1.0])  # re-adding replaces the old row
+    assert len(index) == 2
+    assert [x for x, _ in index.search([0.0, 1.0], top_k=5)] == [a, c]
+    assert index.needs_compaction(0.2)
+
+    index.compact()
+    assert len(index.vectors) == 2
+    assert not index.needs_compaction(0.2)
+    assert [x for x, _ in index.search([0.0, 1.0], top_k=5)] == [a, c]
+    assert index.delete(c)
+    assert [r[0][0] for r in index.search_many([[1.0, 0.0]], top_k=1)] == [a]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_index_compaction_rewrites_exact_file(tmp_path, mode):
+    rng = np.random.default_rng(8)
+    data = rng.standard_normal((40, 16))
+    ids = [uuid4() for _ in range(len(data))]
+    path = tmp_path / "vectors.f32"
+    index = QuantizedIndex(dim=16, path=str(path), mode=mode, oversample=40)
+    for asset_id, row in zip(ids, data):
+        index.add(asset_id, row)
+    for asset_id in ids[:20]:
+        index.delete(asset_id)
+    assert ids[3] not in {a for a, _ in index.search(data[3], top_k=5)}
+
+    index.compact()
+    assert path.stat().st_size == 20 * 16 * 4
+    index.add(ids[3], data[3])
+    assert index.search(data[3], top_k=1)[0][0] == ids[3]
+    assert index.search(data[30], top_k=1)[0] == (ids[30], pytest.approx(1.0, abs=1e-5))
+    index.close()
+
+
+def test_hnsw_index_skips_tombstones_and_rebuilds():
+    rng = np.random.default_rng(9)
+    data = rng.standard_normal((200, 8))
+    ids = [uuid4() for _ in range(len(data))]
+    index = HNSWIndex(dim=8, m=8, ef_construction=64, seed=1)
+    for asset_id, row in zip(ids, data):
+        index.add(asset_id, row)
+    for asset_id in ids[:100]:
+        index.delete(asset_id)
+    hits = index.search(data[0], top_k=10)
+    assert len(hits) == 10 and not {a for a, _ in hits} & set(ids[:100])
+
+    assert index.needs_compaction(0.2)
+    index.compact()
+    assert len(index) == 100 and not index.needs_compaction(0.0)
+    assert index.search(data[150], top_k=1)[0][0] == ids[150]
+
+
+@pytest.mark.asyncio
+async def test_vector_db_update_and_delete(tmp_path):
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    first = Asset(name="first", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="a")
+    second = Asset(name="second", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="b")
+    await repo.add(first)
+    await repo.add(second)
+    backends = [
+        MemoryVectorDB(repo, compact_ratio=0.9),
+        MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True),
+        HNSWVectorDB(repo),
+    ]
+    for vector_db in backends:
+        await vector_db.add(domain_id, first.id, [1.0, 0.0])
+        await vector_db.add(domain_id, second.id, [0.0, 1.0])
+        await vector_db.update(domain_id, first.id, [0.0, 1.0])
+        results = await vector_db.search(domain_id, [0.0, 1.0])
+        assert sorted(a.name for a, _ in results) == ["first", "second"]
+        await vector_db.delete(domain_id, second.id)
+        await vector_db.delete(uuid4(), second.id)
+        results = await vector_db.search(domain_id, [0.0, 1.0])
+        assert [a.name for a, _ in results] == ["first"]
+
+
+def test_sharded_index_merges_partial_top_k():
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal((300, 16))
+    ids = [uuid4() for _ in range(len(data))]
+    flat = FlatIndex(dim=16)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # parallel_rows=0 forces the thread-pool path even for a small domain
+        sharded = ShardedIndex([FlatIndex(dim=16) for _ in range(4)], pool, parallel_rows=0)
+        for asset_id, row in zip(ids, data):
+            flat.add(asset_id, row)
+            sharded.add(asset_id, row)
+        assert len(sharded) == 300
+        assert all(len(shard) for shard in sharded.shards)
+        assert sharded.shard_for(ids[0]).search(data[0], top_k=1)[0][0] == ids[0]
+
+        for query in data[:5]:
+            assert [a for a, _ in sharded.search(query, top_k=7)] == [a for a, _ in flat.search(query, top_k=7)]
+        many = sharded.search_many(data[:3].tolist(), top_k=2)
+        assert [r[0][0] for r in many] == ids[:3]
+
+
+def test_segmented_index_survives_reopen_and_merge(tmp_path):
+    rng = np.random.default_rng(5)
+    data = rng.standard_normal((50, 8))
+    ids = [uuid4() for _ in range(len(data))]
+    index = SegmentedIndex(str(tmp_path), dim=8, segment_rows=10)
+    for asset_id, row in zip(ids, data):
+        index.add(asset_id, row)
+    assert index.segment_count == 6
+    assert index.delete(ids[3])
+    assert index.delete(ids[47])
+    assert not index.delete(uuid4())
+    # A delete writes only the bitmap byte holding its row
+    assert (tmp_path / "00000001.del").read_bytes() == bytes([0b00010000])
+    assert (tmp_path / "00000005.del").read_bytes() == bytes([0b00000001])
+    index.close()
+
+    reopened = SegmentedIndex.open(str(tmp_path), segment_rows=10)
+    assert len(reopened) == 48
+    assert reopened.search(data[7], top_k=1)[0][0] == ids[7]
+    assert ids[3] not in {a for a, _ in reopened.search(data[3], top_k=5)}
+    assert ids[47] not in {a for a, _ in reopened.search(data[47], top_k=5)}
+
+    assert reopened.needs_merge(max_segments=2)
+    reopened.merge()
+    assert reopened.segment_count == 2
+    assert len(reopened) == 48
+    results = reopened.search_many([data[7], data[42]], top_k=1)
+    assert [r[0][0] for r in results] == [ids[7], ids[42]]
+    reopened.close()
+    assert len(list(tmp_path.glob("*.vec"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_persistent_memory_vector_db_reloads_domains(tmp_path):
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    asset = Asset(name="doc", domain_id=domain_id, asset_type=AssetType.DOCUMENT, content="a")
+    await repo.add(asset)
+    await MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True).add(domain_id, asset.id, [0.0, 1.0])
+
+    reloaded = MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True)
+    results = await reloaded.search(domain_id, [0.0, 1.0])
+    assert [a.id for a, _ in results] == [asset.id]
+
+
+@pytest.mark.asyncio
+async def test_qdrant_vector_db_hydrates_hits_in_rank_order():
+    qdrant_client = pytest.importorskip("qdrant_client")
+    repo = MemoryAssetRepository()
+    vector_db = QdrantVectorDB(asset_repo=repo, batch_size=2)
+    vector_db.client = qdrant_client.AsyncQdrantClient(":memory:")
+    domain_id = uuid4()
+    near = Asset(name="near", domain_id=domain_id, asset_type=AssetType.DOCUMENT)
+    far = Asset(name="far", domain_id=domain_id, asset_type=AssetType.DOCUMENT)
+    await repo.add(far)
+    await repo.add(near)
+    await vector_db.add(uuid4(), uuid4(), [1.0, 0.0])
+    await vector_db.add_many(domain_id, [(far.id, [0.0, 1.0]), (near.id, [1.0, 0.0]), (uuid4(), [-1.0, 0.0])])
+
+    results = await vector_db.search(domain_id, [1.0, 0.1])
+    assert [a.id for a, _ in results] == [near.id, far.id]
+    batched = await vector_db.search_many(domain_id, [[0.0, 1.0]], top_k=1)
+    assert batched == [[(far.id, pytest.approx(1.0))]]
+
+    await vector_db.delete(domain_id, near.id)
+    await vector_db.update(domain_id, far.id, [1.0, 0.0])
+    results = await vector_db.search(domain_id, [1.0, 0.1])
+    assert [a.id for a, _ in results] == [far.id]
+
+
+@pytest.mark.asyncio
+async def test_qdrant_empty_domains_search_and_delete_without_errors():
+    pytest.importorskip("qdrant_client")
+
+    class FakeClient:
+        """Rejects requests for missing collections or shard keys, like a Qdrant server."""
+
+        def __init__(self):
+            self.collections = {"shared": set(), "sharded": {"existing"}}
+
+        async def collection_exists(self, name):
+            return name in self.collections
+
+        def _check(self, name, shard_key):
+            if name not in self.collections:
+                raise Exception(f"Not found: Collection `{name}` doesn't exist!")
+            if shard_key is not None and shard_key not in self.collections[name]:
+                raise Exception(f"Bad request: Shard key {shard_key} not found")
+
+        async def query_points(self, collection_name, shard_key_selector=None, **kwargs):
+            self._check(collection_name, shard_key_selector)
+            return type("Response", (), {"points": []})()
+
+        async def query_batch_points(self, collection_name, requests):
+            for request in requests:
+                self._check(collection_name, request.shard_key)
+            return [type("Response", (), {"points": []})() for _ in requests]
+
+        async def delete(self, collection_name, points_selector, shard_key_selector=None):
+            self._check(collection_name, shard_key_selector)
+
+    repo = MemoryAssetRepository()
+    for collection, layout in (("missing", "shared"), ("missing", "shard"), ("sharded", "shard")):
+        vector_db = QdrantVectorDB(asset_repo=repo, collection=collection, layout=layout)
+        vector_db.client = FakeClient()
+        domain_id = uuid4()
+        assert await vector_db.search(domain_id, [1.0, 0.0]) == []
+        assert await vector_db.search_many(domain_id, [[1.0, 0.0], [0.0, 1.0]]) == [[], []]
+        await vector_db.delete(domain_id, uuid4())
+
+    # Other failures still surface
+    async def unavailable(**kwargs):
+        raise Exception("Service unavailable")
+
+    vector_db = QdrantVectorDB(asset_repo=repo, collection="sharded", layout="shard")
+    vector_db.client = FakeClient()
+    vector_db.client.query_points = unavailable
+    with pytest.raises(RuntimeError):
+        await vector_db.search(uuid4(), [1.0, 0.0])
+
+
+@pytest.mark.asyncio
+async def test_qdrant_collection_per_domain_layout():
+    qdrant_client = pytest.importorskip("qdrant_client")
+    vector_db = QdrantVectorDB(asset_repo=MemoryAssetRepository(), collection="t", layout="collection")
+    vector_db.client = qdrant_client.AsyncQdrantClient(":memory:")
+    domain_id, other_domain = uuid4(), uuid4()
+    asset_id = uuid4()
+    await vector_db.add(domain_id, asset_id, [1.0, 0.0])
+    await vector_db.add(other_domain, uuid4(), [1.0, 0.0])
+
+    assert await vector_db.client.collection_exists(f"t_{domain_id.hex}")
+    results = await vector_db.search_many(domain_id, [[1.0, 0.0]])
+    assert [a for a, _ in results[0]] == [asset_id]
+    assert await vector_db.search_many(uuid4(), [[1.0, 0.0]]) == [[]]
+    with pytest.raises(ValueError):
+        QdrantVectorDB(layout="per-tenant")
+
+
+def test_segmented_index_has_one_writer_and_read_only_followers(tmp_path):
+    from src.infrastructure_vectordb.segmented_index import SegmentLockedError
+
+    rng = np.random.default_rng(7)
+    data = rng.standard_normal((30, 8))
+    ids = [uuid4() for _ in range(len(data))]
+    writer = SegmentedIndex(str(tmp_path), dim=8, segment_rows=10)
+    for asset_id, row in zip(ids[:12], data[:12]):
+        writer.add(asset_id, row)
+    with pytest.raises(SegmentLockedError):
+        SegmentedIndex.open(str(tmp_path), segment_rows=10)
+
+    manifest = (tmp_path / "manifest.json").read_text()
+    reader = SegmentedIndex.open(str(tmp_path), segment_rows=10, read_only=True, refresh_seconds=0)
+    assert (tmp_path / "manifest.json").read_text() == manifest
+    assert len(reader) == 12 and reader.search(data[11], top_k=1)[0][0] == ids[11]
+    with pytest.raises(RuntimeError):
+        reader.add(uuid4(), data[0])
+
+    # Rows, tombstones and merges made by the writer show up on the next search
+    for asset_id, row in zip(ids[12:], data[12:]):
+        writer.add(asset_id, row)
+    writer.delete(ids[0])
+    writer.merge()
+    assert reader.search(data[25], top_k=1)[0][0] == ids[25]
+    assert ids[0] not in {a for a, _ in reader.search(data[0], top_k=3)}
+    assert len(reader) == 29
+
+    writer.close()
+    reopened = SegmentedIndex.open(str(tmp_path), segment_rows=10)
+    assert len(reopened) == 29
+    reopened.close()
+    reader.close()
+
+
+@pytest.mark.asyncio
+async def test_persistent_vector_db_follows_domains_written_by_another_process(tmp_path):
+    repo = MemoryAssetRepository()
+    domain_id = uuid4()
+    asset = Asset(name="a", domain_id=domain_id, asset_type=AssetType.DOCUMENT)
+    await repo.add(asset)
+    writer = MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True)
+    follower = MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True)
+    await writer.add(domain_id, asset.id, [1.0, 0.0])
+
+    assert [a.id for a, _ in await follower.search(domain_id, [1.0, 0.0])] == [asset.id]
+    with pytest.raises(RuntimeError):
+        await follower.add(domain_id, uuid4(), [0.0, 1.0])
+
+
+def test_indexes_filter_by_labels_before_top_k(tmp_path):
+    rng = np.random.default_rng(11)
+    data = rng.standard_normal((60, 8))
+    ids = [uuid4() for _ in range(len(data))]
+    tagged = set(ids[1::3])
+    indexes = [
+        FlatIndex(dim=8),
+        QuantizedIndex(dim=8, path=str(tmp_path / "q.f32"), mode="int8", oversample=20),
+        HNSWIndex(dim=8, m=8, ef_construction=64, seed=1),
+        SegmentedIndex(str(tmp_path / "s"), dim=8, segment_rows=16),
+    ]
+    for index in indexes:
+        for asset_id, row in zip(ids, data):
+            index.add(asset_id, row, ["red"] if asset_id in tagged else ["blue"])
+        index.delete(ids[1])
+        index.compact()
+        # The unfiltered nearest neighbour of row 0 is itself, which is not tagged
+        hits = index.search(data[0], top_k=5, where=["red"])
+        assert len(hits) == 5 and {a for a, _ in hits} <= tagged - {ids[1]}
+        assert index.search(data[4], top_k=1, where=["red"])[0][0] == ids[4]
+        assert index.search(data[4], top_k=3, where=["red", "green"]) == []
+        assert index.search_many([data[4]], top_k=1, where=["blue"])[0][0][0] != ids[4]
+    indexes[3].close()
+
+    reopened = SegmentedIndex.open(str(tmp_path / "s"), segment_rows=16)
+    assert reopened.search(data[7], top_k=1, where=["red"])[0][0] == ids[7]
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_vector_db_search_filters_by_category_and_type(tmp_path):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    repo = MemoryAssetRepository()
+    domain_id, category_id = uuid4(), uuid4()
+    doc = Asset(name="doc", domain_id=domain_id, asset_type=AssetType.DOCUMENT, category_id=category_id)
+    link = Asset(name="link", domain_id=domain_id, asset_type=AssetType.LINK, category_id=category_id)
+    other = Asset(name="other", domain_id=domain_id, asset_type=AssetType.DOCUMENT)
+    for asset in (doc, link, other):
+        await repo.add(asset)
+    qdrant = QdrantVectorDB(asset_repo=repo)
+    qdrant.client = qdrant_client.AsyncQdrantClient(":memory:")
+    backends = [
+        MemoryVectorDB(repo),
+        MemoryVectorDB(repo, shards=2),
+        MemoryVectorDB(repo, storage_dir=str(tmp_path), persistent=True),
+        HNSWVectorDB(repo),
+        qdrant,
+    ]
+    for vector_db in backends:
+        await vector_db.add(domain_id, other.id, [1.0, 0.0], other.category_id, other.asset_type)
+        await vector_db.add_many(domain_id, [
+            (doc.id, [0.0, 1.0], category_id, AssetType.DOCUMENT),
+            (link.id, [0.6, 0.8], category_id, AssetType.LINK),
+        ])
+        results = await vector_db.search(domain_id, [1.0, 0.0], top_k=1, category_id=category_id)
+        assert [a.name for a, _ in results] == ["link"]
+        results = await vector_db.search(domain_id, [1.0, 0.0], asset_type=AssetType.DOCUMENT)
+        assert [a.name for a, _ in results] == ["other", "doc"]
+        batched = await vector_db.search_many(
+            domain_id, [[1.0, 0.0]], category_id=category_id, asset_type=AssetType.DOCUMENT
+        )
+        assert [a for a, _ in batched[0]] == [doc.id]
+
+        # Moving an asset to another category re-labels it
+        await vector_db.update(domain_id, link.id, [0.6, 0.8], None, AssetType.LINK)
+        results = await vector_db.search(domain_id, [1.0, 0.0], category_id=category_id)
+        assert [a.name for a, _ in results] == ["doc"]